@@ -0,0 +1,30 @@
+"""baseline schema
+
+On an empty database this creates every table from the models (the same
+schema app.database.init_db builds); the later revisions check for what
+already exists, so they leave it as is. Databases that predate migrations
+should be marked with `alembic stamp 0001` before running `alembic upgrade head`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlmodel import SQLModel
+
+from app import models  # noqa: F401  (registers every table on SQLModel.metadata)
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table("user"):
+        SQLModel.metadata.create_all(bind)
+
+def downgrade():
+    # The baseline predates migrations; dropping it is left to the operator
+    pass
@@ -0,0 +1,70 @@
+"""composite and partial indexes for the hot filter columns
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# (table, index name, columns, partial predicate as (postgresql, sqlite) or None)
+INDEXES = [
+    ("user", "ix_user_username", ["username"], None),
+    ("user", "ix_user_email", ["email"], None),
+    ("rolepermission", "ix_rolepermission_role_permission_id", ["role", "permission_id"], None),
+    ("userpermission", "ix_userpermission_user_id_permission_id", ["user_id", "permission_id"], None),
+    ("teacher", "ix_teacher_user_id", ["user_id"], None),
+    ("student", "ix_student_user_id", ["user_id"], None),
+    ("student", "ix_student_batch_id", ["batch_id"], None),
+    ("classassignment", "ix_classassignment_batch_id_scheduled_at", ["batch_id", "scheduled_at"], None),
+    ("classassignment", "ix_classassignment_teacher_id_scheduled_at", ["teacher_id", "scheduled_at"], None),
+    ("classassignment", "ix_classassignment_scheduled_at", ["scheduled_at"], None),
+    ("chatgroupmember", "ix_chatgroupmember_group_id_user_id", ["group_id", "user_id"], None),
+    ("chatgroupmember", "ix_chatgroupmember_user_id", ["user_id"], None),
+    ("message", "ix_message_sender_id_receiver_id_sent_at", ["sender_id", "receiver_id", "sent_at"], None),
+    ("message", "ix_message_receiver_id_sender_id_sent_at", ["receiver_id", "sender_id", "sent_at"], None),
+    ("message", "ix_message_receiver_id_sender_id_unread", ["receiver_id", "sender_id"], ("is_read = false", "is_read = 0")),
+    ("groupmessage", "ix_groupmessage_group_id_sent_at", ["group_id", "sent_at"], None),
+    ("notification", "ix_notification_user_id_created_at", ["user_id", "created_at"], None),
+    ("notification", "ix_notification_user_id_unread", ["user_id", "created_at"], ("is_read = false", "is_read = 0")),
+    ("notification", "ix_notification_created_at_read", ["created_at"], ("is_read = true", "is_read = 1")),
+    ("task", "ix_task_assigned_to_created_at", ["assigned_to", "created_at"], None),
+    ("task", "ix_task_created_by_created_at", ["created_by", "created_at"], None),
+    ("exam", "ix_exam_batch_id_exam_date", ["batch_id", "exam_date"], None),
+    ("examresult", "ix_examresult_student_id_entered_at", ["student_id", "entered_at"], None),
+    ("examresult", "ix_examresult_exam_id_student_id", ["exam_id", "student_id"], None),
+    ("examresult", "ix_examresult_teacher_id_entered_at", ["teacher_id", "entered_at"], None),
+    ("examresult", "ix_examresult_entered_at", ["entered_at"], None),
+    ("attendance", "ix_attendance_student_id_class_date", ["student_id", "class_date"], None),
+    ("attendance", "ix_attendance_teacher_id_class_date", ["teacher_id", "class_date"], None),
+    ("attendance", "ix_attendance_class_date", ["class_date"], None),
+    ("behaviorrecord", "ix_behaviorrecord_student_id_date_recorded", ["student_id", "date_recorded"], None),
+    ("behaviorrecord", "ix_behaviorrecord_teacher_id_date_recorded", ["teacher_id", "date_recorded"], None),
+    ("payment", "ix_payment_student_id_payment_date", ["student_id", "payment_date"], None),
+    ("feedbackform", "ix_feedbackform_student_id_submitted_at", ["student_id", "submitted_at"], None),
+    ("feedbackform", "ix_feedbackform_status_submitted_at", ["status", "submitted_at"], None),
+    ("reportcard", "ix_reportcard_student_id_generated_at", ["student_id", "generated_at"], None),
+]
+
+def upgrade():
+    # Postgres builds these without blocking writes on the hot tables
+    postgres = op.get_bind().dialect.name == "postgresql"
+    for table, name, columns, where in INDEXES:
+        kwargs = {}
+        if where:
+            kwargs["postgresql_where"] = sa.text(where[0])
+            kwargs["sqlite_where"] = sa.text(where[1])
+        if postgres:
+            with op.get_context().autocommit_block():
+                op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True, **kwargs)
+        else:
+            op.create_index(name, table, columns, if_not_exists=True, **kwargs)
+
+def downgrade():
+    for table, name, columns, where in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,26 @@
+"""user.token_epoch for revoking stateless access tokens
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # init_db's create_all may already have added the column on a fresh database
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("user")}
+    if "token_epoch" not in columns:
+        with op.batch_alter_table("user") as batch_op:
+            batch_op.add_column(sa.Column("token_epoch", sa.Integer(), nullable=False, server_default="0"))
+    op.create_index("ix_user_updated_at", "user", ["updated_at"], if_not_exists=True)
+
+def downgrade():
+    op.drop_index("ix_user_updated_at", table_name="user", if_exists=True)
+    with op.batch_alter_table("user") as batch_op:
+        batch_op.drop_column("token_epoch")
@@ -0,0 +1,37 @@
+"""usersession table for rotating refresh tokens
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # init_db's create_all may already have created the table on a fresh database
+    if not sa.inspect(op.get_bind()).has_table("usersession"):
+        op.create_table(
+            "usersession",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("user.id"), nullable=False),
+            sa.Column("token_hash", sa.String(), nullable=False),
+            sa.Column("token_epoch", sa.Integer(), nullable=False),
+            sa.Column("rotation", sa.Integer(), nullable=False),
+            sa.Column("user_agent", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("last_used_at", sa.DateTime(), nullable=True),
+            sa.Column("expires_at", sa.DateTime(), nullable=False),
+            sa.Column("revoked_at", sa.DateTime(), nullable=True),
+        )
+    op.create_index("ix_usersession_user_id", "usersession", ["user_id"], if_not_exists=True)
+    op.create_index("ix_usersession_expires_at", "usersession", ["expires_at"], if_not_exists=True)
+
+def downgrade():
+    op.drop_index("ix_usersession_expires_at", table_name="usersession", if_exists=True)
+    op.drop_index("ix_usersession_user_id", table_name="usersession", if_exists=True)
+    op.drop_table("usersession")
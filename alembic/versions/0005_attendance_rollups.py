@@ -0,0 +1,48 @@
+"""daily attendance rollups per student and per batch
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+ROLLUPS = {
+    "studentattendancedaily": ("student_id", "student.id", """
+        SELECT student_id, subject, date(class_date), count(*), sum(CASE WHEN is_present THEN 1 ELSE 0 END)
+        FROM attendance
+        GROUP BY student_id, subject, date(class_date)
+    """),
+    "batchattendancedaily": ("batch_id", "batch.id", """
+        SELECT student.batch_id, attendance.subject, date(attendance.class_date), count(*),
+               sum(CASE WHEN attendance.is_present THEN 1 ELSE 0 END)
+        FROM attendance JOIN student ON student.id = attendance.student_id
+        WHERE student.batch_id IS NOT NULL
+        GROUP BY student.batch_id, attendance.subject, date(attendance.class_date)
+    """),
+}
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    for table, (key, target, backfill) in ROLLUPS.items():
+        # init_db's create_all may already have created the table on a fresh database
+        if not inspector.has_table(table):
+            op.create_table(
+                table,
+                sa.Column(key, sa.Integer(), sa.ForeignKey(target), primary_key=True),
+                sa.Column("subject", sa.String(), primary_key=True),
+                sa.Column("day", sa.Date(), primary_key=True),
+                sa.Column("total", sa.Integer(), nullable=False),
+                sa.Column("present", sa.Integer(), nullable=False),
+            )
+        op.execute(f"DELETE FROM {table}")
+        op.execute(f"INSERT INTO {table} ({key}, subject, day, total, present) {backfill}")
+
+def downgrade():
+    for table in reversed(list(ROLLUPS)):
+        op.drop_table(table)
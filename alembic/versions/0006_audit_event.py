@@ -0,0 +1,40 @@
+"""auditevent table for the audit log
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_auditevent_occurred_at_id": ["occurred_at", "id"],
+    "ix_auditevent_actor_id_occurred_at_id": ["actor_id", "occurred_at", "id"],
+    "ix_auditevent_action_occurred_at_id": ["action", "occurred_at", "id"],
+}
+
+def upgrade():
+    # init_db's create_all may already have created the table on a fresh database
+    if not sa.inspect(op.get_bind()).has_table("auditevent"):
+        op.create_table(
+            "auditevent",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("occurred_at", sa.DateTime(), nullable=False),
+            sa.Column("actor_id", sa.Integer(), nullable=True),
+            sa.Column("action", sa.String(), nullable=False),
+            sa.Column("entity_type", sa.String(), nullable=True),
+            sa.Column("entity_id", sa.Integer(), nullable=True),
+            sa.Column("details", sa.JSON(), nullable=True),
+        )
+    for name, columns in INDEXES.items():
+        op.create_index(name, "auditevent", columns, if_not_exists=True)
+
+def downgrade():
+    for name in reversed(list(INDEXES)):
+        op.drop_index(name, table_name="auditevent", if_exists=True)
+    op.drop_table("auditevent")
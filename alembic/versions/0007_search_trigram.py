@@ -0,0 +1,40 @@
+"""pg_trgm indexes for the /admin/search typeahead
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+# (table, column); other databases search through the in-process index instead
+INDEXES = [
+    ("user", "username"),
+    ("user", "full_name"),
+    ("user", "email"),
+    ("student", "full_name"),
+    ("student", "student_id"),
+    ("student", "email"),
+    ("teacher", "employee_id"),
+]
+
+def upgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for table, column in INDEXES:
+        with op.get_context().autocommit_block():
+            op.create_index(
+                f"ix_{table}_{column}_trgm", table, [column], if_not_exists=True, postgresql_concurrently=True,
+                postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"}
+            )
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for table, column in reversed(INDEXES):
+        op.drop_index(f"ix_{table}_{column}_trgm", table_name=table, if_exists=True)
@@ -0,0 +1,24 @@
+"""usersession.previous_token_hash for refresh token reuse detection
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # init_db's create_all may already have added the column on a fresh database
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("usersession")}
+    if "previous_token_hash" not in columns:
+        with op.batch_alter_table("usersession") as batch_op:
+            batch_op.add_column(sa.Column("previous_token_hash", sa.String(), nullable=True))
+
+def downgrade():
+    with op.batch_alter_table("usersession") as batch_op:
+        batch_op.drop_column("previous_token_hash")
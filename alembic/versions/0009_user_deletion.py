@@ -0,0 +1,28 @@
+"""userdeletion table: durable record of deleted users for stateless-token revocation
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # init_db's create_all may already have created the table on a fresh database
+    if not sa.inspect(op.get_bind()).has_table("userdeletion"):
+        op.create_table(
+            "userdeletion",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("deleted_at", sa.DateTime(), nullable=False),
+        )
+    op.create_index("ix_userdeletion_deleted_at", "userdeletion", ["deleted_at"], if_not_exists=True)
+
+def downgrade():
+    op.drop_index("ix_userdeletion_deleted_at", table_name="userdeletion", if_exists=True)
+    op.drop_table("userdeletion")
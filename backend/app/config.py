@@ -1,16 +1,111 @@
 import os
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    # Optional override, derived from DATABASE_URL (asyncpg / aiosqlite) when unset
+    ASYNC_DATABASE_URL: Optional[str] = None
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Connection pool, applied per engine in every uvicorn worker
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Migration scripts used to tell whether the schema is current at startup (default: <repo>/alembic/versions)
+    ALEMBIC_VERSIONS_DIR: Optional[str] = None
+    # Log every SQL statement, for local debugging only
+    DB_ECHO: bool = False
+
+    # Optional read-only replica for GET requests (a second SQLite/Postgres database works for tests)
+    READ_REPLICA_URL: Optional[str] = None
+    ASYNC_READ_REPLICA_URL: Optional[str] = None
+    # After a write, the same client reads from the primary for this long (via the X-Read-Primary-Until header)
+    READ_YOUR_WRITES_SECONDS: float = 10
+
+    # Warn when one statement runs this many times in a single request
+    DB_N_PLUS_ONE_THRESHOLD: int = 5
+
+    # Resolved principals are cached per process, keyed by token hash; 0 disables the cache.
+    # Deactivation, role or password changes and deletions made by other workers are checked against
+    # the token epoch table, so they apply within STATELESS_TOKEN_REFRESH_SECONDS; other changes (a
+    # student's batch, names) may be served from another worker's cache for up to the TTL
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    # Opt-in access tokens that embed user id, role, token epoch and teacher/student ids,
+    # authorized without a user lookup; revocations reach other workers within the refresh interval
+    STATELESS_TOKENS: bool = False
+    STATELESS_TOKEN_REFRESH_SECONDS: float = 5
+    # Writes update the in-memory permission matrix of the worker that made them;
+    # other workers pick them up on this full reload interval
+    PERMISSION_MATRIX_REFRESH_SECONDS: float = 30
+    # /admin/search: "trigram" queries pg_trgm indexes (Postgres), "memory" an in-process trigram index
+    # reloaded every REFRESH_SECONDS for other workers' writes; "auto" picks by database
+    SEARCH_BACKEND: str = "auto"
+    SEARCH_INDEX_REFRESH_SECONDS: float = 300
+
+    # Refresh tokens: a session stays alive while used at least every IDLE days, up to MAX days after sign-in
+    REFRESH_TOKEN_IDLE_DAYS: int = 14
+    REFRESH_TOKEN_MAX_DAYS: int = 90
+    # A just-replaced refresh token presented within this many seconds of its rotation is a race between
+    # tabs or retries, answered with a plain 401; later it counts as reuse and revokes the session
+    REFRESH_TOKEN_REUSE_GRACE_SECONDS: float = 30
+
+    # Login token buckets, checked before bcrypt: BURST attempts at once, refilled at PER_MINUTE.
+    # "memory" (the only backend) keeps buckets per worker. A whole site behind one NAT address shares
+    # the IP bucket, so raise LOGIN_IP_* there
+    LOGIN_RATE_LIMIT_ENABLED: bool = True
+    LOGIN_RATE_LIMIT_BACKEND: str = "memory"
+    LOGIN_IP_BURST: int = 20
+    LOGIN_IP_PER_MINUTE: float = 30
+    LOGIN_USERNAME_BURST: int = 5
+    LOGIN_USERNAME_PER_MINUTE: float = 5
+    # Reverse proxies (addresses or CIDRs, JSON list) whose CLIENT_IP_HEADER is believed; empty trusts
+    # none and rate limits the connecting address
+    TRUSTED_PROXIES: List[str] = []
+    CLIENT_IP_HEADER: str = "X-Forwarded-For"
+
+    # List endpoints page with opaque cursors: LIMIT defaults to PAGE_SIZE_DEFAULT and is capped at PAGE_SIZE_MAX.
+    # include_total counts exactly up to PAGE_EXACT_COUNT_MAX rows; beyond that Postgres reports the planner estimate
+    PAGE_SIZE_DEFAULT: int = 100
+    PAGE_SIZE_MAX: int = 500
+    PAGE_EXACT_COUNT_MAX: int = 10000
+
+    # Admin analytics snapshots are recomputed at most once per TTL per worker; 0 disables caching
+    ANALYTICS_CACHE_TTL_SECONDS: float = 15
+
+    # Notification retention, deleted in batches of BATCH_SIZE (each its own short transaction) by a
+    # scheduler thread every INTERVAL_MINUTES: read notifications after DAYS, or after the type's entry in
+    # DAYS_BY_TYPE (JSON, e.g. {"class_reminder": 7}); unread ones only when UNREAD_DAYS is set.
+    # Off by default since it deletes data; /admin/maintenance/cleanup-notifications runs it on demand
+    NOTIFICATION_RETENTION_ENABLED: bool = False
+    NOTIFICATION_RETENTION_INTERVAL_MINUTES: float = 60
+    NOTIFICATION_RETENTION_DAYS: int = 30
+    NOTIFICATION_RETENTION_DAYS_BY_TYPE: Dict[str, int] = {}
+    NOTIFICATION_RETENTION_UNREAD_DAYS: Optional[int] = None
+    NOTIFICATION_RETENTION_BATCH_SIZE: int = 1000
+    NOTIFICATION_RETENTION_PAUSE_SECONDS: float = 0.05
+
+    # Audit events are queued in memory and written in batches of up to BATCH_SIZE at least every
+    # FLUSH_INTERVAL_SECONDS; beyond MAX_QUEUED pending events (database down) new ones are dropped
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    AUDIT_MAX_QUEUED: int = 50000
+
+    # bcrypt cost; existing hashes are upgraded on the next successful login after a change
+    BCRYPT_ROUNDS: int = 12
+    # Password hashing process pool: workers default to the CPU count (0 runs inline),
+    # pending jobs default to 8 per worker; beyond that requests get 503 + Retry-After
+    PASSWORD_HASH_WORKERS: Optional[int] = None
+    PASSWORD_HASH_MAX_PENDING: Optional[int] = None
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 2
+
     model_config = SettingsConfigDict(env_file=os.path.join(BASE_DIR, "myenv"), env_file_encoding="utf-8")
 
 settings = Settings()
-
-print("Loaded settings:", settings.model_dump())
\ No newline at end of file
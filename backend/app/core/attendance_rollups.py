@@ -0,0 +1,113 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Iterable, Optional, Tuple
+from sqlalchemy import case, delete, func, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import select
+from ..models import Attendance, Student, StudentAttendanceDaily, BatchAttendanceDaily
+
+_UPSERT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+def _upsert(session, model, counters: dict, key_columns: Tuple[str, ...]):
+    if not counters:
+        return
+    rows = [
+        {**dict(zip(key_columns, key)), "total": total, "present": present}
+        for key, (total, present) in counters.items()
+    ]
+    dialect_insert = _UPSERT.get(session.get_bind().dialect.name)
+    if dialect_insert is None:
+        _update_then_insert(session, model, rows, key_columns)
+        return
+    statement = dialect_insert(model)
+    # Concurrent markers for the same day add to the row instead of racing on a read-modify-write
+    session.execute(statement.on_conflict_do_update(
+        index_elements=list(key_columns),
+        set_={"total": model.total + statement.excluded.total, "present": model.present + statement.excluded.present},
+    ), rows)
+
+def _update_then_insert(session, model, rows, key_columns: Tuple[str, ...]):
+    # Databases without ON CONFLICT: add to the row in place, insert it when the update found none.
+    # Two first markers of the same day can still collide on the unique key and one of them retries
+    for row in rows:
+        keys = [getattr(model, column) == row[column] for column in key_columns]
+        updated = session.execute(
+            update(model).where(*keys)
+            .values(total=model.total + row["total"], present=model.present + row["present"])
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not updated:
+            session.execute(insert(model), [row])
+
+def add_attendance(session, records: Iterable[Tuple[Attendance, Optional[int]]]):
+    """
+    Count new (attendance, student's batch id) pairs into the daily rollups.
+    Runs on the caller's session, so the counters commit or roll back with
+    the Attendance rows themselves.
+    """
+    by_student = defaultdict(lambda: [0, 0])
+    by_batch = defaultdict(lambda: [0, 0])
+    for attendance, batch_id in records:
+        day = attendance.class_date.date()
+        for counters, key in ((by_student, (attendance.student_id, attendance.subject, day)),
+                              (by_batch, (batch_id, attendance.subject, day) if batch_id else None)):
+            if key:
+                counters[key][0] += 1
+                counters[key][1] += int(bool(attendance.is_present))
+    _upsert(session, StudentAttendanceDaily, by_student, ("student_id", "subject", "day"))
+    _upsert(session, BatchAttendanceDaily, by_batch, ("batch_id", "subject", "day"))
+
+def rebuild(connection):
+    """Recompute both rollups from the Attendance table (backfill, or after a raw bulk load)"""
+    day = func.date(Attendance.class_date)
+    present = func.sum(case((Attendance.is_present == True, 1), else_=0))
+    connection.execute(delete(StudentAttendanceDaily))
+    connection.execute(delete(BatchAttendanceDaily))
+    connection.execute(insert(StudentAttendanceDaily).from_select(
+        ["student_id", "subject", "day", "total", "present"],
+        select(Attendance.student_id, Attendance.subject, day, func.count(), present)
+        .group_by(Attendance.student_id, Attendance.subject, day),
+    ))
+    connection.execute(insert(BatchAttendanceDaily).from_select(
+        ["batch_id", "subject", "day", "total", "present"],
+        select(Student.batch_id, Attendance.subject, day, func.count(), present)
+        .join(Student, Student.id == Attendance.student_id)
+        .where(Student.batch_id != None)
+        .group_by(Student.batch_id, Attendance.subject, day),
+    ))
+
+def summary_statement(model, key_column, key: Optional[int] = None,
+                      start_date: Optional[datetime] = None, end_date: Optional[datetime] = None):
+    """
+    Per-subject (subject, total, present) sums from a rollup. Date bounds
+    are whole days: start_date's day onwards, up to and including end_date's day.
+    """
+    statement = select(model.subject, func.sum(model.total), func.sum(model.present)).group_by(model.subject)
+    if key is not None:
+        statement = statement.where(key_column == key)
+    if start_date:
+        statement = statement.where(model.day >= start_date.date())
+    if end_date:
+        statement = statement.where(model.day < end_date.date() + timedelta(days=1))
+    return statement
+
+def student_summary_statement(student_id: int, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None):
+    return summary_statement(StudentAttendanceDaily, StudentAttendanceDaily.student_id, student_id, start_date, end_date)
+
+def summarize(rows) -> dict:
+    """{"total", "present", "percentage", "by_subject": {subject: {"total", "present", "percentage"}}}"""
+    by_subject = {}
+    for subject, total, present in rows:
+        by_subject[subject] = {
+            "total": total,
+            "present": present,
+            "percentage": (present / total * 100) if total > 0 else 0
+        }
+    total = sum(s["total"] for s in by_subject.values())
+    present = sum(s["present"] for s in by_subject.values())
+    return {
+        "total": total,
+        "present": present,
+        "percentage": (present / total * 100) if total > 0 else 0,
+        "by_subject": by_subject
+    }
@@ -0,0 +1,157 @@
+"""
+Audit log. Mutating endpoints call record() after their commit, which only
+appends the event to an in-process queue; a writer thread flushes the queue
+every AUDIT_FLUSH_INTERVAL_SECONDS (or as soon as a full batch is waiting)
+with one executemany insert per batch, so a request never pays for an
+extra commit. Events still queued when a worker dies uncleanly are lost;
+shutdown flushes them.
+"""
+
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import inspect, insert
+from sqlmodel import select
+from ..config import settings
+from ..database import engine
+from ..models import AuditEvent, User
+from .pagination import CursorPage, paginate
+
+logger = logging.getLogger(__name__)
+
+# A batch that keeps failing (e.g. the database rejects a row) is dropped after this many attempts
+MAX_ATTEMPTS = 3
+
+def _identity(user: Optional[User]) -> Optional[int]:
+    if user is None:
+        return None
+    # Called after commit: the identity key survives expiry, reading user.id would reload the row
+    identity = inspect(user).identity
+    return identity[0] if identity else user.id
+
+class AuditWriter:
+    def __init__(self, batch_size: int = 500, flush_interval: float = 1.0, max_queued: int = 50000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queued = max_queued
+        self._queue: deque = deque()
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def record(self, actor: Optional[User], action: str, entity_type: Optional[str] = None,
+               entity_id: Optional[int] = None, details: Optional[Dict[str, Any]] = None):
+        event = {
+            "occurred_at": datetime.utcnow(),
+            "actor_id": _identity(actor),
+            "action": action,
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "details": details,
+        }
+        with self._condition:
+            if len(self._queue) >= self.max_queued:
+                # The database has been unreachable for a while; shed events rather than memory
+                self.dropped += 1
+                return
+            self._queue.append((event, 0))
+            if len(self._queue) >= self.batch_size:
+                self._condition.notify()
+            if self._thread is None and not self._stopping:
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if len(self._queue) < self.batch_size and not self._stopping:
+                    self._condition.wait(self.flush_interval)
+                stopping = self._stopping
+            self.flush()
+            if stopping:
+                return
+
+    def _take_batch(self) -> List[Tuple[dict, int]]:
+        with self._condition:
+            return [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+
+    def flush(self) -> int:
+        """Write everything queued so far; returns the number of events written"""
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    return written
+                try:
+                    with engine.begin() as connection:
+                        connection.execute(insert(AuditEvent), [event for event, _ in batch])
+                except Exception:
+                    logger.exception("Writing %d audit events failed", len(batch))
+                    retry = [(event, attempts + 1) for event, attempts in batch if attempts + 1 < MAX_ATTEMPTS]
+                    self.failed += len(batch) - len(retry)
+                    with self._condition:
+                        self._queue.extendleft(reversed(retry))
+                    return written
+                written += len(batch)
+                self.written += len(batch)
+                self.batches += 1
+
+    def stop(self):
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout=10)
+        self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "queued": len(self._queue),
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+audit_log = AuditWriter(
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+    max_queued=settings.AUDIT_MAX_QUEUED,
+)
+
+def record(actor: Optional[User], action: str, entity_type: Optional[str] = None,
+           entity_id: Optional[int] = None, details: Optional[Dict[str, Any]] = None):
+    audit_log.record(actor, action, entity_type, entity_id, details)
+
+def changed_fields(update_data: Dict[str, Any]) -> List[str]:
+    """Names of the fields an update set, never their values (passwords among them)"""
+    return sorted("password" if field == "hashed_password" else field for field in update_data if field != "updated_at")
+
+def events_page(session, page: CursorPage, actor_id: Optional[int] = None, action: Optional[str] = None,
+                entity_type: Optional[str] = None, entity_id: Optional[int] = None,
+                start_date: Optional[datetime] = None, end_date: Optional[datetime] = None):
+    """[(event, actor username, actor full name)], newest first, keyset-paginated on (occurred_at, id)"""
+    query = select(AuditEvent, User.username, User.full_name).outerjoin(User, User.id == AuditEvent.actor_id)
+    if actor_id:
+        query = query.where(AuditEvent.actor_id == actor_id)
+    if action:
+        query = query.where(AuditEvent.action == action)
+    if entity_type:
+        query = query.where(AuditEvent.entity_type == entity_type)
+    if entity_id:
+        query = query.where(AuditEvent.entity_id == entity_id)
+    if start_date:
+        query = query.where(AuditEvent.occurred_at >= start_date)
+    if end_date:
+        query = query.where(AuditEvent.occurred_at <= end_date)
+
+    return paginate(session, query, page, AuditEvent.occurred_at, entity=lambda row: row[0])
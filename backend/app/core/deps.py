@@ -1,24 +1,176 @@
+import time
+from dataclasses import dataclass
+from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.exc import NoResultFound
 from sqlmodel import Session, select
-from ..database import get_session
-from ..models import User
-from ..core.security import decode_token
+from sqlmodel.ext.asyncio.session import AsyncSession
+from ..database import get_session, get_async_session
+from ..models import User, UserRole, Teacher, Student
+from ..core.security import decode_token_claims, token_key
+from ..core.principal_cache import principal_cache, snapshot_user, rehydrate_user
+from ..core.token_epochs import token_epochs
+from ..config import settings
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-def get_current_user(token: str = Depends(oauth2_scheme), session: Session = Depends(get_session)) -> User:
-    username = decode_token(token)
-    statement = select(User).where((User.username == username) | (User.email == username))
-    results = session.exec(statement)
-    user = results.first()
+def _check_user(user: User) -> User:
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     if not user.is_active:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User account is deactivated")
     return user
 
+@dataclass
+class Principal:
+    """
+    The authenticated user plus the teacher/student ids most endpoints need.
+    For stateless tokens `user` stays None until get_current_user loads it.
+    """
+    user_id: int
+    role: UserRole
+    teacher_id: Optional[int] = None
+    student_id: Optional[int] = None
+    batch_id: Optional[int] = None
+    user: Optional[User] = None
+
+def _principal_statement(claims: dict):
+    # One outer-joined query instead of a user lookup plus a Teacher/Student lookup per endpoint
+    subject = claims["sub"]
+    return (
+        select(User, Teacher.id, Student.id, Student.batch_id)
+        .outerjoin(Teacher, Teacher.user_id == User.id)
+        .outerjoin(Student, Student.user_id == User.id)
+        .where((User.username == subject) | (User.email == subject))
+    )
+
+def _to_principal(row) -> Optional[Principal]:
+    if row is None:
+        return None
+    user, teacher_id, student_id, batch_id = row
+    return Principal(
+        user_id=user.id, role=user.role, teacher_id=teacher_id, student_id=student_id, batch_id=batch_id, user=user
+    )
+
+def _cache_current(values: dict) -> bool:
+    # Other workers' commits don't evict this cache; their revocations (deactivation, role or
+    # password change, deletion) arrive through token_epochs, refreshed like the stateless path
+    user = values["user"]
+    if token_epochs.is_current(user["id"], user["token_epoch"] or 0):
+        return True
+    principal_cache.evict_user(user["id"])
+    return False
+
+def _from_cache(values: dict, session) -> Principal:
+    user = rehydrate_user(values["user"], session)
+    return Principal(
+        user_id=user.id,
+        role=user.role,
+        teacher_id=values["teacher_id"],
+        student_id=values["student_id"],
+        batch_id=values["batch_id"],
+        user=user,
+    )
+
+def _from_claims(claims: dict) -> Principal:
+    if not token_epochs.is_current(claims["uid"], claims["ep"]):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has been revoked")
+    return Principal(
+        user_id=claims["uid"],
+        role=UserRole(claims["role"]),
+        teacher_id=claims.get("tid"),
+        student_id=claims.get("sid"),
+        batch_id=claims.get("bid"),
+    )
+
+def _is_stateless(claims: dict) -> bool:
+    return settings.STATELESS_TOKENS and "uid" in claims
+
+def _remember(key: str, claims: dict, principal: Optional[Principal], generation: int):
+    # Never outlive the token itself
+    if principal and principal.user.is_active:
+        values = {
+            "user": snapshot_user(principal.user),
+            "teacher_id": principal.teacher_id,
+            "student_id": principal.student_id,
+            "batch_id": principal.batch_id,
+        }
+        principal_cache.put(key, principal.user_id, values, claims["exp"] - time.time(), generation)
+
+def _check_principal(principal: Optional[Principal]) -> Principal:
+    _check_user(principal.user if principal else None)
+    return principal
+
+def get_principal(token: str = Depends(oauth2_scheme), session: Session = Depends(get_session)) -> Principal:
+    key = token_key(token)
+    cached = principal_cache.get(key)
+    if cached is not None:
+        token_epochs.refresh(session)
+        if _cache_current(cached):
+            return _from_cache(cached, session)
+    claims = decode_token_claims(token)
+    if _is_stateless(claims):
+        token_epochs.refresh(session)
+        return _from_claims(claims)
+    generation = principal_cache.generation
+    principal = _to_principal(session.exec(_principal_statement(claims)).first())
+    _remember(key, claims, principal, generation)
+    return _check_principal(principal)
+
+async def get_principal_async(token: str = Depends(oauth2_scheme), session: AsyncSession = Depends(get_async_session)) -> Principal:
+    """Same as get_principal, but resolved on the event loop for async endpoints"""
+    key = token_key(token)
+    cached = principal_cache.get(key)
+    if cached is not None:
+        await token_epochs.refresh_async(session)
+        if _cache_current(cached):
+            return _from_cache(cached, session)
+    claims = decode_token_claims(token)
+    if _is_stateless(claims):
+        await token_epochs.refresh_async(session)
+        return _from_claims(claims)
+    generation = principal_cache.generation
+    principal = _to_principal((await session.exec(_principal_statement(claims))).first())
+    _remember(key, claims, principal, generation)
+    return _check_principal(principal)
+
+def get_current_user(principal: Principal = Depends(get_principal), session: Session = Depends(get_session)) -> User:
+    if principal.user is None:
+        principal.user = _check_user(session.get(User, principal.user_id))
+    return principal.user
+
+async def get_current_user_async(principal: Principal = Depends(get_principal_async), session: AsyncSession = Depends(get_async_session)) -> User:
+    if principal.user is None:
+        principal.user = _check_user(await session.get(User, principal.user_id))
+    return principal.user
+
+def principal_claims(session: Session, user: User) -> dict:
+    """Claims embedded in a stateless token for this user"""
+    teacher_id, student_id, batch_id = session.exec(
+        select(Teacher.id, Student.id, Student.batch_id)
+        .select_from(User)
+        .outerjoin(Teacher, Teacher.user_id == User.id)
+        .outerjoin(Student, Student.user_id == User.id)
+        .where(User.id == user.id)
+    ).first()
+    return {
+        "uid": user.id,
+        "role": user.role.value,
+        "ep": user.token_epoch or 0,
+        "tid": teacher_id,
+        "sid": student_id,
+        "bid": batch_id,
+    }
+
+def require_principal(*roles):
+    """Like require_role, but hands the endpoint the whole Principal; no roles means any user"""
+    def _role_checker(principal: Principal = Depends(get_principal)):
+        if roles and principal.role.value not in roles:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+        return principal
+    return _role_checker
+
 def require_role(*roles):
     def _role_checker(current_user: User = Depends(get_current_user)):
         if current_user.role.value not in roles:
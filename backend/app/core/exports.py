@@ -0,0 +1,180 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from enum import Enum
+from typing import Iterable, Iterator, List, Sequence
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from ..database import read_engine
+
+EXPORT_CHUNK_ROWS = 5000
+
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson", "json": "application/json"}
+
+def _plain(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def stream_chunks(statement, chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[Sequence[tuple]]:
+    """
+    Row tuples in chunks of `chunk_rows` from a server-side cursor (named
+    cursor on psycopg2, lazy fetch on SQLite), on a connection owned by the
+    generator, so only one chunk is ever held in memory and the request's
+    session can close as soon as the response starts.
+    """
+    with read_engine.connect() as connection:
+        result = connection.execution_options(stream_results=True, yield_per=chunk_rows).execute(statement)
+        for partition in result.partitions():
+            yield partition
+
+def _encode_csv(columns: List[str], chunks: Iterable[Sequence[tuple]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in chunks:
+        writer.writerows([_plain(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+def _encode_ndjson(columns: List[str], chunks: Iterable[Sequence[tuple]]) -> Iterator[bytes]:
+    for rows in chunks:
+        yield "".join(
+            json.dumps(dict(zip(columns, map(_plain, row)))) + "\n" for row in rows
+        ).encode()
+
+def _encode_json(columns: List[str], chunks: Iterable[Sequence[tuple]]) -> Iterator[bytes]:
+    # A single array like the old response, written incrementally
+    yield b"["
+    first = True
+    for rows in chunks:
+        if not rows:
+            continue
+        body = ",".join(json.dumps(dict(zip(columns, map(_plain, row)))) for row in rows)
+        yield (body if first else "," + body).encode()
+        first = False
+    yield b"]"
+
+ENCODERS = {"csv": _encode_csv, "ndjson": _encode_ndjson, "json": _encode_json}
+
+# Columnar formats need pyarrow, which is optional
+COLUMNAR_MEDIA_TYPES = {"arrow": "application/vnd.apache.arrow.stream", "parquet": "application/vnd.apache.parquet"}
+
+class _ChunkSink:
+    """File-like target for pyarrow writers that hands back whatever was written since the last drain"""
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.parts.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data, self.parts = b"".join(self.parts), []
+        return data
+
+def _arrow_schema(pa, statement, columns: List[str]):
+    # From the selected columns' SQL types, so every chunk shares one schema even when a chunk is all NULLs
+    types = []
+    for column in statement.selected_columns:
+        try:
+            python_type = column.type.python_type
+        except NotImplementedError:
+            python_type = str
+        if issubclass(python_type, bool):
+            types.append(pa.bool_())
+        elif issubclass(python_type, int):
+            types.append(pa.int64())
+        elif issubclass(python_type, float):
+            types.append(pa.float64())
+        elif issubclass(python_type, datetime):
+            types.append(pa.timestamp("us"))
+        elif issubclass(python_type, date):
+            types.append(pa.date32())
+        else:
+            types.append(pa.string())
+    return pa.schema(list(zip(columns, types)))
+
+def _encode_columnar(fmt: str, statement, columns: List[str], chunks: Iterable[Sequence[tuple]]) -> Iterator[bytes]:
+    import pyarrow as pa
+    schema = _arrow_schema(pa, statement, columns)
+    sink = _ChunkSink()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+    else:
+        writer = pa.ipc.new_stream(pa.PythonFile(sink, mode="w"), schema)
+    try:
+        for rows in chunks:
+            if not rows:
+                continue
+            # Each chunk becomes one record batch (one row group for parquet)
+            arrays = [
+                pa.array([_plain(value) if isinstance(value, Enum) else value for value in values], type=field.type)
+                for values, field in zip(zip(*rows), schema)
+            ]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+def columnar_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def _gzip(parts: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    for part in parts:
+        compressed = compressor.compress(part)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def export_response(statement, columns: List[str], fmt: str, filename: str, gzip: bool = False,
+                    chunk_rows: int = EXPORT_CHUNK_ROWS) -> StreamingResponse:
+    """Stream `statement`'s rows (one value per entry of `columns`) as csv, ndjson, json, arrow or parquet"""
+    if fmt in COLUMNAR_MEDIA_TYPES:
+        if not columnar_available():
+            raise HTTPException(status_code=400, detail=f"Format '{fmt}' needs pyarrow, which is not installed on this server")
+        body = _encode_columnar(fmt, statement, columns, stream_chunks(statement, chunk_rows))
+        media_type = COLUMNAR_MEDIA_TYPES[fmt]
+    elif fmt in ENCODERS:
+        body = ENCODERS[fmt](columns, stream_chunks(statement, chunk_rows))
+        media_type = MEDIA_TYPES[fmt]
+    else:
+        formats = ", ".join([*ENCODERS, *COLUMNAR_MEDIA_TYPES])
+        raise HTTPException(status_code=400, detail=f"Unsupported format '{fmt}', use one of: {formats}")
+    filename = f"{filename}.{fmt}"
+    if gzip:
+        body, filename, media_type = _gzip(body), filename + ".gz", "application/gzip"
+    return StreamingResponse(
+        body, media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,180 @@
+"""
+Keyset (cursor) pagination shared by the list endpoints. A page is ordered
+on (sort column, primary key), and the opaque cursor carries the last row's
+values, so the next page starts with an index range condition instead of
+OFFSET and costs the same however deep it is. Lists keep their response
+shape; the cursor of the next page is sent in the X-Next-Cursor header
+(absent on the last page) and, with include_total=true, a count in
+X-Total-Count. The offset (or skip) parameter of the old OFFSET paging is
+still honoured for existing clients but deprecated; it scans every skipped row.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Callable, List, Optional
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import and_, func, inspect, or_, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from sqlmodel import select
+from ..config import settings
+from .query_stats import outside_budget
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+def _load(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        return date.fromisoformat(value["d"])
+    return value
+
+class CursorPage:
+    """Request parameters of one page; see cursor_page() for the dependency"""
+
+    def __init__(self, response: Response, cursor: Optional[str], limit: int, include_total: bool, offset: int = 0):
+        self.response = response
+        self.cursor = cursor
+        self.limit = limit
+        self.include_total = include_total
+        self.offset = offset
+        self._base = None
+        self._sort_key = None
+        self._columns = None
+
+    def _decode(self, sort_key: str):
+        try:
+            data = json.loads(base64.urlsafe_b64decode(self.cursor.encode()))
+            value, last_id = _load(data["v"]), int(data["i"])
+        except (ValueError, TypeError, KeyError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        # A cursor from another listing (or another sort) would silently skip rows
+        if data.get("s") != sort_key:
+            raise HTTPException(status_code=400, detail="Cursor does not belong to this listing")
+        return value, last_id
+
+    def statement(self, query, sort_column, descending: bool = True, id_column=None):
+        """
+        `query` ordered on (sort_column, id), resumed after the cursor, limited
+        to one row more than the page so finish() can tell whether another
+        page follows. NULL sort values order as the largest (first when
+        descending), as Postgres does natively.
+        """
+        id_column = id_column if id_column is not None else inspect(sort_column.class_).primary_key[0]
+        self._base = query
+        self._sort_key = f"{sort_column.class_.__name__}.{sort_column.key}"
+        self._columns = (sort_column.key, id_column.key)
+        same = sort_column.key == id_column.key
+        nullable = not same and sort_column.expression.nullable
+
+        if self.cursor:
+            value, last_id = self._decode(self._sort_key)
+            after = (lambda a, b: a < b) if descending else (lambda a, b: a > b)
+            if same:
+                condition = after(id_column, last_id)
+            elif value is None:
+                # Inside the NULL block: its remaining rows, then (descending) every non-NULL row
+                condition = and_(sort_column.is_(None), after(id_column, last_id))
+                if descending:
+                    condition = or_(condition, sort_column.isnot(None))
+            elif nullable:
+                condition = or_(after(sort_column, value), and_(sort_column == value, after(id_column, last_id)))
+                if not descending:
+                    condition = or_(condition, sort_column.is_(None))
+            else:
+                condition = after(tuple_(sort_column, id_column), tuple_(value, last_id))
+            query = query.where(condition)
+
+        if same:
+            order = [id_column.desc() if descending else id_column.asc()]
+        elif nullable:
+            order = [sort_column.desc().nulls_first() if descending else sort_column.asc().nulls_last(),
+                     id_column.desc() if descending else id_column.asc()]
+        else:
+            order = [sort_column.desc(), id_column.desc()] if descending else [sort_column.asc(), id_column.asc()]
+        query = query.order_by(None).order_by(*order).limit(self.limit + 1)
+        return query.offset(self.offset) if self.offset else query
+
+    def finish(self, rows: List[Any], entity: Optional[Callable[[Any], Any]] = None) -> List[Any]:
+        """The page's rows, setting X-Next-Cursor when more follow; `entity` picks the model out of tuple rows"""
+        if len(rows) > self.limit:
+            last = rows[self.limit - 1]
+            if entity is not None:
+                last = entity(last)
+            sort_attr, id_attr = self._columns
+            cursor = {"s": self._sort_key, "v": _dump(getattr(last, sort_attr)), "i": getattr(last, id_attr)}
+            self.response.headers["X-Next-Cursor"] = base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+        return rows[:self.limit]
+
+    def count_statements(self, dialect_name: str):
+        """(planner estimate statement, Postgres only, or None; exact count statement) for the unpaged query"""
+        unpaged = self._base.order_by(None)
+        estimate = _Explain(unpaged) if dialect_name == "postgresql" else None
+        return estimate, select(func.count()).select_from(unpaged.subquery())
+
+    def set_total(self, total: int, approximate: bool):
+        self.response.headers["X-Total-Count"] = str(total)
+        if approximate:
+            self.response.headers["X-Total-Count-Approximate"] = "true"
+
+class _Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+def _estimated_rows(plan) -> int:
+    # psycopg2 decodes the json column, asyncpg hands back the text
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+def paginate(session, query, page: CursorPage, sort_column, descending: bool = True, id_column=None,
+             entity: Optional[Callable[[Any], Any]] = None) -> List[Any]:
+    """Run one page of `query` on a sync session"""
+    rows = session.exec(page.statement(query, sort_column, descending, id_column)).all()
+    if page.include_total:
+        estimate, exact = page.count_statements(session.get_bind().dialect.name)
+        # The planner's estimate costs no scan; counted exactly only while that is cheap
+        with outside_budget():
+            total = _estimated_rows(session.execute(estimate).scalar()) if estimate is not None else None
+            approximate = total is not None and total > settings.PAGE_EXACT_COUNT_MAX
+            page.set_total(total if approximate else session.exec(exact).one(), approximate)
+    return page.finish(rows, entity)
+
+async def paginate_async(session, query, page: CursorPage, sort_column, descending: bool = True, id_column=None,
+                         entity: Optional[Callable[[Any], Any]] = None) -> List[Any]:
+    """Run one page of `query` on an AsyncSession"""
+    rows = (await session.exec(page.statement(query, sort_column, descending, id_column))).all()
+    if page.include_total:
+        estimate, exact = page.count_statements(session.bind.dialect.name)
+        with outside_budget():
+            total = _estimated_rows((await session.execute(estimate)).scalar()) if estimate is not None else None
+            approximate = total is not None and total > settings.PAGE_EXACT_COUNT_MAX
+            page.set_total(total if approximate else (await session.exec(exact)).one(), approximate)
+    return page.finish(rows, entity)
+
+def cursor_page(default_limit: Optional[int] = None):
+    """Dependency factory: ?cursor=&limit=&include_total= for a list endpoint"""
+    def _page(
+        response: Response,
+        cursor: Optional[str] = None,
+        limit: int = Query(default_limit or settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+        include_total: bool = False,
+        offset: Optional[int] = Query(None, ge=0, deprecated=True, description="Use cursor"),
+        skip: Optional[int] = Query(None, ge=0, deprecated=True, description="Use cursor")
+    ) -> CursorPage:
+        offset = offset if offset is not None else skip
+        if offset and cursor:
+            raise HTTPException(status_code=400, detail="Pass either cursor or offset, not both")
+        return CursorPage(response, cursor, limit, include_total, offset or 0)
+    return _page
@@ -0,0 +1,90 @@
+"""
+bcrypt work, run in a dedicated process pool so a burst of logins can't
+starve the threads serving every other endpoint.
+Only imports passlib, so spawned worker processes start quickly; web
+workers that hand hashing to the pool never import it at all.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional, Tuple
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+@lru_cache(maxsize=None)
+def crypt_context(rounds: int) -> "CryptContext":
+    from passlib.context import CryptContext
+    # Pinning min/max to the configured cost makes needs_update() flag hashes made with any other cost
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+def hash_password(password: str, rounds: int) -> str:
+    return crypt_context(rounds).hash(password)
+
+def verify_and_update(password: str, hashed_password: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    """(valid, new hash when the stored one used a different cost)"""
+    return crypt_context(rounds).verify_and_update(password, hashed_password)
+
+class PasswordPoolBusy(Exception):
+    pass
+
+class PasswordPool:
+    """
+    Bounded process pool with admission control: at most `max_pending` jobs
+    may be queued or running; beyond that submit() raises PasswordPoolBusy
+    instead of letting the queue (and request latency) grow without bound.
+    workers=0 runs the work inline in the calling thread.
+    """
+
+    def __init__(self, rounds: int, workers: Optional[int] = None, max_pending: Optional[int] = None):
+        self.rounds = rounds
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.max_pending = max_pending or max(self.workers, 1) * 8
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = None
+        self.rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn, not fork: forking a process that is running request threads can deadlock
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordPoolBusy()
+            self._pending += 1
+            executor = self._get_executor()
+        try:
+            return executor.submit(fn, *args).result()
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def hash(self, password: str) -> str:
+        return self.run(hash_password, password, self.rounds)
+
+    def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return self.run(verify_and_update, password, hashed_password, self.rounds)
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "pending": self._pending, "max_pending": self.max_pending, "rejected": self.rejected}
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
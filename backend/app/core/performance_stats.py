@@ -0,0 +1,133 @@
+"""
+Exam performance statistics computed on NumPy arrays: one column-only query
+per table, then every per-group figure (counts, sums, mean, std, percentiles,
+grade histograms, pass rates) comes from bincount/lexsort over the whole
+result set at once rather than a Python loop per row.
+"""
+
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from sqlmodel import select
+from ..models import Exam, ExamResult
+
+PERCENTILES = (10, 25, 75, 90)
+
+def _factorize(values) -> Tuple[np.ndarray, List]:
+    """Integer codes for a sequence of hashable labels, plus the labels in code order"""
+    labels = sorted(dict.fromkeys(values), key=lambda label: (label is None, label))
+    index = {label: code for code, label in enumerate(labels)}
+    return np.fromiter(map(index.__getitem__, values), dtype=np.intp, count=len(values)), labels
+
+def load_results(session, batch_id: Optional[int] = None, subject: Optional[str] = None) -> Optional[Dict[str, np.ndarray]]:
+    """Arrays with one entry per exam result, or None when nothing matches"""
+    exam_filters = []
+    if batch_id:
+        exam_filters.append(Exam.batch_id == batch_id)
+    if subject:
+        exam_filters.append(Exam.subject == subject)
+
+    exams = session.exec(select(Exam.id, Exam.subject, Exam.batch_id, Exam.max_marks).where(*exam_filters)).all()
+    if not exams:
+        return None
+    results = session.exec(
+        select(ExamResult.exam_id, ExamResult.marks_obtained, ExamResult.grade)
+        .join(Exam, ExamResult.exam_id == Exam.id)
+        .where(*exam_filters)
+    ).all()
+    if not results:
+        return None
+
+    exam_ids, exam_subjects, exam_batches, exam_max = zip(*exams)
+    exam_ids = np.asarray(exam_ids, dtype=np.int64)
+    order = np.argsort(exam_ids)
+    subject_codes, subjects = _factorize(exam_subjects)
+    batch_codes, batches = _factorize(exam_batches)
+
+    result_exam_ids, marks, grades = zip(*results)
+    # Position of each result's exam in the (small) exam arrays
+    exam_index = order[np.searchsorted(exam_ids, np.asarray(result_exam_ids, dtype=np.int64), sorter=order)]
+    grade_codes, grade_labels = _factorize(grades)
+    return {
+        "marks": np.asarray(marks, dtype=np.float64),
+        "max_marks": np.asarray(exam_max, dtype=np.float64)[exam_index],
+        "subject": subject_codes[exam_index],
+        "subjects": subjects,
+        "batch": batch_codes[exam_index],
+        "batches": batches,
+        "grade": grade_codes,
+        "grades": grade_labels,
+    }
+
+def _group_percentiles(groups: np.ndarray, values: np.ndarray, by_value: np.ndarray, counts: np.ndarray, quantiles) -> np.ndarray:
+    """(groups x quantiles) linear-interpolated percentiles, all groups in one pass"""
+    # values are argsorted once by the caller; a stable sort on the small group codes (radix sort
+    # for 16-bit keys) then yields values ordered within each group, far cheaper than a lexsort
+    codes = groups[by_value]
+    if len(counts) <= np.iinfo(np.uint16).max:
+        codes = codes.astype(np.uint16)
+    ordered = values[by_value[np.argsort(codes, kind="stable")]]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    positions = starts[:, None] + np.asarray(quantiles, dtype=np.float64)[None, :] / 100 * np.maximum(counts - 1, 0)[:, None]
+    lower = np.floor(positions).astype(np.intp)
+    upper = np.minimum(lower + 1, (starts + np.maximum(counts - 1, 0))[:, None])
+    fraction = positions - lower
+    # Empty groups (exams without results) would point past the end; their rows are dropped by the caller
+    lower, upper = np.minimum(lower, len(ordered) - 1), np.minimum(upper, len(ordered) - 1)
+    return ordered[lower] * (1 - fraction) + ordered[upper] * fraction
+
+def group_stats(groups: np.ndarray, size: int, data: Dict[str, np.ndarray]) -> List[dict]:
+    """Statistics for each group code 0..size-1 of `groups`"""
+    marks, max_marks, percentage = data["marks"], data["max_marks"], data["percentage"]
+    counts = np.bincount(groups, minlength=size)
+    total_marks = np.bincount(groups, weights=marks, minlength=size)
+    total_possible = np.bincount(groups, weights=max_marks, minlength=size)
+    safe_counts = np.maximum(counts, 1)
+    mean = np.bincount(groups, weights=percentage, minlength=size) / safe_counts
+    variance = np.bincount(groups, weights=data["percentage_squared"], minlength=size) / safe_counts - mean ** 2
+    std = np.sqrt(np.maximum(variance, 0))
+    passed = np.bincount(groups, weights=data["passed"], minlength=size)
+    quantiles = _group_percentiles(groups, percentage, data["by_percentage"], counts, (50,) + PERCENTILES)
+    grade_count = len(data["grades"])
+    histogram = np.bincount(groups * grade_count + data["grade"], minlength=size * grade_count).reshape(size, grade_count)
+
+    stats = []
+    for g in range(size):
+        stats.append({
+            "count": int(counts[g]),
+            "total_marks": float(total_marks[g]),
+            "total_possible": float(total_possible[g]),
+            "percentage": round(float(total_marks[g] / total_possible[g] * 100), 2) if total_possible[g] > 0 else 0,
+            "mean": round(float(mean[g]), 2),
+            "median": round(float(quantiles[g, 0]), 2),
+            "std": round(float(std[g]), 2),
+            "percentiles": {f"p{q}": round(float(v), 2) for q, v in zip(PERCENTILES, quantiles[g, 1:])},
+            "pass_rate": round(float(passed[g] / safe_counts[g] * 100), 2),
+            "grades": {label: int(n) for label, n in zip(data["grades"], histogram[g]) if n},
+        })
+    return stats
+
+def performance_summary(data: Dict[str, np.ndarray], pass_percentage: float) -> dict:
+    marks, max_marks = data["marks"], data["max_marks"]
+    percentage = np.divide(marks * 100, max_marks, out=np.zeros_like(marks), where=max_marks > 0)
+    # Shared by every grouping below
+    data = {
+        **data,
+        "percentage": percentage,
+        "percentage_squared": percentage ** 2,
+        "passed": (percentage >= pass_percentage).astype(np.float64),
+        "by_percentage": np.argsort(percentage),
+    }
+    overall = group_stats(np.zeros(len(marks), dtype=np.intp), 1, data)[0]
+    by_subject = group_stats(data["subject"], len(data["subjects"]), data)
+    by_batch = group_stats(data["batch"], len(data["batches"]), data)
+    return {
+        "overall": {
+            "total_results": overall["count"],
+            "average_percentage": overall["percentage"],
+            "grade_distribution": overall["grades"],
+            **{key: overall[key] for key in ("mean", "median", "std", "percentiles", "pass_rate")}
+        },
+        "by_subject": {subject: stats for subject, stats in zip(data["subjects"], by_subject) if stats["count"]},
+        "by_batch": {batch: stats for batch, stats in zip(data["batches"], by_batch) if stats["count"]},
+        "pass_percentage": pass_percentage
+    }
@@ -0,0 +1,164 @@
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlmodel import select
+from ..config import settings
+from ..models import Permission, RolePermission, UserPermission, UserRole
+
+_PERMISSION_FIELDS = ("id", "name", "description", "resource", "action", "created_at")
+
+def _role_key(role) -> str:
+    # str-Enum members don't hash like their value, so always key by the plain string
+    return role.value if isinstance(role, UserRole) else role
+
+class _Compiled:
+    """One consistent set of bitsets; replaced as a whole, never changed while readers can see it"""
+
+    def __init__(self, permissions=None, bits=None, pair_masks=None, role_masks=None, user_masks=None):
+        self.permissions: Dict[int, dict] = permissions or {}
+        self.bits: Dict[int, int] = bits or {}
+        self.pair_masks: Dict[Tuple[str, str], int] = pair_masks or {}
+        self.role_masks: Dict[str, int] = role_masks or {}
+        self.user_masks: Dict[int, int] = user_masks or {}
+
+    def copy(self) -> "_Compiled":
+        return _Compiled(dict(self.permissions), dict(self.bits), dict(self.pair_masks),
+                         dict(self.role_masks), dict(self.user_masks))
+
+    def add_permission(self, values: dict):
+        permission_id = values["id"]
+        old = self.permissions.get(permission_id)
+        bit = self.bits.setdefault(permission_id, 1 << len(self.bits))
+        if old is not None:
+            self._drop_pair(old, bit)
+        self.permissions[permission_id] = values
+        pair = (values["resource"], values["action"])
+        self.pair_masks[pair] = self.pair_masks.get(pair, 0) | bit
+
+    def _drop_pair(self, values: dict, bit: int):
+        pair = (values["resource"], values["action"])
+        remaining = self.pair_masks.get(pair, 0) & ~bit
+        if remaining:
+            self.pair_masks[pair] = remaining
+        else:
+            self.pair_masks.pop(pair, None)
+
+    def set_grant(self, masks: dict, key, permission_id: int, granted: bool):
+        bit = self.bits.get(permission_id)
+        if bit is None:
+            return
+        mask = masks.get(key, 0) | bit if granted else masks.get(key, 0) & ~bit
+        if mask:
+            masks[key] = mask
+        else:
+            masks.pop(key, None)
+
+class PermissionMatrix:
+    """
+    Permission, RolePermission and UserPermission compiled into bitsets:
+    one bit per permission, a mask per interned (resource, action) pair, a
+    granted mask per role and sparse granted masks for users with overrides.
+    A check is two dict lookups and an AND. Loads and committed changes
+    build a new _Compiled and swap it in, so a check reading the current one
+    without the lock never mixes bit numbers of two versions.
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self.version = 0
+        self._lock = threading.Lock()
+        self._loaded_at = None
+        self._compiled = _Compiled()
+
+    def load(self, session):
+        permissions = session.exec(select(Permission).order_by(Permission.id)).all()
+        role_grants = session.exec(
+            select(RolePermission.role, RolePermission.permission_id).where(RolePermission.granted == True)
+        ).all()
+        user_grants = session.exec(
+            select(UserPermission.user_id, UserPermission.permission_id).where(UserPermission.granted == True)
+        ).all()
+        compiled = _Compiled()
+        for permission in permissions:
+            compiled.add_permission({field: getattr(permission, field) for field in _PERMISSION_FIELDS})
+        for role, permission_id in role_grants:
+            compiled.set_grant(compiled.role_masks, _role_key(role), permission_id, True)
+        for user_id, permission_id in user_grants:
+            compiled.set_grant(compiled.user_masks, user_id, permission_id, True)
+        with self._lock:
+            self._compiled = compiled
+            self._loaded_at = time.monotonic()
+            self.version += 1
+
+    def ensure_loaded(self, session):
+        # Full reload now and then picks up writes made by other worker processes
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_seconds:
+            self.load(session)
+
+    def has_permission(self, role, user_id: Optional[int], resource: str, action: str) -> bool:
+        compiled = self._compiled
+        mask = compiled.pair_masks.get((resource, action))
+        if not mask:
+            return False
+        return bool((compiled.role_masks.get(_role_key(role), 0) | compiled.user_masks.get(user_id, 0)) & mask)
+
+    def permissions_for(self, role, user_id: Optional[int] = None) -> List[dict]:
+        compiled = self._compiled
+        granted = compiled.role_masks.get(_role_key(role), 0) | compiled.user_masks.get(user_id, 0)
+        return [permission for permission_id, permission in compiled.permissions.items() if granted & compiled.bits[permission_id]]
+
+    def apply(self, changes):
+        """Apply committed writes collected by the session listeners below"""
+        if self._loaded_at is None:
+            return
+        with self._lock:
+            compiled = self._compiled.copy()
+            for kind, values in changes:
+                if kind == "permission":
+                    compiled.add_permission(values)
+                elif kind == "role":
+                    compiled.set_grant(compiled.role_masks, _role_key(values["role"]), values["permission_id"], values["granted"])
+                elif kind == "user":
+                    compiled.set_grant(compiled.user_masks, values["user_id"], values["permission_id"], values["granted"])
+                else:
+                    # Deletes are rare; recompile from scratch on the next check
+                    self._loaded_at = None
+            self._compiled = compiled
+            self.version += 1
+
+permission_matrix = PermissionMatrix(settings.PERMISSION_MATRIX_REFRESH_SECONDS)
+
+def _snapshot(instance):
+    if isinstance(instance, Permission):
+        return "permission", {field: getattr(instance, field) for field in _PERMISSION_FIELDS}
+    if isinstance(instance, RolePermission):
+        return "role", {"role": instance.role, "permission_id": instance.permission_id, "granted": instance.granted}
+    if isinstance(instance, UserPermission):
+        return "user", {"user_id": instance.user_id, "permission_id": instance.permission_id, "granted": instance.granted}
+    return None
+
+# Changes are collected at flush and applied only once the transaction commits
+@event.listens_for(Session, "after_flush")
+def _collect_permission_changes(session, flush_context):
+    changes = []
+    for instance in (*session.new, *session.dirty):
+        change = _snapshot(instance)
+        if change:
+            changes.append(change)
+    for instance in session.deleted:
+        if _snapshot(instance):
+            changes.append(("reload", None))
+    if changes:
+        session.info.setdefault("permission_changes", []).extend(changes)
+
+@event.listens_for(Session, "after_commit")
+def _apply_permission_changes(session):
+    changes = session.info.pop("permission_changes", None)
+    if changes:
+        permission_matrix.apply(changes)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_permission_changes(session):
+    session.info.pop("permission_changes", None)
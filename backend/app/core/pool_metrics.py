@@ -0,0 +1,112 @@
+import threading
+import time
+from typing import Dict, List
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+# Histogram bucket upper bounds
+WAIT_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+COUNT_BUCKETS = [0, 1, 2, 4, 8, 16, 32, 64, 128]
+
+class Histogram:
+    """Fixed-bucket histogram, cheap enough to update on every checkout"""
+
+    def __init__(self, buckets: List[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.total += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def snapshot(self) -> dict:
+        labels = [f"le_{bound}" for bound in self.buckets] + ["inf"]
+        return {
+            "count": self.total,
+            "avg": round(self.sum / self.total, 3) if self.total else 0,
+            "max": round(self.max, 3),
+            "buckets": dict(zip(labels, self.counts))
+        }
+
+class PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.wait_ms = Histogram(WAIT_BUCKETS_MS)
+        self.checked_out = Histogram(COUNT_BUCKETS)
+        self.overflow = Histogram(COUNT_BUCKETS)
+        self.timeouts = 0
+
+    def observe_checkout(self, pool: QueuePool, wait_seconds: float):
+        with self._lock:
+            self.wait_ms.observe(wait_seconds * 1000)
+            self.checked_out.observe(pool.checkedout())
+            self.overflow.observe(max(pool.overflow(), 0))
+
+    def observe_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+# One metrics object per pool_logging_name, shared by pools recreated on dispose()
+pool_metrics: Dict[str, PoolMetrics] = {}
+_pool_metrics_lock = threading.Lock()
+
+def _metrics_for(name: str) -> PoolMetrics:
+    metrics = pool_metrics.get(name)
+    if metrics is None:
+        with _pool_metrics_lock:
+            metrics = pool_metrics.setdefault(name, PoolMetrics())
+    return metrics
+
+class _InstrumentedPoolMixin:
+    def _do_get(self):
+        metrics = _metrics_for(self.logging_name or "default")
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            # Connect errors and the like are not the pool running dry
+            metrics.observe_timeout()
+            raise
+        metrics.observe_checkout(self, time.perf_counter() - started)
+        return connection
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+def pool_status(engine) -> dict:
+    """Live pool state plus the recorded histograms for one engine"""
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+            "timeout_seconds": pool.timeout()
+        })
+    metrics = pool_metrics.get(pool.logging_name or "default")
+    if metrics:
+        with metrics._lock:
+            status.update({
+                "wait_ms": metrics.wait_ms.snapshot(),
+                "checked_out_histogram": metrics.checked_out.snapshot(),
+                "overflow_histogram": metrics.overflow.snapshot(),
+                "checkout_timeouts": metrics.timeouts
+            })
+    return status
@@ -0,0 +1,135 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from ..config import settings
+from ..models import User, Teacher, Student
+
+class PrincipalCache:
+    """
+    Bounded TTL/LRU cache of authenticated principals, keyed by token hash.
+    Stores plain column values, never ORM instances, so nothing is shared
+    between sessions or threads.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, user_id, principal values)
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+        # Bumped on every eviction; a lookup that started before one must not cache what it read
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key: str, user_id: int, values: dict, expires_in: float, generation: Optional[int] = None):
+        if not self.enabled:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + min(self.ttl, expires_in), user_id, values)
+            self._keys_by_user.setdefault(user_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def evict_user(self, user_id: int):
+        with self._lock:
+            self.generation += 1
+            for key in self._keys_by_user.pop(user_id, ()):
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def _remove(self, key: str):
+        _, user_id, _ = self._entries.pop(key)
+        keys = self._keys_by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user_id]
+
+principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_TTL_SECONDS, settings.PRINCIPAL_CACHE_MAX_ENTRIES)
+
+_USER_COLUMNS = [attr.key for attr in inspect(User).column_attrs]
+
+def snapshot_user(user: User) -> dict:
+    return {key: getattr(user, key) for key in _USER_COLUMNS}
+
+def rehydrate_user(values: dict, session) -> User:
+    """Rebuild a cached user as a persistent instance of this request's session"""
+    identity = session.identity_map.get(inspect(User).identity_key_from_primary_key([values["id"]]))
+    if identity is not None:
+        return identity
+    user = User(**values)
+    make_transient_to_detached(user)
+    session.add(user)
+    return user
+
+def _linked_user_ids(instance):
+    # Current and previous user_id of a teacher/student row
+    history = inspect(instance).attrs.user_id.history
+    return {user_id for user_id in (instance.user_id, *history.deleted) if user_id is not None}
+
+# Any committed change to a user, or to the teacher/student row linked to it, drops
+# its cached tokens, so updates, deactivation and deletes through any router
+# take effect on the next request. Users are collected at flush and evicted only
+# after the commit: evicting earlier would let a concurrent request re-cache the
+# still-committed old row.
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_users(session, flush_context):
+    user_ids = session.info.setdefault("principal_cache_evict", set())
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, User) and instance.id is not None:
+            user_ids.add(instance.id)
+        elif isinstance(instance, (Teacher, Student)):
+            user_ids.update(_linked_user_ids(instance))
+
+# Bulk UPDATE/DELETE statements don't say which rows they touch
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_principal_changes(orm_execute_state):
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and \
+            orm_execute_state.bind_mapper in (inspect(User), inspect(Teacher), inspect(Student)):
+        orm_execute_state.session.info["principal_cache_clear"] = True
+
+@event.listens_for(Session, "after_commit")
+def _evict_committed_users(session):
+    user_ids = session.info.pop("principal_cache_evict", None)
+    if session.info.pop("principal_cache_clear", False):
+        principal_cache.clear()
+    elif user_ids:
+        for user_id in user_ids:
+            principal_cache.evict_user(user_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_collected_users(session):
+    session.info.pop("principal_cache_evict", None)
+    session.info.pop("principal_cache_clear", None)
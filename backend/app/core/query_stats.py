@@ -0,0 +1,123 @@
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from ..config import settings
+
+logger = logging.getLogger("app.db")
+
+class QueryStats:
+    """Statements issued while serving one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+        # Statements run inside outside_budget(): reported, but not held against the route's budget
+        self.unbudgeted = 0
+        self._outside_budget = 0
+
+    @property
+    def duration_ms(self) -> float:
+        return round(self.duration * 1000, 2)
+
+    @property
+    def budgeted(self) -> int:
+        return self.count - self.unbudgeted
+
+    def repeated(self, threshold: int):
+        return [(statement, n) for statement, n in self.statements.most_common() if n >= threshold]
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+# Registered on the Engine class, so every engine (primary, replica, async) is counted
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None or not conn.info.get("query_started"):
+        return
+    stats.duration += time.perf_counter() - conn.info["query_started"].pop()
+    stats.count += 1
+    stats.statements[statement] += 1
+    if stats._outside_budget:
+        stats.unbudgeted += 1
+
+def query_budget(max_queries: int):
+    """Declare the most statements a route may issue per request"""
+    def decorator(endpoint):
+        endpoint.query_budget = max_queries
+        return endpoint
+    return decorator
+
+@contextmanager
+def outside_budget():
+    """Statements the client opted into (e.g. include_total counts) don't count against query_budget"""
+    stats = _current_stats.get()
+    if stats is None:
+        yield
+        return
+    stats._outside_budget += 1
+    try:
+        yield
+    finally:
+        stats._outside_budget -= 1
+
+class QueryStatsMiddleware:
+    """Counts statements and DB time per request, reports them in X-DB-* headers and logs"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(stats.count).encode()))
+                headers.append((b"x-db-time-ms", str(stats.duration_ms).encode()))
+                budget = getattr(scope.get("endpoint"), "query_budget", None)
+                if budget is not None:
+                    headers.append((b"x-db-query-budget", str(budget).encode()))
+                    if stats.budgeted > budget:
+                        headers.append((b"x-db-query-budget-exceeded", b"1"))
+                        logger.warning(
+                            "%s %s issued %d queries, budget is %d",
+                            scope["method"], scope["path"], stats.budgeted, budget
+                        )
+                message["headers"] = headers
+                self._log(scope, message["status"], stats)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current_stats.reset(token)
+
+    def _log(self, scope, status_code, stats):
+        logger.info(
+            "%s %s %s queries=%d db_time_ms=%s",
+            scope["method"], scope["path"], status_code, stats.count, stats.duration_ms
+        )
+        for statement, n in stats.repeated(settings.DB_N_PLUS_ONE_THRESHOLD):
+            logger.warning(
+                "Possible N+1 in %s %s: statement ran %d times: %s",
+                scope["method"], scope["path"], n, " ".join(statement.split())[:200]
+            )
@@ -0,0 +1,138 @@
+import ipaddress
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Tuple
+from fastapi import HTTPException, Request, status
+from ..config import settings
+
+class RateLimitBackend(ABC):
+    """
+    Token-bucket store. take() refills the bucket for the time elapsed since
+    its last use, then removes `cost` tokens if that many are available.
+    Returns (allowed, seconds until enough tokens are back).
+    """
+
+    @abstractmethod
+    def take(self, key: str, capacity: float, refill_per_second: float, cost: float = 1) -> Tuple[bool, float]:
+        ...
+
+    @abstractmethod
+    def reset(self, key: str):
+        ...
+
+class MemoryBackend(RateLimitBackend):
+    """Per-process buckets; each uvicorn worker enforces its own limits"""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, refill_per_second, cost=1):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill_per_second)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            # Evicting the least recently used bucket only ever forgives a client
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, 0.0 if allowed else (cost - tokens) / refill_per_second
+
+    def reset(self, key):
+        with self._lock:
+            self._buckets.pop(key, None)
+
+def create_backend(url: str) -> RateLimitBackend:
+    if url == "memory":
+        return MemoryBackend()
+    raise ValueError(f"Unsupported rate limit backend: {url}")
+
+class LoginLimiter:
+    """
+    Admission control in front of password verification: one bucket per
+    client IP and one per username, both charged before bcrypt runs.
+    Rejections are cheap 429s; a failing shared backend lets logins through.
+    """
+
+    def __init__(self, backend: RateLimitBackend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._counts = {"allowed": 0, "limited_ip": 0, "limited_username": 0, "backend_errors": 0}
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counts[name] += 1
+
+    def _take(self, key: str, burst: int, per_minute: float) -> Tuple[bool, float]:
+        try:
+            return self.backend.take(key, burst, per_minute / 60)
+        except Exception:
+            self._count("backend_errors")
+            return True, 0.0
+
+    def check(self, ip: Optional[str], username: str) -> Optional[Tuple[str, float]]:
+        """None when the attempt may proceed, else (which limit, retry after seconds)"""
+        if not self.enabled:
+            return None
+        # IP first, so a blocked address can't drain the bucket of the accounts it targets
+        allowed, retry_after = self._take(f"login:ip:{ip or 'unknown'}", settings.LOGIN_IP_BURST, settings.LOGIN_IP_PER_MINUTE)
+        if not allowed:
+            self._count("limited_ip")
+            return "ip", retry_after
+        allowed, retry_after = self._take(
+            f"login:user:{username.strip().lower()}", settings.LOGIN_USERNAME_BURST, settings.LOGIN_USERNAME_PER_MINUTE
+        )
+        if not allowed:
+            self._count("limited_username")
+            return "username", retry_after
+        self._count("allowed")
+        return None
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+        return {"enabled": self.enabled, "backend": type(self.backend).__name__, **counts}
+
+_trusted_proxies = [ipaddress.ip_network(proxy, strict=False) for proxy in settings.TRUSTED_PROXIES]
+
+def _is_trusted_proxy(address: Optional[str]) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in _trusted_proxies)
+
+def client_ip(request: Request) -> Optional[str]:
+    """
+    The connecting address, unless that is one of TRUSTED_PROXIES: then the
+    last CLIENT_IP_HEADER entry not added by a trusted proxy. Entries further
+    left were written by the client and can be forged.
+    """
+    peer = request.client.host if request.client else None
+    if not _is_trusted_proxy(peer):
+        return peer
+    forwarded = [entry.strip() for entry in request.headers.get(settings.CLIENT_IP_HEADER, "").split(",") if entry.strip()]
+    for address in reversed(forwarded):
+        if not _is_trusted_proxy(address):
+            return address
+    return forwarded[0] if forwarded else peer
+
+login_limiter = LoginLimiter(create_backend(settings.LOGIN_RATE_LIMIT_BACKEND), enabled=settings.LOGIN_RATE_LIMIT_ENABLED)
+
+def limit_login(request: Request, username: str):
+    rejected = login_limiter.check(client_ip(request), username)
+    if rejected:
+        limit, retry_after = rejected
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many sign-in attempts, please retry later",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after))), "X-RateLimit-Scope": limit},
+        )
@@ -0,0 +1,213 @@
+"""
+Notification retention: deletes old notifications in small batches, each
+its own short transaction (DELETE ... WHERE id IN (SELECT id ... ORDER BY
+created_at LIMIT n)), pausing between batches so notification writes never
+queue behind one long delete. Runs on an in-process scheduler thread and
+can be triggered from the admin maintenance endpoint.
+"""
+
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import delete, func
+from sqlmodel import select
+from ..config import settings
+from ..database import engine
+from ..models import Notification, NotificationType
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary key for the Postgres advisory lock that keeps one worker per database running the job
+ADVISORY_LOCK_KEY = 0x6E6F7469
+
+class RetentionBusy(Exception):
+    pass
+
+class Rule:
+    """Delete notifications of `types` (None: every type) created before `days` ago, read ones only unless `unread`"""
+
+    def __init__(self, name: str, days: int, types: Optional[List[str]] = None, exclude: Optional[List[str]] = None,
+                 unread: bool = False):
+        self.name = name
+        self.days = days
+        self.types = types
+        self.exclude = exclude
+        self.unread = unread
+
+    def where(self, now: datetime):
+        conditions = [
+            Notification.created_at < now - timedelta(days=self.days),
+            Notification.is_read == (not self.unread),
+        ]
+        if self.types is not None:
+            conditions.append(Notification.notification_type.in_(self.types))
+        if self.exclude:
+            conditions.append(Notification.notification_type.not_in(self.exclude))
+        return conditions
+
+def build_rules(read_days: int, read_days_by_type: Dict[str, int], unread_days: Optional[int] = None) -> List[Rule]:
+    """One rule per type with its own retention, one for every other type, and optionally one for unread"""
+    by_type = {NotificationType(kind): days for kind, days in read_days_by_type.items()}
+    rules = [Rule(kind.value, days, types=[kind]) for kind, days in by_type.items()]
+    rules.append(Rule("default", read_days, exclude=list(by_type)))
+    if unread_days is not None:
+        rules.append(Rule("unread", unread_days, unread=True))
+    return rules
+
+class RetentionJob:
+    """
+    Batched deletes over a list of rules. One run at a time per process
+    (and per database on Postgres, via an advisory lock); progress of the
+    current run and the result of the last one are kept for stats().
+    """
+
+    def __init__(self, rules: List[Rule], batch_size: int = 1000, pause_seconds: float = 0.05):
+        self.rules = rules
+        self.batch_size = batch_size
+        self.pause_seconds = pause_seconds
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.progress: Optional[dict] = None
+        self.last_run: Optional[dict] = None
+        self.runs = 0
+
+    def _delete_batch(self, rule: Rule, now: datetime) -> int:
+        # created_at order follows ix_notification_created_at_read; the subquery keeps the delete index-bounded
+        batch = select(Notification.id).where(*rule.where(now)).order_by(Notification.created_at).limit(self.batch_size)
+        with engine.begin() as connection:
+            return connection.execute(delete(Notification).where(Notification.id.in_(batch))).rowcount
+
+    def _run_rules(self, rules: List[Rule], now: datetime):
+        for rule in rules:
+            self.progress["rule"] = rule.name
+            while not self._stop.is_set():
+                deleted = self._delete_batch(rule, now)
+                self.progress["deleted"][rule.name] = self.progress["deleted"].get(rule.name, 0) + deleted
+                self.progress["batches"] += 1
+                if deleted < self.batch_size:
+                    break
+                time.sleep(self.pause_seconds)
+
+    def run(self, rules: Optional[List[Rule]] = None, trigger: str = "manual") -> dict:
+        """Delete everything the rules select; raises RetentionBusy when a run is already in progress"""
+        if not self._lock.acquire(blocking=False):
+            raise RetentionBusy()
+        # stop() ends the run in progress, not every later one
+        self._stop.clear()
+        try:
+            with engine.connect() as lock_connection:
+                if engine.dialect.name == "postgresql":
+                    locked = lock_connection.execute(select(func.pg_try_advisory_lock(ADVISORY_LOCK_KEY))).scalar()
+                    lock_connection.commit()
+                    if not locked:
+                        raise RetentionBusy()
+                now = datetime.utcnow()
+                self.progress = {"trigger": trigger, "started_at": now.isoformat(), "rule": None, "batches": 0, "deleted": {}}
+                try:
+                    self._run_rules(rules or self.rules, now)
+                finally:
+                    if engine.dialect.name == "postgresql":
+                        lock_connection.execute(select(func.pg_advisory_unlock(ADVISORY_LOCK_KEY)))
+                        lock_connection.commit()
+            result = {
+                **self.progress,
+                "rule": None,
+                "finished_at": datetime.utcnow().isoformat(),
+                "total_deleted": sum(self.progress["deleted"].values()),
+                "stopped": self._stop.is_set(),
+            }
+            self.runs += 1
+            self.last_run = result
+            return result
+        finally:
+            self.progress = None
+            self._lock.release()
+
+    def run_in_background(self, rules: Optional[List[Rule]] = None, trigger: str = "manual") -> bool:
+        """Start a run on its own thread; False when one is already in progress"""
+        if self._lock.locked():
+            return False
+        def target():
+            try:
+                self.run(rules, trigger)
+            except RetentionBusy:
+                pass
+            except Exception:
+                logger.exception("Notification retention run failed")
+        threading.Thread(target=target, name="notification-retention-run", daemon=True).start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> dict:
+        return {
+            "running": self.progress is not None,
+            "progress": self.progress,
+            "last_run": self.last_run,
+            "runs": self.runs,
+            "batch_size": self.batch_size,
+            "rules": [
+                {"name": rule.name, "days": rule.days, "unread": rule.unread} for rule in self.rules
+            ],
+        }
+
+class RetentionScheduler:
+    """Daemon thread running a job every `interval_seconds`; the first run comes after up to five minutes of jitter"""
+
+    def __init__(self, job: RetentionJob, interval_seconds: float):
+        self.job = job
+        self.interval_seconds = interval_seconds
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.next_run_at: Optional[float] = None
+
+    def _loop(self):
+        # Jitter spreads the workers of one deployment (and restarts) over the interval
+        delay = random.uniform(0, min(self.interval_seconds, 300))
+        while True:
+            self.next_run_at = time.time() + delay
+            if self._stopped.wait(delay):
+                return
+            try:
+                self.job.run(trigger="schedule")
+            except RetentionBusy:
+                pass
+            except Exception:
+                logger.exception("Scheduled notification retention run failed")
+            delay = self.interval_seconds
+
+    def start(self):
+        if self.interval_seconds > 0 and (self._thread is None or not self._thread.is_alive()):
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._loop, name="notification-retention", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self.job.stop()
+
+    def stats(self) -> dict:
+        return {
+            "running": self._thread is not None and not self._stopped.is_set(),
+            "interval_seconds": self.interval_seconds,
+            "next_run_at": datetime.utcfromtimestamp(self.next_run_at).isoformat() if self.next_run_at else None,
+        }
+
+def create_retention() -> Tuple[RetentionJob, RetentionScheduler]:
+    job = RetentionJob(
+        build_rules(
+            settings.NOTIFICATION_RETENTION_DAYS,
+            settings.NOTIFICATION_RETENTION_DAYS_BY_TYPE,
+            settings.NOTIFICATION_RETENTION_UNREAD_DAYS,
+        ),
+        batch_size=settings.NOTIFICATION_RETENTION_BATCH_SIZE,
+        pause_seconds=settings.NOTIFICATION_RETENTION_PAUSE_SECONDS,
+    )
+    interval = settings.NOTIFICATION_RETENTION_INTERVAL_MINUTES * 60 if settings.NOTIFICATION_RETENTION_ENABLED else 0
+    return job, RetentionScheduler(job, interval)
+
+notification_retention, retention_scheduler = create_retention()
@@ -0,0 +1,286 @@
+"""
+Typeahead search over the user, student and teacher directory. On Postgres
+the substring match (ILIKE '%q%') is served by pg_trgm GIN indexes and
+ranked with similarity(); elsewhere (SQLite) an in-process trigram index,
+kept current like the permission matrix (full reload now and then, this
+worker's own commits applied as they happen), answers the same query.
+Both rank exact matches first, then prefixes, then other substrings, each
+group by how much of the matched field the query covers.
+"""
+
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import case, event, func, or_
+from sqlalchemy.orm import Session
+from sqlmodel import select
+from ..config import settings
+from ..models import Student, Teacher, User
+
+KINDS = ("users", "students", "teachers")
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def _hit(kind: str, id: int, title: Optional[str], subtitle: Optional[str], score: float, **data) -> dict:
+    return {"type": kind, "id": id, "title": title, "subtitle": subtitle, "score": round(float(score), 4), **data}
+
+# Postgres: trigram indexes
+
+def _sql_score(columns, q: str):
+    lowered, prefix = q.lower(), _escape_like(q) + "%"
+    exact = or_(*[func.lower(column) == lowered for column in columns])
+    starts = or_(*[column.ilike(prefix, escape="\\") for column in columns])
+    similarity = func.greatest(*[func.similarity(func.coalesce(column, ""), q) for column in columns])
+    return case((exact, 3.0), (starts, 2.0), else_=1.0) + similarity
+
+def _sql_match(columns, q: str):
+    pattern = "%" + _escape_like(q) + "%"
+    return or_(*[column.ilike(pattern, escape="\\") for column in columns])
+
+def _sql_search(session, q: str, kinds: List[str], limit: int) -> List[dict]:
+    hits = []
+    if "users" in kinds:
+        columns = [User.username, User.full_name, User.email]
+        score = _sql_score(columns, q)
+        for id, username, full_name, email, role, is_active, rank in session.exec(
+            select(User.id, User.username, User.full_name, User.email, User.role, User.is_active, score)
+            .where(_sql_match(columns, q)).order_by(score.desc(), User.id).limit(limit)
+        ).all():
+            hits.append(_hit("users", id, full_name or username, email, rank,
+                             username=username, role=role, is_active=is_active))
+    if "students" in kinds:
+        columns = [Student.full_name, Student.student_id, Student.email]
+        score = _sql_score(columns, q)
+        for id, full_name, student_id, email, batch_id, rank in session.exec(
+            select(Student.id, Student.full_name, Student.student_id, Student.email, Student.batch_id, score)
+            .where(_sql_match(columns, q)).order_by(score.desc(), Student.id).limit(limit)
+        ).all():
+            hits.append(_hit("students", id, full_name, student_id or email, rank,
+                             student_id=student_id, batch_id=batch_id))
+    if "teachers" in kinds:
+        columns = [User.full_name, User.email, Teacher.employee_id]
+        score = _sql_score(columns, q)
+        for id, full_name, email, employee_id, user_id, rank in session.exec(
+            select(Teacher.id, User.full_name, User.email, Teacher.employee_id, Teacher.user_id, score)
+            .join(User, Teacher.user_id == User.id)
+            .where(_sql_match(columns, q)).order_by(score.desc(), Teacher.id).limit(limit)
+        ).all():
+            hits.append(_hit("teachers", id, full_name, employee_id or email, rank,
+                             employee_id=employee_id, user_id=user_id))
+    return hits
+
+# Everywhere else: in-process trigram index
+
+def _trigrams(value: str) -> Set[str]:
+    return {value[i:i + 3] for i in range(len(value) - 2)}
+
+class DirectoryIndex:
+    """
+    Trigram postings over lower-cased searchable fields. A query of three or
+    more characters intersects the postings of its trigrams, rarest first,
+    and only those candidates are checked for the substring; shorter queries
+    scan the documents of the requested kinds.
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._loaded_at = None
+        # (kind, id) -> (searchable fields, hit without score)
+        self._docs: Dict[Tuple[str, int], Tuple[Tuple[str, ...], dict]] = {}
+        self._postings: Dict[str, Set[Tuple[str, int]]] = defaultdict(set)
+        self._users: Dict[int, dict] = {}
+        self._teachers: Dict[int, dict] = {}
+        self._teacher_by_user: Dict[int, int] = {}
+
+    def load(self, session):
+        users = session.exec(
+            select(User.id, User.username, User.full_name, User.email, User.role, User.is_active)
+        ).all()
+        students = session.exec(
+            select(Student.id, Student.full_name, Student.student_id, Student.email, Student.batch_id)
+        ).all()
+        teachers = session.exec(select(Teacher.id, Teacher.employee_id, Teacher.user_id)).all()
+        with self._lock:
+            self._docs, self._postings = {}, defaultdict(set)
+            self._users, self._teachers, self._teacher_by_user = {}, {}, {}
+            for id, username, full_name, email, role, is_active in users:
+                self._put_user({"id": id, "username": username, "full_name": full_name, "email": email,
+                                "role": role, "is_active": is_active})
+            for id, full_name, student_id, email, batch_id in students:
+                self._put_student({"id": id, "full_name": full_name, "student_id": student_id,
+                                   "email": email, "batch_id": batch_id})
+            for id, employee_id, user_id in teachers:
+                self._put_teacher({"id": id, "employee_id": employee_id, "user_id": user_id})
+            self._loaded_at = time.monotonic()
+
+    def ensure_loaded(self, session):
+        # Full reload now and then picks up writes made by other worker processes
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_seconds:
+            self.load(session)
+
+    def _index(self, key: Tuple[str, int], fields: Tuple[Optional[str], ...], hit: dict):
+        self._unindex(key)
+        fields = tuple(value.lower() for value in fields if value)
+        self._docs[key] = (fields, hit)
+        for value in fields:
+            for gram in _trigrams(value):
+                self._postings[gram].add(key)
+
+    def _unindex(self, key: Tuple[str, int]):
+        old = self._docs.pop(key, None)
+        if old:
+            for value in old[0]:
+                for gram in _trigrams(value):
+                    postings = self._postings.get(gram)
+                    if postings is not None:
+                        postings.discard(key)
+                        if not postings:
+                            del self._postings[gram]
+
+    def _put_user(self, user: dict):
+        self._users[user["id"]] = user
+        self._index(("users", user["id"]), (user["username"], user["full_name"], user["email"]),
+                    _hit("users", user["id"], user["full_name"] or user["username"], user["email"], 0,
+                         username=user["username"], role=user["role"], is_active=user["is_active"]))
+        # A teacher's name and email live on their user
+        teacher_id = self._teacher_by_user.get(user["id"])
+        if teacher_id is not None:
+            self._put_teacher(self._teachers[teacher_id])
+
+    def _put_student(self, student: dict):
+        self._index(("students", student["id"]), (student["full_name"], student["student_id"], student["email"]),
+                    _hit("students", student["id"], student["full_name"], student["student_id"] or student["email"], 0,
+                         student_id=student["student_id"], batch_id=student["batch_id"]))
+
+    def _put_teacher(self, teacher: dict):
+        previous = self._teachers.get(teacher["id"])
+        if previous and previous["user_id"] != teacher["user_id"] and \
+                self._teacher_by_user.get(previous["user_id"]) == teacher["id"]:
+            # Moved to another user: the old one's updates must no longer re-index this teacher
+            del self._teacher_by_user[previous["user_id"]]
+        self._teachers[teacher["id"]] = teacher
+        if teacher["user_id"] is not None:
+            self._teacher_by_user[teacher["user_id"]] = teacher["id"]
+        user = self._users.get(teacher["user_id"])
+        if user is None:
+            # search_teachers joins on the user; without one the teacher is not listed
+            self._unindex(("teachers", teacher["id"]))
+            return
+        self._index(("teachers", teacher["id"]), (user["full_name"], user["email"], teacher["employee_id"]),
+                    _hit("teachers", teacher["id"], user["full_name"], teacher["employee_id"] or user["email"], 0,
+                         employee_id=teacher["employee_id"], user_id=teacher["user_id"]))
+
+    def _remove(self, kind: str, id: int):
+        self._unindex((kind, id))
+        if kind == "users":
+            self._users.pop(id, None)
+            teacher_id = self._teacher_by_user.get(id)
+            if teacher_id is not None:
+                self._unindex(("teachers", teacher_id))
+        elif kind == "teachers":
+            teacher = self._teachers.pop(id, None)
+            if teacher and teacher["user_id"] is not None:
+                self._teacher_by_user.pop(teacher["user_id"], None)
+
+    def search(self, q: str, kinds: List[str], limit: int) -> List[dict]:
+        q = q.lower()
+        with self._lock:
+            if len(q) >= 3:
+                postings = sorted((self._postings.get(gram, set()) for gram in _trigrams(q)), key=len)
+                candidates = set(postings[0]).intersection(*postings[1:]) if postings else set()
+            else:
+                candidates = self._docs.keys()
+            ranked = defaultdict(list)
+            for key in candidates:
+                if key[0] not in kinds:
+                    continue
+                fields, hit = self._docs[key]
+                best = 0.0
+                for value in fields:
+                    if q not in value:
+                        continue
+                    rank = 3.0 if value == q else 2.0 if value.startswith(q) else 1.0
+                    # Stand-in for similarity(): the share of the field the query covers
+                    best = max(best, rank + len(q) / len(value))
+                if best:
+                    ranked[key[0]].append((best, key[1], hit))
+        hits = []
+        for kind, matches in ranked.items():
+            matches.sort(key=lambda match: (-match[0], match[1]))
+            hits.extend({**hit, "score": round(score, 4)} for score, _, hit in matches[:limit])
+        return hits
+
+    def apply(self, changes):
+        """Apply committed writes collected by the session listeners below"""
+        if self._loaded_at is None:
+            return
+        with self._lock:
+            for kind, values in changes:
+                if kind == "users":
+                    self._put_user(values)
+                elif kind == "students":
+                    self._put_student(values)
+                elif kind == "teachers":
+                    self._put_teacher(values)
+                else:
+                    self._remove(*values)
+
+    def stats(self) -> dict:
+        return {"documents": len(self._docs), "trigrams": len(self._postings),
+                "loaded_seconds_ago": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None}
+
+directory_index = DirectoryIndex(settings.SEARCH_INDEX_REFRESH_SECONDS)
+
+def uses_trigram_indexes(session) -> bool:
+    if settings.SEARCH_BACKEND == "auto":
+        return session.get_bind().dialect.name == "postgresql"
+    return settings.SEARCH_BACKEND == "trigram"
+
+def search_directory(session, q: str, kinds: List[str], limit: int) -> List[dict]:
+    """Ranked hits across `kinds`, at most `limit` per kind, best first"""
+    if uses_trigram_indexes(session):
+        hits = _sql_search(session, q, kinds, limit)
+    else:
+        directory_index.ensure_loaded(session)
+        hits = directory_index.search(q, kinds, limit)
+    hits.sort(key=lambda hit: (-hit["score"], KINDS.index(hit["type"]), hit["id"]))
+    return hits
+
+def _snapshot(instance):
+    if isinstance(instance, User):
+        return "users", {field: getattr(instance, field) for field in ("id", "username", "full_name", "email", "role", "is_active")}
+    if isinstance(instance, Student):
+        return "students", {field: getattr(instance, field) for field in ("id", "full_name", "student_id", "email", "batch_id")}
+    if isinstance(instance, Teacher):
+        return "teachers", {field: getattr(instance, field) for field in ("id", "employee_id", "user_id")}
+    return None
+
+# Changes are collected at flush and applied only once the transaction commits
+@event.listens_for(Session, "after_flush")
+def _collect_directory_changes(session, flush_context):
+    if directory_index._loaded_at is None:
+        return
+    changes = []
+    for instance in (*session.new, *session.dirty):
+        change = _snapshot(instance)
+        if change:
+            changes.append(change)
+    for instance in session.deleted:
+        change = _snapshot(instance)
+        if change:
+            changes.append(("delete", (change[0], change[1]["id"])))
+    if changes:
+        session.info.setdefault("directory_changes", []).extend(changes)
+
+@event.listens_for(Session, "after_commit")
+def _apply_directory_changes(session):
+    changes = session.info.pop("directory_changes", None)
+    if changes:
+        directory_index.apply(changes)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_directory_changes(session):
+    session.info.pop("directory_changes", None)
@@ -1,30 +1,55 @@
+import hashlib
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
-from passlib.context import CryptContext
 from fastapi import HTTPException, status
 from app.config import settings
+from .passwords import PasswordPool, PasswordPoolBusy
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+password_pool = PasswordPool(
+    rounds=settings.BCRYPT_ROUNDS,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
 
 ALGORITHM = "HS256"
 
+def _password_job(method, *args):
+    try:
+        return method(*args)
+    except PasswordPoolBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins in progress, please retry shortly",
+            headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER_SECONDS)},
+        )
+
+def verify_password_and_update(plain_password, hashed_password):
+    """(valid, replacement hash when the stored one was made with a different cost)"""
+    return _password_job(password_pool.verify_and_update, plain_password, hashed_password)
+
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return verify_password_and_update(plain_password, hashed_password)[0]
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return _password_job(password_pool.hash, password)
 
-def create_access_token(subject: str, expires_delta: timedelta = None):
+def create_access_token(subject: str, expires_delta: timedelta = None, claims: dict = None):
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode = {"exp": expire, "sub": subject}
+    to_encode = {**(claims or {}), "exp": expire, "sub": subject}
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
 
-def decode_token(token: str):
+def token_key(token: str) -> str:
+    """Stable, non-reversible key for a bearer token"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def decode_token_claims(token: str) -> dict:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
-        subject: str = payload.get("sub")
-        if subject is None:
+        if payload.get("sub") is None:
             raise JWTError()
-        return subject
+        return payload
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
+
+def decode_token(token: str):
+    return decode_token_claims(token)["sub"]
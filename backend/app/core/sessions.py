@@ -0,0 +1,120 @@
+import hashlib
+import hmac
+import secrets
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import delete, update
+from sqlmodel import Session, select
+from ..config import settings
+from ..models import User, UserSession
+
+def _hash_secret(secret: str) -> str:
+    return hashlib.sha256(secret.encode()).hexdigest()
+
+def _invalid(detail: str = "Invalid refresh token"):
+    return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail)
+
+def _parse(refresh_token: str) -> Tuple[int, str]:
+    # "<session id>.<secret>": the id finds the row, only the secret's hash is stored
+    session_id, _, secret = (refresh_token or "").partition(".")
+    if not session_id.isdigit() or not secret:
+        raise _invalid()
+    return int(session_id), secret
+
+def _expiry(user_session: UserSession, now: datetime) -> datetime:
+    # Sliding idle window, capped at an absolute lifetime from the original sign-in
+    idle = now + timedelta(days=settings.REFRESH_TOKEN_IDLE_DAYS)
+    absolute = user_session.created_at + timedelta(days=settings.REFRESH_TOKEN_MAX_DAYS)
+    return min(idle, absolute)
+
+def open_session(session: Session, user: User, user_agent: Optional[str] = None) -> str:
+    """Start a device session for a freshly authenticated user and return its refresh token"""
+    now = datetime.utcnow()
+    secret = secrets.token_urlsafe(32)
+    user_session = UserSession(
+        user_id=user.id,
+        token_hash=_hash_secret(secret),
+        token_epoch=user.token_epoch or 0,
+        user_agent=(user_agent or "")[:200] or None,
+        created_at=now,
+        last_used_at=now,
+        expires_at=now,
+    )
+    user_session.expires_at = _expiry(user_session, now)
+    session.add(user_session)
+    session.commit()
+    return f"{user_session.id}.{secret}"
+
+def rotate_session(session: Session, refresh_token: str) -> Tuple[User, str]:
+    """
+    Exchange a refresh token for its successor. Presenting the secret this
+    session issued before the current one (after a short grace period for
+    racing tabs) means the token was copied, so the whole session is revoked
+    and both holders have to sign in again. Any other mismatch is a plain 401
+    that changes nothing: session ids are guessable, secrets are not.
+    """
+    session_id, secret = _parse(refresh_token)
+    row = session.exec(
+        select(UserSession, User).join(User, User.id == UserSession.user_id).where(UserSession.id == session_id)
+    ).first()
+    if not row:
+        raise _invalid()
+    user_session, user = row
+    now = datetime.utcnow()
+    if user_session.revoked_at or user_session.expires_at <= now:
+        raise _invalid("Session expired, please sign in again")
+    presented = _hash_secret(secret)
+    if not hmac.compare_digest(user_session.token_hash, presented):
+        reused = user_session.previous_token_hash is not None and \
+            hmac.compare_digest(user_session.previous_token_hash, presented)
+        grace = timedelta(seconds=settings.REFRESH_TOKEN_REUSE_GRACE_SECONDS)
+        if not reused or (user_session.last_used_at and now - user_session.last_used_at <= grace):
+            raise _invalid()
+        user_session.revoked_at = now
+        session.add(user_session)
+        session.commit()
+        raise _invalid("Refresh token reuse detected, session revoked")
+    if not user.is_active or user_session.token_epoch != (user.token_epoch or 0):
+        user_session.revoked_at = now
+        session.add(user_session)
+        session.commit()
+        raise _invalid("Session expired, please sign in again")
+
+    # Keep the loaded user usable after the commit below without another SELECT
+    session.expunge(user)
+    new_secret = secrets.token_urlsafe(32)
+    # Compare-and-swap on the old hash so two concurrent refreshes can't both win
+    rotated = session.exec(
+        update(UserSession)
+        .where(UserSession.id == session_id, UserSession.token_hash == user_session.token_hash)
+        .values(
+            token_hash=_hash_secret(new_secret),
+            previous_token_hash=user_session.token_hash,
+            rotation=UserSession.rotation + 1,
+            last_used_at=now,
+            expires_at=_expiry(user_session, now),
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    session.commit()
+    if not rotated:
+        raise _invalid()
+    return user, f"{session_id}.{new_secret}"
+
+def close_session(session: Session, refresh_token: str):
+    """Revoke the session behind a refresh token (logout); unknown tokens are ignored"""
+    session_id, secret = _parse(refresh_token)
+    session.exec(
+        update(UserSession)
+        .where(UserSession.id == session_id, UserSession.token_hash == _hash_secret(secret), UserSession.revoked_at == None)
+        .values(revoked_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    session.commit()
+
+def delete_user_sessions(session: Session, user_id: int):
+    """Remove every session of a user about to be deleted; part of the caller's transaction"""
+    session.exec(
+        delete(UserSession).where(UserSession.user_id == user_id).execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,59 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Tuple
+
+class SnapshotCache:
+    """
+    Short-lived, per-process snapshots of expensive read-only results.
+    Only one caller per key recomputes an expired snapshot; while it runs,
+    everyone else is served the previous snapshot, or waits for the first
+    one when there is none yet, so a dashboard refresh storm costs a single
+    query per TTL instead of one per request.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._snapshots: Dict[str, Tuple[float, Any]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        if self.ttl_seconds <= 0:
+            return compute()
+        snapshot = self._snapshots.get(key)
+        if snapshot and snapshot[0] > time.monotonic():
+            self.hits += 1
+            return snapshot[1]
+        lock = self._lock_for(key)
+        # Someone is already refreshing: hand out the stale snapshot rather than piling on
+        if snapshot and not lock.acquire(blocking=False):
+            self.hits += 1
+            return snapshot[1]
+        if not snapshot:
+            lock.acquire()
+        try:
+            snapshot = self._snapshots.get(key)
+            if snapshot and snapshot[0] > time.monotonic():
+                self.hits += 1
+                return snapshot[1]
+            self.misses += 1
+            value = compute()
+            self._snapshots[key] = (time.monotonic() + self.ttl_seconds, value)
+            return value
+        finally:
+            lock.release()
+
+    def invalidate(self, key: str = None):
+        if key is None:
+            self._snapshots.clear()
+        else:
+            self._snapshots.pop(key, None)
+
+    def stats(self) -> dict:
+        return {"ttl_seconds": self.ttl_seconds, "keys": len(self._snapshots), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,130 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import Integer, cast, event, false, inspect, literal_column, null, text, union_all
+from sqlalchemy.orm import Session
+from sqlmodel import select
+from ..config import settings
+from ..models import User, UserDeletion
+
+# Changes that must invalidate already-issued stateless tokens
+REVOKING_FIELDS = ("is_active", "role", "hashed_password")
+
+class TokenEpochs:
+    """
+    Revocation table for stateless tokens: the current token_epoch of every
+    user whose epoch is non-zero, plus the ids of inactive and deleted users.
+    Loaded once, then refreshed incrementally from rows whose updated_at moved;
+    deleted rows leave nothing behind, so deletions are read from userdeletion.
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._epochs = {}
+        self._inactive = set()
+        self._watermark = None
+        self._next_refresh = 0.0
+        self._lock = threading.Lock()
+
+    def apply(self, user_id: int, epoch: int, is_active: bool):
+        with self._lock:
+            if epoch:
+                self._epochs[user_id] = epoch
+            else:
+                self._epochs.pop(user_id, None)
+            if is_active:
+                self._inactive.discard(user_id)
+            else:
+                self._inactive.add(user_id)
+
+    def remove(self, user_id: int):
+        # A deleted user's tokens stay revoked until they expire
+        self.apply(user_id, 0, False)
+
+    def refresh(self, session, force: bool = False):
+        if not force and time.monotonic() < self._next_refresh:
+            return
+        self._next_refresh = time.monotonic() + self.refresh_seconds
+        # Overlap the previous window a little so rows written by other processes with a lagging clock aren't missed
+        started = datetime.utcnow() - timedelta(seconds=max(self.refresh_seconds, 1) * 2)
+        statement = select(User.id, User.token_epoch, User.is_active, literal_column("1").label("step"))
+        deleted = select(UserDeletion.user_id, cast(null(), Integer), false(), literal_column("0").label("step"))
+        if self._watermark is None:
+            statement = statement.where((User.token_epoch > 0) | (User.is_active == False))
+            # Tokens issued before this can no longer be valid anyway
+            deleted = deleted.where(
+                UserDeletion.deleted_at >= datetime.utcnow() - timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+            )
+        else:
+            statement = statement.where(User.updated_at >= self._watermark)
+            deleted = deleted.where(UserDeletion.deleted_at >= self._watermark)
+        # Deletions first: a row that exists again (a reused SQLite id) wins over its deletion
+        for user_id, epoch, is_active, step in session.execute(union_all(deleted, statement).order_by(text("step"))):
+            if step == 0:
+                self.remove(user_id)
+            else:
+                self.apply(user_id, epoch, is_active)
+        self._watermark = started
+
+    async def refresh_async(self, session):
+        if time.monotonic() < self._next_refresh:
+            return
+        await session.run_sync(lambda sync_session: self.refresh(sync_session, force=True))
+
+    def is_current(self, user_id: int, epoch: int) -> bool:
+        return user_id not in self._inactive and self._epochs.get(user_id, 0) == epoch
+
+    def stats(self) -> dict:
+        return {"tracked_epochs": len(self._epochs), "inactive": len(self._inactive)}
+
+token_epochs = TokenEpochs(settings.STATELESS_TOKEN_REFRESH_SECONDS)
+
+def set_rehashed_password(session, user: User, new_hash: str):
+    """Store a stronger hash of the same password; unlike a password change this revokes nothing"""
+    user.hashed_password = new_hash
+    session.info.setdefault("password_rehash", set()).add(user.id)
+
+@event.listens_for(Session, "before_flush")
+def _bump_token_epochs(session, flush_context, instances):
+    rehashed = session.info.get("password_rehash", ())
+    for instance in session.dirty:
+        if isinstance(instance, User):
+            state = inspect(instance)
+            fields = [
+                field for field in REVOKING_FIELDS
+                if not (field == "hashed_password" and instance.id in rehashed)
+            ]
+            if any(state.attrs[field].history.has_changes() for field in fields):
+                instance.token_epoch = (instance.token_epoch or 0) + 1
+                # updated_at is the cursor other processes refresh from
+                instance.updated_at = datetime.utcnow()
+    # Recorded in this transaction, so the deletion can't commit without it
+    for instance in session.deleted:
+        if isinstance(instance, User) and instance.id is not None:
+            session.add(UserDeletion(user_id=instance.id, deleted_at=datetime.utcnow()))
+
+# Collected at flush, applied once the transaction commits so a rollback leaves the table alone
+@event.listens_for(Session, "after_flush")
+def _collect_token_epochs(session, flush_context):
+    changes = session.info.setdefault("token_epochs", [])
+    for instance in (*session.new, *session.dirty):
+        if isinstance(instance, User) and instance.id is not None:
+            changes.append((instance.id, instance.token_epoch or 0, instance.is_active))
+    for instance in session.deleted:
+        if isinstance(instance, User) and instance.id is not None:
+            changes.append((instance.id, None, False))
+
+@event.listens_for(Session, "after_commit")
+def _apply_token_epochs(session):
+    session.info.pop("password_rehash", None)
+    # This process sees its own revocations immediately
+    for user_id, epoch, is_active in session.info.pop("token_epochs", ()):
+        if epoch is None:
+            token_epochs.remove(user_id)
+        else:
+            token_epochs.apply(user_id, epoch, is_active)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_token_epochs(session):
+    session.info.pop("password_rehash", None)
+    session.info.pop("token_epochs", None)
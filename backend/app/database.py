@@ -1,11 +1,209 @@
+import logging
+import os
+import re
+import time
+from typing import Optional
+from fastapi import Request
+from sqlalchemy import Column, MetaData, String, Table, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import SQLModel, create_engine, Session
-from .config import settings
+from sqlmodel.ext.asyncio.session import AsyncSession
+from .config import settings, BASE_DIR
+from .core.pool_metrics import InstrumentedQueuePool, InstrumentedAsyncAdaptedQueuePool
 
-engine = create_engine(settings.DATABASE_URL, echo=True)
+# Async drivers used for the sync drivers we ship with
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
 
-def init_db():
+def get_async_database_url(url: str) -> str:
+    """Derive the async driver URL from a sync DATABASE_URL"""
+    db_url = make_url(url)
+    return db_url.set(drivername=ASYNC_DRIVERS.get(db_url.get_backend_name(), db_url.drivername)).render_as_string(hide_password=False)
+
+def get_engine_options(url: str, poolclass, name: str) -> dict:
+    """Pool and echo options from Settings; in-memory SQLite keeps its own single-connection pool"""
+    options = {"echo": settings.DB_ECHO}
+    db_url = make_url(url)
+    if db_url.get_backend_name() == "sqlite" and db_url.database in (None, "", ":memory:"):
+        return options
+    options.update(
+        poolclass=poolclass,
+        pool_logging_name=name,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING
+    )
+    return options
+
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL)
+
+engine = create_engine(
+    settings.DATABASE_URL,
+    **get_engine_options(settings.DATABASE_URL, InstrumentedQueuePool, "primary")
+)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    **get_engine_options(ASYNC_DATABASE_URL, InstrumentedAsyncAdaptedQueuePool, "primary_async")
+)
+
+# Read replica; falls back to the primary engines when not configured
+if settings.READ_REPLICA_URL:
+    ASYNC_READ_REPLICA_URL = settings.ASYNC_READ_REPLICA_URL or get_async_database_url(settings.READ_REPLICA_URL)
+    read_engine = create_engine(
+        settings.READ_REPLICA_URL,
+        **get_engine_options(settings.READ_REPLICA_URL, InstrumentedQueuePool, "replica")
+    )
+    async_read_engine = create_async_engine(
+        ASYNC_READ_REPLICA_URL,
+        **get_engine_options(ASYNC_READ_REPLICA_URL, InstrumentedAsyncAdaptedQueuePool, "replica_async")
+    )
+else:
+    read_engine = engine
+    async_read_engine = async_engine
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+# Successful writes answer with the wall-clock time until which the client should read from the
+# primary; the client echoes it on its next requests, so whichever worker serves them honours it
+READ_PRIMARY_HEADER = "X-Read-Primary-Until"
+
+def _read_primary_until(request: Request) -> Optional[float]:
+    try:
+        return float(request.headers.get(READ_PRIMARY_HEADER, ""))
+    except ValueError:
+        return None
+
+def use_replica(request: Request) -> bool:
+    """GETs go to the replica unless the client reports a write within the read-your-writes window"""
+    if read_engine is engine or request.method not in READ_METHODS:
+        return False
+    until = _read_primary_until(request)
+    now = time.time()
+    # Deadlines further out than one window were not issued by us
+    return not (until is not None and now < until <= now + settings.READ_YOUR_WRITES_SECONDS + 1)
+
+class ReadYourWritesMiddleware:
+    """Adds X-Read-Primary-Until to successful write responses while a replica is configured"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or read_engine is engine or scope["method"] in READ_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_deadline(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = time.time() + settings.READ_YOUR_WRITES_SECONDS
+                message["headers"] = [*message.get("headers", []), (READ_PRIMARY_HEADER.lower().encode(), f"{until:.3f}".encode())]
+            await send(message)
+
+        await self.app(scope, receive, send_with_deadline)
+
+logger = logging.getLogger("app.db")
+
+ALEMBIC_VERSIONS_DIR = settings.ALEMBIC_VERSIONS_DIR or os.path.join(BASE_DIR, "..", "..", "alembic", "versions")
+_REVISION_LINE = re.compile(r"""^(down_revision|revision)\s*=\s*(.+)$""", re.MULTILINE)
+
+# Same shape alembic creates, so `alembic upgrade` picks up where a stamp left off
+alembic_version = Table(
+    "alembic_version", MetaData(),
+    Column("version_num", String(32), primary_key=True),
+)
+
+def schema_head() -> Optional[str]:
+    """
+    Head revision of the migration scripts, read straight from the version
+    files so workers don't pay for importing alembic. None when the scripts
+    aren't shipped (e.g. a backend-only image) or the history has several heads.
+    """
+    try:
+        names = [name for name in os.listdir(ALEMBIC_VERSIONS_DIR) if name.endswith(".py")]
+    except OSError:
+        return None
+    revisions, parents = set(), set()
+    for name in names:
+        with open(os.path.join(ALEMBIC_VERSIONS_DIR, name), encoding="utf-8") as f:
+            for key, value in _REVISION_LINE.findall(f.read()):
+                found = set(re.findall(r"""["']([^"']+)["']""", value))
+                (revisions if key == "revision" else parents).update(found)
+    heads = revisions - parents
+    return heads.pop() if len(heads) == 1 else None
+
+def schema_revision(bind=None) -> Optional[str]:
+    """The database's alembic revision in one query; None when it was never stamped"""
+    try:
+        with (bind or engine).connect() as connection:
+            return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except DBAPIError:
+        return None
+
+def stamp_schema(revision: str, bind=None):
+    # Workers racing on a fresh database may both get here; the primary key keeps a single row
+    try:
+        with (bind or engine).begin() as connection:
+            alembic_version.create(connection, checkfirst=True)
+            if connection.execute(alembic_version.select()).first() is None:
+                connection.execute(alembic_version.insert().values(version_num=revision))
+    except DBAPIError:
+        if schema_revision(bind) != revision:
+            raise
+
+def init_db() -> str:
+    """
+    Make sure the schema exists without reflecting every table on each boot.
+    Returns what was done: "current", "created", "legacy", "behind" or "unversioned".
+    """
+    head = schema_head()
+    if head is None:
+        # Nothing to compare against, so fall back to create_all's per-table checks
+        SQLModel.metadata.create_all(engine)
+        return "unversioned"
+    current = schema_revision()
+    if current == head:
+        return "current"
+    if current is None:
+        fresh = not inspect(engine).has_table("user")
+        SQLModel.metadata.create_all(engine)
+        if fresh:
+            # create_all just built the head schema, so the migrations have nothing to do
+            stamp_schema(head)
+            return "created"
+        logger.warning(
+            "Database has no alembic revision. create_all only added missing tables, not columns or indexes "
+            "of existing ones; run `alembic upgrade head` (or `alembic stamp` if it already matches)"
+        )
+        return "legacy"
+    # Pending migrations only run through `alembic upgrade head`, never from every worker at boot.
+    # create_all adds tables that are new since `current` but can't alter existing ones
     SQLModel.metadata.create_all(engine)
+    logger.warning(
+        "Database schema is at revision %s, migrations are at %s. The schema is NOT up to date: "
+        "columns and indexes added since are missing until `alembic upgrade head` runs", current, head
+    )
+    return "behind"
+
+def get_session(request: Request):
+    with Session(read_engine if use_replica(request) else engine) as session:
+        yield session
 
-def get_session():
+def get_primary_session():
+    """For GET endpoints that also write"""
     with Session(engine) as session:
-        yield session
\ No newline at end of file
+        yield session
+
+async def get_async_session(request: Request):
+    # Objects stay readable after commit so responses can be serialized without a reload
+    bind = async_read_engine if use_replica(request) else async_engine
+    async with AsyncSession(bind, expire_on_commit=False) as session:
+        yield session
+
+async def get_async_primary_session():
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
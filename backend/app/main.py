@@ -1,8 +1,13 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .database import init_db
+from sqlmodel import Session
+from .database import init_db, engine, ReadYourWritesMiddleware, READ_PRIMARY_HEADER
 from .routers import auth, users, students, permissions, messaging, notifications, feedback, academics, admin
 from .config import settings    
+from .core.query_stats import QueryStatsMiddleware
+from .core.permission_matrix import permission_matrix
+from .core.retention import retention_scheduler
+from .core.audit import audit_log
 
 app = FastAPI(title='Edudemy API')
 
@@ -16,17 +21,30 @@ origins = [
     "https://*.preview.emergentagent.com"
 ]
 
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(ReadYourWritesMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
-    allow_headers=["*"]
+    allow_headers=["*"],
+    expose_headers=["X-DB-Queries", "X-DB-Time-ms", "ETag", "Retry-After", "X-Next-Cursor", READ_PRIMARY_HEADER]
 )
 
 @app.on_event('startup')
 def on_startup():
-    init_db()
+    # One revision query when the schema is current; create_all only for new or outdated databases
+    app.state.schema_status = init_db()
+    with Session(engine) as session:
+        permission_matrix.load(session)
+    retention_scheduler.start()
+
+@app.on_event('shutdown')
+def on_shutdown():
+    retention_scheduler.stop()
+    # Write whatever is still queued before the worker exits
+    audit_log.stop()
 
 app.include_router(auth.router)
 app.include_router(users.router)
@@ -1,6 +1,7 @@
 from typing import Optional, List, Dict, Any
+from sqlalchemy import DDL, Index, event, text
 from sqlmodel import SQLModel, Field, Relationship, JSON, Column
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 
 class UserRole(str, Enum):
@@ -35,6 +36,14 @@ class BehaviorType(str, Enum):
     WEAKNESS = "weakness"
     BEHAVIOR = "behavior"
 
+# GIN trigram indexes exist on Postgres only; elsewhere search uses its in-process index
+event.listen(SQLModel.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"))
+
+def _trigram_index(table: str, column: str) -> Index:
+    return Index(
+        f"ix_{table}_{column}_trgm", column, postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"}
+    ).ddl_if(dialect="postgresql")
+
 class UserBase(SQLModel):
     email: str
     username: str
@@ -49,8 +58,18 @@ class UserBase(SQLModel):
     updated_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
 
 class User(UserBase, table=True):
+    __table_args__ = (
+        Index("ix_user_username", "username"),
+        Index("ix_user_email", "email"),
+        Index("ix_user_updated_at", "updated_at"),
+        # /admin/search matches substrings; pg_trgm lets ILIKE '%q%' use an index
+        *(_trigram_index("user", column) for column in ("username", "full_name", "email")),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     hashed_password: str
+    # Bumped on deactivation, role or password change; stateless tokens carrying an older epoch are revoked
+    token_epoch: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
     teacher: Optional['Teacher'] = Relationship(back_populates='user')
     student: Optional['Student'] = Relationship(back_populates='user')
     created_by: Optional[int] = Field(default=None, foreign_key='user.id')
@@ -75,6 +94,58 @@ class User(UserBase, table=True):
         sa_relationship_kwargs={"foreign_keys": "[Task.assigned_to]"}
     )
 
+# One row per signed-in device; rotating the refresh token rewrites token_hash in place
+class UserSession(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_usersession_user_id", "user_id"),
+        Index("ix_usersession_expires_at", "expires_at"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key='user.id')
+    # sha256 of the current refresh secret
+    token_hash: str
+    # sha256 of the secret it replaced; presenting that one again means the token was copied
+    previous_token_hash: Optional[str] = None
+    # User.token_epoch when the session was opened; a later bump (deactivation, role or password change) ends it
+    token_epoch: int = 0
+    rotation: int = 0
+    user_agent: Optional[str] = None
+    created_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
+    last_used_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
+    expires_at: datetime
+    revoked_at: Optional[datetime] = None
+
+# Who changed what; appended through core/audit.py's buffered writer, never updated
+class AuditEvent(SQLModel, table=True):
+    __table_args__ = (
+        # Keyset pagination walks (occurred_at, id) newest first, optionally within one actor or action
+        Index("ix_auditevent_occurred_at_id", "occurred_at", "id"),
+        Index("ix_auditevent_actor_id_occurred_at_id", "actor_id", "occurred_at", "id"),
+        Index("ix_auditevent_action_occurred_at_id", "action", "occurred_at", "id"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    occurred_at: datetime
+    # No foreign key: the trail outlives deleted users
+    actor_id: Optional[int] = None
+    action: str  # e.g. 'user.update', 'permission.grant_role'
+    entity_type: Optional[str] = None
+    entity_id: Optional[int] = None
+    details: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+
+# Written in the same transaction as a user's deletion, so the stateless-token revocation
+# table of every process learns about it (core/token_epochs.py)
+class UserDeletion(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_userdeletion_deleted_at", "deleted_at"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    # No foreign key: the user row is gone
+    user_id: int
+    deleted_at: datetime
+
 # Permission System Models
 class Permission(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -85,6 +156,10 @@ class Permission(SQLModel, table=True):
     created_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
 
 class RolePermission(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_rolepermission_role_permission_id", "role", "permission_id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     role: UserRole
     permission_id: int = Field(foreign_key='permission.id')
@@ -92,6 +167,10 @@ class RolePermission(SQLModel, table=True):
     created_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
 
 class UserPermission(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_userpermission_user_id_permission_id", "user_id", "permission_id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key='user.id')
     permission_id: int = Field(foreign_key='permission.id')
@@ -100,8 +179,10 @@ class UserPermission(SQLModel, table=True):
     created_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
 
 class Teacher(SQLModel, table=True):
+    __table_args__ = (_trigram_index("teacher", "employee_id"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: Optional[int] = Field(default=None, foreign_key='user.id')
+    user_id: Optional[int] = Field(default=None, foreign_key='user.id', index=True)
     subjects: Optional[str] = None  # comma separated for MVP
     employee_id: Optional[str] = None
     joining_date: Optional[datetime] = None
@@ -115,12 +196,14 @@ class Teacher(SQLModel, table=True):
     attendance_records: List['Attendance'] = Relationship(back_populates='teacher')
 
 class Student(SQLModel, table=True):
+    __table_args__ = tuple(_trigram_index("student", column) for column in ("full_name", "student_id", "email"))
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: Optional[int] = Field(default=None, foreign_key='user.id')
+    user_id: Optional[int] = Field(default=None, foreign_key='user.id', index=True)
     full_name: str
     phone: Optional[str] = None
     email: Optional[str] = None
-    batch_id: Optional[int] = Field(default=None, foreign_key='batch.id')
+    batch_id: Optional[int] = Field(default=None, foreign_key='batch.id', index=True)
     student_id: Optional[str] = None  # Roll number or student ID
     date_of_birth: Optional[datetime] = None
     address: Optional[str] = None
@@ -153,6 +236,12 @@ class Batch(SQLModel, table=True):
     class_assignments: List['ClassAssignment'] = Relationship(back_populates='batch')
 
 class ClassAssignment(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_classassignment_batch_id_scheduled_at", "batch_id", "scheduled_at"),
+        Index("ix_classassignment_teacher_id_scheduled_at", "teacher_id", "scheduled_at"),
+        Index("ix_classassignment_scheduled_at", "scheduled_at"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     batch_id: Optional[int] = Field(default=None, foreign_key='batch.id')
     teacher_id: Optional[int] = Field(default=None, foreign_key='teacher.id')
@@ -182,6 +271,11 @@ class ChatGroup(SQLModel, table=True):
     messages: List['GroupMessage'] = Relationship(back_populates='group')
 
 class ChatGroupMember(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_chatgroupmember_group_id_user_id", "group_id", "user_id"),
+        Index("ix_chatgroupmember_user_id", "user_id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     group_id: int = Field(foreign_key='chatgroup.id')
     user_id: int = Field(foreign_key='user.id')
@@ -192,6 +286,16 @@ class ChatGroupMember(SQLModel, table=True):
     group: Optional[ChatGroup] = Relationship(back_populates='members')
 
 class Message(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_message_sender_id_receiver_id_sent_at", "sender_id", "receiver_id", "sent_at"),
+        Index("ix_message_receiver_id_sender_id_sent_at", "receiver_id", "sender_id", "sent_at"),
+        # Unread badge counts only ever look at unread rows
+        Index(
+            "ix_message_receiver_id_sender_id_unread", "receiver_id", "sender_id",
+            postgresql_where=text("is_read = false"), sqlite_where=text("is_read = 0")
+        ),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     sender_id: int = Field(foreign_key='user.id')
     receiver_id: int = Field(foreign_key='user.id')
@@ -212,6 +316,10 @@ class Message(SQLModel, table=True):
     )
 
 class GroupMessage(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_groupmessage_group_id_sent_at", "group_id", "sent_at"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     group_id: int = Field(foreign_key='chatgroup.id')
     sender_id: int = Field(foreign_key='user.id')
@@ -225,6 +333,19 @@ class GroupMessage(SQLModel, table=True):
 
 # Notification System
 class Notification(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_notification_user_id_created_at", "user_id", "created_at"),
+        Index(
+            "ix_notification_user_id_unread", "user_id", "created_at",
+            postgresql_where=text("is_read = false"), sqlite_where=text("is_read = 0")
+        ),
+        # Retention cleanup deletes old read notifications
+        Index(
+            "ix_notification_created_at_read", "created_at",
+            postgresql_where=text("is_read = true"), sqlite_where=text("is_read = 1")
+        ),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key='user.id')
     title: str
@@ -239,6 +360,11 @@ class Notification(SQLModel, table=True):
 
 # Task Management System
 class Task(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_task_assigned_to_created_at", "assigned_to", "created_at"),
+        Index("ix_task_created_by_created_at", "created_by", "created_at"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str
     description: Optional[str] = None
@@ -262,6 +388,10 @@ class Task(SQLModel, table=True):
 
 # Academic Management Models
 class Exam(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_exam_batch_id_exam_date", "batch_id", "exam_date"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str
     subject: str
@@ -276,6 +406,13 @@ class Exam(SQLModel, table=True):
     results: List['ExamResult'] = Relationship(back_populates='exam')
 
 class ExamResult(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_examresult_student_id_entered_at", "student_id", "entered_at"),
+        Index("ix_examresult_exam_id_student_id", "exam_id", "student_id"),
+        Index("ix_examresult_teacher_id_entered_at", "teacher_id", "entered_at"),
+        Index("ix_examresult_entered_at", "entered_at"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     exam_id: int = Field(foreign_key='exam.id')
     student_id: int = Field(foreign_key='student.id')
@@ -291,6 +428,12 @@ class ExamResult(SQLModel, table=True):
     teacher: Optional[Teacher] = Relationship(back_populates='exam_results')
 
 class Attendance(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_attendance_student_id_class_date", "student_id", "class_date"),
+        Index("ix_attendance_teacher_id_class_date", "teacher_id", "class_date"),
+        Index("ix_attendance_class_date", "class_date"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     student_id: int = Field(foreign_key='student.id')
     teacher_id: int = Field(foreign_key='teacher.id')
@@ -304,7 +447,28 @@ class Attendance(SQLModel, table=True):
     student: Optional[Student] = Relationship(back_populates='attendance_records')
     teacher: Optional[Teacher] = Relationship(back_populates='attendance_records')
 
+# Daily attendance counters, kept in step with Attendance inserts (see core/attendance_rollups.py)
+class StudentAttendanceDaily(SQLModel, table=True):
+    student_id: int = Field(foreign_key='student.id', primary_key=True)
+    subject: str = Field(primary_key=True)
+    day: date = Field(primary_key=True)
+    total: int = 0
+    present: int = 0
+
+# Counted against the batch the student was in when attendance was marked
+class BatchAttendanceDaily(SQLModel, table=True):
+    batch_id: int = Field(foreign_key='batch.id', primary_key=True)
+    subject: str = Field(primary_key=True)
+    day: date = Field(primary_key=True)
+    total: int = 0
+    present: int = 0
+
 class BehaviorRecord(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_behaviorrecord_student_id_date_recorded", "student_id", "date_recorded"),
+        Index("ix_behaviorrecord_teacher_id_date_recorded", "teacher_id", "date_recorded"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     student_id: int = Field(foreign_key='student.id')
     teacher_id: int = Field(foreign_key='teacher.id')
@@ -319,6 +483,10 @@ class BehaviorRecord(SQLModel, table=True):
 
 # Payment System
 class Payment(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_payment_student_id_payment_date", "student_id", "payment_date"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     student_id: int = Field(foreign_key='student.id')
     amount: float
@@ -335,6 +503,11 @@ class Payment(SQLModel, table=True):
 
 # Feedback System
 class FeedbackForm(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_feedbackform_student_id_submitted_at", "student_id", "submitted_at"),
+        Index("ix_feedbackform_status_submitted_at", "status", "submitted_at"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     student_id: int = Field(foreign_key='student.id')
     feedback_type: FeedbackType
@@ -353,6 +526,10 @@ class FeedbackForm(SQLModel, table=True):
 
 # Report Card System
 class ReportCard(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_reportcard_student_id_generated_at", "student_id", "generated_at"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     student_id: int = Field(foreign_key='student.id')
     term: str  # e.g., "Semester 1", "Quarter 1"
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+from sqlalchemy import insert
+from sqlmodel import Session, select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
-from ..database import get_session
+from ..database import get_session, get_async_session
 from ..models import (
     User, Student, Teacher, Batch, ClassAssignment, Exam, ExamResult, 
     Attendance, BehaviorRecord, ReportCard, Task, Payment
@@ -14,7 +16,10 @@ from ..schemas import (
     ReportCardCreate, ReportCardRead, TaskCreate, TaskRead, TaskUpdate,
     PaymentCreate, PaymentRead, TeacherCreate, TeacherRead, StudentCreate, StudentRead
 )
-from ..core.deps import get_current_user, require_role
+from ..core.deps import Principal, get_current_user, get_principal, get_principal_async, require_role, require_principal
+from ..core.query_stats import query_budget
+from ..core import attendance_rollups
+from ..core.pagination import CursorPage, cursor_page, paginate, paginate_async
 from .notifications import send_task_assigned_notification
 
 router = APIRouter(prefix="/academics", tags=["academics"])
@@ -34,11 +39,11 @@ def create_batch(
 
 @router.get("/batches/", response_model=List[BatchRead])
 def get_batches(
+    page: CursorPage = Depends(cursor_page()),
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    batches = session.exec(select(Batch)).all()
-    return batches
+    return paginate(session, select(Batch), page, Batch.id, descending=False)
 
 @router.get("/batches/{batch_id}", response_model=BatchRead)
 def get_batch(
@@ -75,33 +80,29 @@ def create_class_assignment(
     return db_assignment
 
 @router.get("/class-assignments/", response_model=List[ClassAssignmentRead])
-def get_class_assignments(
+@query_budget(2)
+async def get_class_assignments(
     batch_id: Optional[int] = None,
     teacher_id: Optional[int] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    page: CursorPage = Depends(cursor_page()),
+    session: AsyncSession = Depends(get_async_session),
+    principal: Principal = Depends(get_principal_async)
 ):
     query = select(ClassAssignment)
     
     # Apply filters based on user role
-    if current_user.role == "teacher":
+    if principal.role == "teacher":
         # Teachers can only see their own assignments
-        teacher = session.exec(
-            select(Teacher).where(Teacher.user_id == current_user.id)
-        ).first()
-        if teacher:
-            query = query.where(ClassAssignment.teacher_id == teacher.id)
+        if principal.teacher_id:
+            query = query.where(ClassAssignment.teacher_id == principal.teacher_id)
         else:
             return []
-    elif current_user.role == "student":
+    elif principal.role == "student":
         # Students can only see assignments for their batch
-        student = session.exec(
-            select(Student).where(Student.user_id == current_user.id)
-        ).first()
-        if student and student.batch_id:
-            query = query.where(ClassAssignment.batch_id == student.batch_id)
+        if principal.batch_id:
+            query = query.where(ClassAssignment.batch_id == principal.batch_id)
         else:
             return []
     
@@ -115,14 +116,15 @@ def get_class_assignments(
     if end_date:
         query = query.where(ClassAssignment.scheduled_at <= end_date)
     
-    assignments = session.exec(query.order_by(ClassAssignment.scheduled_at)).all()
-    return assignments
+    return await paginate_async(session, query, page, ClassAssignment.scheduled_at, descending=False)
 
 @router.get("/class-assignments/upcoming", response_model=List[ClassAssignmentRead])
-def get_upcoming_classes(
+@query_budget(2)
+async def get_upcoming_classes(
     days: int = 7,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    page: CursorPage = Depends(cursor_page()),
+    session: AsyncSession = Depends(get_async_session),
+    principal: Principal = Depends(get_principal_async)
 ):
     start_time = datetime.utcnow()
     end_time = start_time + timedelta(days=days)
@@ -133,21 +135,14 @@ def get_upcoming_classes(
     )
     
     # Filter by user role
-    if current_user.role == "teacher":
-        teacher = session.exec(
-            select(Teacher).where(Teacher.user_id == current_user.id)
-        ).first()
-        if teacher:
-            query = query.where(ClassAssignment.teacher_id == teacher.id)
-    elif current_user.role == "student":
-        student = session.exec(
-            select(Student).where(Student.user_id == current_user.id)
-        ).first()
-        if student and student.batch_id:
-            query = query.where(ClassAssignment.batch_id == student.batch_id)
-    
-    assignments = session.exec(query.order_by(ClassAssignment.scheduled_at)).all()
-    return assignments
+    if principal.role == "teacher":
+        if principal.teacher_id:
+            query = query.where(ClassAssignment.teacher_id == principal.teacher_id)
+    elif principal.role == "student":
+        if principal.batch_id:
+            query = query.where(ClassAssignment.batch_id == principal.batch_id)
+    
+    return await paginate_async(session, query, page, ClassAssignment.scheduled_at, descending=False)
 
 # Exam Management
 @router.post("/exams/", response_model=ExamRead)
@@ -172,18 +167,16 @@ def create_exam(
 def get_exams(
     batch_id: Optional[int] = None,
     subject: Optional[str] = None,
+    page: CursorPage = Depends(cursor_page()),
     session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    principal: Principal = Depends(get_principal)
 ):
     query = select(Exam)
     
     # Filter by user role
-    if current_user.role == "student":
-        student = session.exec(
-            select(Student).where(Student.user_id == current_user.id)
-        ).first()
-        if student and student.batch_id:
-            query = query.where(Exam.batch_id == student.batch_id)
+    if principal.role == "student":
+        if principal.batch_id:
+            query = query.where(Exam.batch_id == principal.batch_id)
         else:
             return []
     
@@ -193,15 +186,14 @@ def get_exams(
     if subject:
         query = query.where(Exam.subject == subject)
     
-    exams = session.exec(query.order_by(Exam.exam_date.desc())).all()
-    return exams
+    return paginate(session, query, page, Exam.exam_date)
 
 # Exam Results Management
 @router.post("/exam-results/", response_model=ExamResultRead)
 def create_exam_result(
     result: ExamResultCreate,
     session: Session = Depends(get_session),
-    current_user: User = Depends(require_role("teacher", "academics", "admin", "superadmin"))
+    principal: Principal = Depends(require_principal("teacher", "academics", "admin", "superadmin"))
 ):
     # Verify exam and student exist
     exam = session.get(Exam, result.exam_id)
@@ -214,13 +206,9 @@ def create_exam_result(
     
     # Get teacher ID
     teacher_id = None
-    if current_user.role == "teacher":
-        teacher = session.exec(
-            select(Teacher).where(Teacher.user_id == current_user.id)
-        ).first()
-        if teacher:
-            teacher_id = teacher.id
-        else:
+    if principal.role == "teacher":
+        teacher_id = principal.teacher_id
+        if not teacher_id:
             raise HTTPException(status_code=404, detail="Teacher record not found")
     
     # Calculate grade based on percentage
@@ -249,26 +237,21 @@ def create_exam_result(
 def get_exam_results(
     exam_id: Optional[int] = None,
     student_id: Optional[int] = None,
+    page: CursorPage = Depends(cursor_page()),
     session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    principal: Principal = Depends(get_principal)
 ):
     query = select(ExamResult)
     
     # Filter by user role
-    if current_user.role == "student":
-        student = session.exec(
-            select(Student).where(Student.user_id == current_user.id)
-        ).first()
-        if student:
-            query = query.where(ExamResult.student_id == student.id)
+    if principal.role == "student":
+        if principal.student_id:
+            query = query.where(ExamResult.student_id == principal.student_id)
         else:
             return []
-    elif current_user.role == "teacher":
-        teacher = session.exec(
-            select(Teacher).where(Teacher.user_id == current_user.id)
-        ).first()
-        if teacher:
-            query = query.where(ExamResult.teacher_id == teacher.id)
+    elif principal.role == "teacher":
+        if principal.teacher_id:
+            query = query.where(ExamResult.teacher_id == principal.teacher_id)
     
     # Apply filters
     if exam_id:
@@ -276,15 +259,14 @@ def get_exam_results(
     if student_id:
         query = query.where(ExamResult.student_id == student_id)
     
-    results = session.exec(query.order_by(ExamResult.entered_at.desc())).all()
-    return results
+    return paginate(session, query, page, ExamResult.entered_at)
 
 # Attendance Management
 @router.post("/attendance/", response_model=AttendanceRead)
 def mark_attendance(
     attendance: AttendanceCreate,
     session: Session = Depends(get_session),
-    current_user: User = Depends(require_role("teacher", "academics", "admin", "superadmin"))
+    principal: Principal = Depends(require_principal("teacher", "academics", "admin", "superadmin"))
 ):
     # Verify student exists
     student = session.get(Student, attendance.student_id)
@@ -293,17 +275,14 @@ def mark_attendance(
     
     # Get teacher ID
     teacher_id = None
-    if current_user.role == "teacher":
-        teacher = session.exec(
-            select(Teacher).where(Teacher.user_id == current_user.id)
-        ).first()
-        if teacher:
-            teacher_id = teacher.id
-        else:
+    if principal.role == "teacher":
+        teacher_id = principal.teacher_id
+        if not teacher_id:
             raise HTTPException(status_code=404, detail="Teacher record not found")
     
     db_attendance = Attendance(**attendance.model_dump(), teacher_id=teacher_id)
     session.add(db_attendance)
+    attendance_rollups.add_attendance(session, [(db_attendance, student.batch_id)])
     session.commit()
     session.refresh(db_attendance)
     
@@ -313,57 +292,54 @@ def mark_attendance(
 def mark_bulk_attendance(
     attendances: List[AttendanceCreate],
     session: Session = Depends(get_session),
-    current_user: User = Depends(require_role("teacher", "academics", "admin", "superadmin"))
+    principal: Principal = Depends(require_principal("teacher", "academics", "admin", "superadmin"))
 ):
     # Get teacher ID
     teacher_id = None
-    if current_user.role == "teacher":
-        teacher = session.exec(
-            select(Teacher).where(Teacher.user_id == current_user.id)
-        ).first()
-        if teacher:
-            teacher_id = teacher.id
-        else:
+    if principal.role == "teacher":
+        teacher_id = principal.teacher_id
+        if not teacher_id:
             raise HTTPException(status_code=404, detail="Teacher record not found")
     
-    created_count = 0
-    for attendance in attendances:
-        # Verify student exists
-        student = session.get(Student, attendance.student_id)
-        if student:
-            db_attendance = Attendance(**attendance.model_dump(), teacher_id=teacher_id)
-            session.add(db_attendance)
-            created_count += 1
-    
+    # Verify students exist, fetching their batches for the rollups in the same query
+    student_batches = dict(session.exec(
+        select(Student.id, Student.batch_id).where(Student.id.in_({a.student_id for a in attendances}))
+    ).all())
+    created = [
+        (Attendance(**attendance.model_dump(), teacher_id=teacher_id), student_batches[attendance.student_id])
+        for attendance in attendances if attendance.student_id in student_batches
+    ]
+    created_count = len(created)
+    
+    if created:
+        # One executemany instead of an INSERT ... RETURNING per row; only the count is returned
+        session.exec(insert(Attendance), params=[a.model_dump(exclude={"id"}) for a, _ in created])
+        attendance_rollups.add_attendance(session, created)
     session.commit()
     return {"message": f"Marked attendance for {created_count} students"}
 
 @router.get("/attendance/", response_model=List[AttendanceRead])
-def get_attendance(
+@query_budget(2)
+async def get_attendance(
     student_id: Optional[int] = None,
     subject: Optional[str] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    page: CursorPage = Depends(cursor_page()),
+    session: AsyncSession = Depends(get_async_session),
+    principal: Principal = Depends(get_principal_async)
 ):
     query = select(Attendance)
     
     # Filter by user role
-    if current_user.role == "student":
-        student = session.exec(
-            select(Student).where(Student.user_id == current_user.id)
-        ).first()
-        if student:
-            query = query.where(Attendance.student_id == student.id)
+    if principal.role == "student":
+        if principal.student_id:
+            query = query.where(Attendance.student_id == principal.student_id)
         else:
             return []
-    elif current_user.role == "teacher":
-        teacher = session.exec(
-            select(Teacher).where(Teacher.user_id == current_user.id)
-        ).first()
-        if teacher:
-            query = query.where(Attendance.teacher_id == teacher.id)
+    elif principal.role == "teacher":
+        if principal.teacher_id:
+            query = query.where(Attendance.teacher_id == principal.teacher_id)
     
     # Apply filters
     if student_id:
@@ -375,58 +351,32 @@ def get_attendance(
     if end_date:
         query = query.where(Attendance.class_date <= end_date)
     
-    attendance_records = session.exec(query.order_by(Attendance.class_date.desc())).all()
-    return attendance_records
+    return await paginate_async(session, query, page, Attendance.class_date)
 
 @router.get("/attendance/summary/{student_id}", response_model=dict)
-def get_attendance_summary(
+@query_budget(2)
+async def get_attendance_summary(
     student_id: int,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    session: AsyncSession = Depends(get_async_session),
+    principal: Principal = Depends(get_principal_async)
 ):
     # Check permissions
-    if current_user.role == "student":
-        student = session.exec(
-            select(Student).where(Student.user_id == current_user.id)
-        ).first()
-        if not student or student.id != student_id:
-            raise HTTPException(status_code=403, detail="Not authorized")
-    
-    query = select(Attendance).where(Attendance.student_id == student_id)
+    if principal.role == "student" and principal.student_id != student_id:
+        raise HTTPException(status_code=403, detail="Not authorized")
     
-    if start_date:
-        query = query.where(Attendance.class_date >= start_date)
-    if end_date:
-        query = query.where(Attendance.class_date <= end_date)
-    
-    records = session.exec(query).all()
-    
-    total_classes = len(records)
-    present_classes = len([r for r in records if r.is_present])
-    attendance_percentage = (present_classes / total_classes * 100) if total_classes > 0 else 0
-    
-    # Subject-wise attendance
-    subject_attendance = {}
-    for record in records:
-        if record.subject not in subject_attendance:
-            subject_attendance[record.subject] = {"total": 0, "present": 0}
-        subject_attendance[record.subject]["total"] += 1
-        if record.is_present:
-            subject_attendance[record.subject]["present"] += 1
-    
-    for subject in subject_attendance:
-        subject_data = subject_attendance[subject]
-        subject_data["percentage"] = (subject_data["present"] / subject_data["total"] * 100) if subject_data["total"] > 0 else 0
+    summary = attendance_rollups.summarize(
+        (await session.exec(attendance_rollups.student_summary_statement(student_id, start_date, end_date))).all()
+    )
     
     return {
         "student_id": student_id,
-        "total_classes": total_classes,
-        "present_classes": present_classes,
-        "absent_classes": total_classes - present_classes,
-        "attendance_percentage": round(attendance_percentage, 2),
-        "subject_wise": subject_attendance
+        "total_classes": summary["total"],
+        "present_classes": summary["present"],
+        "absent_classes": summary["total"] - summary["present"],
+        "attendance_percentage": round(summary["percentage"], 2),
+        "subject_wise": summary["by_subject"]
     }
 
 # Behavior Record Management
@@ -434,7 +384,7 @@ def get_attendance_summary(
 def create_behavior_record(
     record: BehaviorRecordCreate,
     session: Session = Depends(get_session),
-    current_user: User = Depends(require_role("teacher", "academics", "admin", "superadmin"))
+    principal: Principal = Depends(require_principal("teacher", "academics", "admin", "superadmin"))
 ):
     # Verify student exists
     student = session.get(Student, record.student_id)
@@ -443,13 +393,9 @@ def create_behavior_record(
     
     # Get teacher ID
     teacher_id = None
-    if current_user.role == "teacher":
-        teacher = session.exec(
-            select(Teacher).where(Teacher.user_id == current_user.id)
-        ).first()
-        if teacher:
-            teacher_id = teacher.id
-        else:
+    if principal.role == "teacher":
+        teacher_id = principal.teacher_id
+        if not teacher_id:
             raise HTTPException(status_code=404, detail="Teacher record not found")
     
     db_record = BehaviorRecord(**record.model_dump(), teacher_id=teacher_id)
@@ -463,26 +409,21 @@ def create_behavior_record(
 def get_behavior_records(
     student_id: Optional[int] = None,
     behavior_type: Optional[str] = None,
+    page: CursorPage = Depends(cursor_page()),
     session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    principal: Principal = Depends(get_principal)
 ):
     query = select(BehaviorRecord)
     
     # Filter by user role
-    if current_user.role == "student":
-        student = session.exec(
-            select(Student).where(Student.user_id == current_user.id)
-        ).first()
-        if student:
-            query = query.where(BehaviorRecord.student_id == student.id)
+    if principal.role == "student":
+        if principal.student_id:
+            query = query.where(BehaviorRecord.student_id == principal.student_id)
         else:
             return []
-    elif current_user.role == "teacher":
-        teacher = session.exec(
-            select(Teacher).where(Teacher.user_id == current_user.id)
-        ).first()
-        if teacher:
-            query = query.where(BehaviorRecord.teacher_id == teacher.id)
+    elif principal.role == "teacher":
+        if principal.teacher_id:
+            query = query.where(BehaviorRecord.teacher_id == principal.teacher_id)
     
     # Apply filters
     if student_id:
@@ -490,8 +431,7 @@ def get_behavior_records(
     if behavior_type:
         query = query.where(BehaviorRecord.behavior_type == behavior_type)
     
-    records = session.exec(query.order_by(BehaviorRecord.date_recorded.desc())).all()
-    return records
+    return paginate(session, query, page, BehaviorRecord.date_recorded)
 
 # Report Card Generation
 @router.post("/report-cards/", response_model=ReportCardRead)
@@ -543,13 +483,9 @@ def generate_report_card(
             subject_grades[subject]["percentage"] = (total_marks / total_possible * 100) if total_possible > 0 else 0
         
         # Calculate attendance
-        attendance_records = session.exec(
-            select(Attendance).where(Attendance.student_id == report.student_id)
-        ).all()
-        
-        total_classes = len(attendance_records)
-        present_classes = len([r for r in attendance_records if r.is_present])
-        attendance_percentage = (present_classes / total_classes * 100) if total_classes > 0 else 0
+        attendance_percentage = attendance_rollups.summarize(
+            session.exec(attendance_rollups.student_summary_statement(report.student_id)).all()
+        )["percentage"]
         
         # Get behavior summary
         behavior_records = session.exec(
@@ -579,18 +515,16 @@ def generate_report_card(
 def get_report_cards(
     student_id: Optional[int] = None,
     academic_year: Optional[str] = None,
+    page: CursorPage = Depends(cursor_page()),
     session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    principal: Principal = Depends(get_principal)
 ):
     query = select(ReportCard)
     
     # Filter by user role
-    if current_user.role == "student":
-        student = session.exec(
-            select(Student).where(Student.user_id == current_user.id)
-        ).first()
-        if student:
-            query = query.where(ReportCard.student_id == student.id)
+    if principal.role == "student":
+        if principal.student_id:
+            query = query.where(ReportCard.student_id == principal.student_id)
         else:
             return []
     
@@ -600,8 +534,7 @@ def get_report_cards(
     if academic_year:
         query = query.where(ReportCard.academic_year == academic_year)
     
-    reports = session.exec(query.order_by(ReportCard.generated_at.desc())).all()
-    return reports
+    return paginate(session, query, page, ReportCard.generated_at)
 
 # Task Management
 @router.post("/tasks/", response_model=TaskRead)
@@ -629,6 +562,7 @@ def create_task(
 def get_tasks(
     assigned_to: Optional[int] = None,
     status: Optional[str] = None,
+    page: CursorPage = Depends(cursor_page()),
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
@@ -647,8 +581,7 @@ def get_tasks(
     if status:
         query = query.where(Task.status == status)
     
-    tasks = session.exec(query.order_by(Task.created_at.desc())).all()
-    return tasks
+    return paginate(session, query, page, Task.created_at)
 
 @router.put("/tasks/{task_id}", response_model=TaskRead)
 def update_task(
@@ -702,18 +635,16 @@ def create_payment(
 def get_payments(
     student_id: Optional[int] = None,
     status: Optional[str] = None,
+    page: CursorPage = Depends(cursor_page()),
     session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    principal: Principal = Depends(get_principal)
 ):
     query = select(Payment)
     
     # Filter by user role
-    if current_user.role == "student":
-        student = session.exec(
-            select(Student).where(Student.user_id == current_user.id)
-        ).first()
-        if student:
-            query = query.where(Payment.student_id == student.id)
+    if principal.role == "student":
+        if principal.student_id:
+            query = query.where(Payment.student_id == principal.student_id)
         else:
             return []
     
@@ -723,88 +654,73 @@ def get_payments(
     if status:
         query = query.where(Payment.status == status)
     
-    payments = session.exec(query.order_by(Payment.payment_date.desc())).all()
-    return payments
+    return paginate(session, query, page, Payment.payment_date)
 
 # Dashboard Statistics
 @router.get("/dashboard/stats", response_model=dict)
+@query_budget(4)
 def get_dashboard_stats(
     session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    principal: Principal = Depends(get_principal)
 ):
     stats = {}
     
-    if current_user.role == "student":
+    if principal.role == "student":
         # Student dashboard stats
-        student = session.exec(
-            select(Student).where(Student.user_id == current_user.id)
-        ).first()
-        
-        if student:
+        if principal.student_id:
             # Upcoming classes
             upcoming_classes = session.exec(
                 select(ClassAssignment).where(
-                    ClassAssignment.batch_id == student.batch_id,
+                    ClassAssignment.batch_id == principal.batch_id,
                     ClassAssignment.scheduled_at >= datetime.utcnow()
                 ).limit(5)
             ).all()
             
             # Recent results
             recent_results = session.exec(
-                select(ExamResult).where(ExamResult.student_id == student.id)
+                select(ExamResult).where(ExamResult.student_id == principal.student_id)
                 .order_by(ExamResult.entered_at.desc())
                 .limit(5)
             ).all()
             
             # Attendance summary
-            attendance_summary = session.exec(
-                select(Attendance).where(Attendance.student_id == student.id)
-            ).all()
-            
-            total_classes = len(attendance_summary)
-            present_classes = len([a for a in attendance_summary if a.is_present])
-            attendance_percentage = (present_classes / total_classes * 100) if total_classes > 0 else 0
+            attendance_summary = attendance_rollups.summarize(
+                session.exec(attendance_rollups.student_summary_statement(principal.student_id)).all()
+            )
             
             stats = {
                 "upcoming_classes": len(upcoming_classes),
                 "recent_results": len(recent_results),
-                "attendance_percentage": round(attendance_percentage, 2),
-                "total_classes": total_classes
+                "attendance_percentage": round(attendance_summary["percentage"], 2),
+                "total_classes": attendance_summary["total"]
             }
     
-    elif current_user.role == "teacher":
+    elif principal.role == "teacher":
         # Teacher dashboard stats
-        teacher = session.exec(
-            select(Teacher).where(Teacher.user_id == current_user.id)
-        ).first()
-        
-        if teacher:
+        if principal.teacher_id:
             # Classes today
             today = datetime.utcnow().date()
-            today_classes = session.exec(
-                select(ClassAssignment).where(
-                    ClassAssignment.teacher_id == teacher.id,
+            classes_today = session.exec(
+                select(func.count()).select_from(ClassAssignment).where(
+                    ClassAssignment.teacher_id == principal.teacher_id,
                     ClassAssignment.scheduled_at >= today,
                     ClassAssignment.scheduled_at < today + timedelta(days=1)
                 )
-            ).all()
+            ).one()
             
             # Students taught
             taught_batches = session.exec(
                 select(ClassAssignment.batch_id).where(
-                    ClassAssignment.teacher_id == teacher.id
+                    ClassAssignment.teacher_id == principal.teacher_id
                 ).distinct()
             ).all()
             
-            total_students = 0
-            for batch_id in taught_batches:
-                students = session.exec(
-                    select(Student).where(Student.batch_id == batch_id)
-                ).all()
-                total_students += len(students)
+            total_students = session.exec(
+                select(func.count()).select_from(Student).where(Student.batch_id.in_(taught_batches))
+            ).one() if taught_batches else 0
             
             stats = {
-                "classes_today": len(today_classes),
+                "classes_today": classes_today,
                 "total_students": total_students,
                 "total_batches": len(taught_batches)
             }
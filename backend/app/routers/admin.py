@@ -1,19 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel import Session, select, func
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
-from ..database import get_session
+from ..database import get_session, engine, async_engine, read_engine, async_read_engine
 from ..models import (
-    User, Student, Teacher, Permission, RolePermission, UserPermission,
+    User, UserRole, Student, Teacher, Permission, RolePermission, UserPermission,
     Batch, Task, Notification, FeedbackForm, ExamResult, Attendance,
-    ClassAssignment, Exam, Payment
+    ClassAssignment, Exam, Payment, StudentAttendanceDaily, BatchAttendanceDaily
 )
 from ..schemas import (
     UserCreate, UserRead, UserUpdate, StudentCreate, StudentRead,
     TeacherCreate, TeacherRead, PermissionRead, DashboardStats
 )
 from ..core.deps import get_current_user, require_role
+from ..core import security
 from ..core.security import get_password_hash
+from ..core.pool_metrics import pool_status
+from ..core.rate_limit import login_limiter
+from ..core.query_stats import query_budget
+from ..core.snapshot_cache import SnapshotCache
+from ..core.pagination import CursorPage, cursor_page, paginate
+from ..core import attendance_rollups, audit, exports, performance_stats, retention, search
+from ..core.retention import notification_retention, retention_scheduler
+from ..config import settings
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -51,16 +61,16 @@ def create_user(
     session.add(db_user)
     session.commit()
     session.refresh(db_user)
+    audit.record(current_user, "user.create", "user", db_user.id, {"role": db_user.role})
     
     return db_user
 
 @router.get("/users/", response_model=List[UserRead])
 def get_all_users(
-    limit: int = 100,
-    offset: int = 0,
     role: Optional[str] = None,
     is_active: Optional[bool] = None,
     search: Optional[str] = None,
+    page: CursorPage = Depends(cursor_page()),
     session: Session = Depends(get_session),
     current_user: User = Depends(require_role("admin", "superadmin"))
 ):
@@ -78,13 +88,7 @@ def get_all_users(
             (User.email.contains(search))
         )
     
-    users = session.exec(
-        query.order_by(User.created_at.desc())
-        .offset(offset)
-        .limit(limit)
-    ).all()
-    
-    return users
+    return paginate(session, query, page, User.created_at)
 
 @router.get("/users/{user_id}", response_model=UserRead)
 def get_user(
@@ -129,6 +133,7 @@ def update_user(
     
     session.commit()
     session.refresh(user)
+    audit.record(current_user, "user.update", "user", user_id, {"fields": audit.changed_fields(update_data)})
     
     return user
 
@@ -148,6 +153,7 @@ def delete_user(
     # Instead of hard delete, deactivate the user
     user.is_active = False
     session.commit()
+    audit.record(current_user, "user.deactivate", "user", user_id)
     
     return {"message": "User deactivated successfully"}
 
@@ -199,15 +205,15 @@ def create_student_with_user(
     session.add(student)
     session.commit()
     session.refresh(student)
+    audit.record(current_user, "student.create", "student", student.id, {"user_id": db_user.id, "batch_id": student.batch_id})
     
     return student
 
 @router.get("/students/", response_model=List[StudentRead])
 def get_all_students(
-    limit: int = 100,
-    offset: int = 0,
     batch_id: Optional[int] = None,
     search: Optional[str] = None,
+    page: CursorPage = Depends(cursor_page()),
     session: Session = Depends(get_session),
     current_user: User = Depends(require_role("admin", "superadmin", "academics", "management"))
 ):
@@ -223,13 +229,7 @@ def get_all_students(
             (Student.student_id.contains(search))
         )
     
-    students = session.exec(
-        query.order_by(Student.admission_date.desc())
-        .offset(offset)
-        .limit(limit)
-    ).all()
-    
-    return students
+    return paginate(session, query, page, Student.admission_date)
 
 # Teacher Management
 @router.post("/teachers/", response_model=TeacherRead)
@@ -275,15 +275,15 @@ def create_teacher_with_user(
     session.add(teacher)
     session.commit()
     session.refresh(teacher)
+    audit.record(current_user, "teacher.create", "teacher", teacher.id, {"user_id": db_user.id})
     
     return teacher
 
 @router.get("/teachers/", response_model=List[TeacherRead])
 def get_all_teachers(
-    limit: int = 100,
-    offset: int = 0,
     department: Optional[str] = None,
     search: Optional[str] = None,
+    page: CursorPage = Depends(cursor_page()),
     session: Session = Depends(get_session),
     current_user: User = Depends(require_role("admin", "superadmin", "academics", "management"))
 ):
@@ -301,79 +301,95 @@ def get_all_teachers(
                 (Teacher.employee_id.contains(search))
             )
     
-    teachers = session.exec(
-        query.order_by(Teacher.joining_date.desc())
-        .offset(offset)
-        .limit(limit)
-    ).all()
-    
-    return teachers
+    return paginate(session, query, page, Teacher.joining_date)
 
-# System Analytics and Reports
-@router.get("/analytics/overview", response_model=dict)
-def get_system_overview(
+# Directory typeahead
+@router.get("/search", response_model=List[dict])
+def search_directory(
+    q: str = Query(..., min_length=2, max_length=100),
+    types: Optional[str] = Query(None, description="Comma separated: users, students, teachers (default all)"),
+    limit: int = Query(10, ge=1, le=50),
     session: Session = Depends(get_session),
-    current_user: User = Depends(require_role("admin", "superadmin"))
+    current_user: User = Depends(require_role("admin", "superadmin", "academics", "management"))
 ):
-    # User statistics
-    total_users = len(session.exec(select(User)).all())
-    active_users = len(session.exec(select(User).where(User.is_active == True)).all())
-    
-    # Role-wise counts
-    superadmins = len(session.exec(select(User).where(User.role == "superadmin")).all())
-    admins = len(session.exec(select(User).where(User.role == "admin")).all())
-    management = len(session.exec(select(User).where(User.role == "management")).all())
-    teachers = len(session.exec(select(User).where(User.role == "teacher")).all())
-    students = len(session.exec(select(User).where(User.role == "student")).all())
-    academics = len(session.exec(select(User).where(User.role == "academics")).all())
-    
-    # Academic statistics
-    total_batches = len(session.exec(select(Batch)).all())
-    total_exams = len(session.exec(select(Exam)).all())
-    total_classes = len(session.exec(select(ClassAssignment)).all())
-    
-    # Activity statistics
-    pending_feedback = len(session.exec(select(FeedbackForm).where(FeedbackForm.status == "pending")).all())
-    pending_tasks = len(session.exec(select(Task).where(Task.status == "pending")).all())
-    
-    # Recent activity (last 30 days)
+    kinds = [kind.strip() for kind in types.split(",") if kind.strip()] if types else list(search.KINDS)
+    unknown = [kind for kind in kinds if kind not in search.KINDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown search types: {', '.join(unknown)}")
+    # User accounts are listed to admins only, as on /admin/users/
+    if current_user.role not in ("admin", "superadmin"):
+        if types and "users" in kinds:
+            raise HTTPException(status_code=403, detail="Not authorized to search users")
+        kinds = [kind for kind in kinds if kind != "users"]
+
+    q = q.strip()
+    if len(q) < 2:
+        raise HTTPException(status_code=422, detail="Search needs at least 2 characters")
+    return search.search_directory(session, q, kinds, limit)
+
+# System Analytics and Reports
+analytics_cache = SnapshotCache(settings.ANALYTICS_CACHE_TTL_SECONDS)
+
+def _system_overview(session: Session) -> dict:
+    # Every figure in one round trip: FILTERed counts over user, scalar subqueries for the rest
     thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    recent_users = len(session.exec(
-        select(User).where(User.created_at >= thirty_days_ago)
-    ).all())
-    recent_exam_results = len(session.exec(
-        select(ExamResult).where(ExamResult.entered_at >= thirty_days_ago)
-    ).all())
+
+    def count(model, *where):
+        return select(func.count()).select_from(model).where(*where).scalar_subquery()
+
+    row = session.exec(
+        select(
+            func.count().label("total_users"),
+            func.count().filter(User.is_active == True).label("active_users"),
+            *(func.count().filter(User.role == role).label(role.value) for role in UserRole),
+            func.count().filter(User.created_at >= thirty_days_ago).label("recent_users"),
+            count(Batch).label("total_batches"),
+            count(Exam).label("total_exams"),
+            count(ClassAssignment).label("total_classes"),
+            count(FeedbackForm, FeedbackForm.status == "pending").label("pending_feedback"),
+            count(Task, Task.status == "pending").label("pending_tasks"),
+            count(ExamResult, ExamResult.entered_at >= thirty_days_ago).label("recent_exam_results"),
+        ).select_from(User)
+    ).one()
     
     return {
         "users": {
-            "total": total_users,
-            "active": active_users,
-            "inactive": total_users - active_users,
+            "total": row.total_users,
+            "active": row.active_users,
+            "inactive": row.total_users - row.active_users,
             "by_role": {
-                "superadmin": superadmins,
-                "admin": admins,
-                "management": management,
-                "teachers": teachers,
-                "students": students,
-                "academics": academics
+                "superadmin": row.superadmin,
+                "admin": row.admin,
+                "management": row.management,
+                "teachers": row.teacher,
+                "students": row.student,
+                "academics": row.academics
             }
         },
         "academic": {
-            "total_batches": total_batches,
-            "total_exams": total_exams,
-            "total_classes": total_classes
+            "total_batches": row.total_batches,
+            "total_exams": row.total_exams,
+            "total_classes": row.total_classes
         },
         "activity": {
-            "pending_feedback": pending_feedback,
-            "pending_tasks": pending_tasks
+            "pending_feedback": row.pending_feedback,
+            "pending_tasks": row.pending_tasks
         },
         "recent": {
-            "new_users": recent_users,
-            "exam_results_entered": recent_exam_results
+            "new_users": row.recent_users,
+            "exam_results_entered": row.recent_exam_results
         }
     }
 
+@router.get("/analytics/overview", response_model=dict)
+@query_budget(2)
+def get_system_overview(
+    session: Session = Depends(get_session),
+    current_user: User = Depends(require_role("admin", "superadmin"))
+):
+    # Shared by all admins for ANALYTICS_CACHE_TTL_SECONDS; figures may lag writes by that much
+    return analytics_cache.get_or_compute("overview", lambda: _system_overview(session))
+
 @router.get("/analytics/attendance", response_model=dict)
 def get_attendance_analytics(
     batch_id: Optional[int] = None,
@@ -382,114 +398,38 @@ def get_attendance_analytics(
     session: Session = Depends(get_session),
     current_user: User = Depends(require_role("admin", "superadmin", "academics"))
 ):
-    query = select(Attendance)
-    
+    # Summed daily counters: the batch rollup for one batch, the per-student rollup for everyone
     if batch_id:
-        # Join with Student to filter by batch
-        query = query.join(Student, Attendance.student_id == Student.id)
-        query = query.where(Student.batch_id == batch_id)
-    
-    if start_date:
-        query = query.where(Attendance.class_date >= start_date)
-    if end_date:
-        query = query.where(Attendance.class_date <= end_date)
-    
-    attendance_records = session.exec(query).all()
-    
-    total_records = len(attendance_records)
-    present_records = len([r for r in attendance_records if r.is_present])
-    
-    overall_percentage = (present_records / total_records * 100) if total_records > 0 else 0
-    
-    # Subject-wise attendance
-    subject_stats = {}
-    for record in attendance_records:
-        if record.subject not in subject_stats:
-            subject_stats[record.subject] = {"total": 0, "present": 0}
-        subject_stats[record.subject]["total"] += 1
-        if record.is_present:
-            subject_stats[record.subject]["present"] += 1
-    
-    for subject in subject_stats:
-        stats = subject_stats[subject]
-        stats["percentage"] = (stats["present"] / stats["total"] * 100) if stats["total"] > 0 else 0
+        statement = attendance_rollups.summary_statement(
+            BatchAttendanceDaily, BatchAttendanceDaily.batch_id, batch_id, start_date, end_date
+        )
+    else:
+        statement = attendance_rollups.summary_statement(StudentAttendanceDaily, None, None, start_date, end_date)
+    summary = attendance_rollups.summarize(session.exec(statement).all())
     
     return {
         "overall": {
-            "total_classes": total_records,
-            "present": present_records,
-            "absent": total_records - present_records,
-            "percentage": round(overall_percentage, 2)
+            "total_classes": summary["total"],
+            "present": summary["present"],
+            "absent": summary["total"] - summary["present"],
+            "percentage": round(summary["percentage"], 2)
         },
-        "by_subject": subject_stats
+        "by_subject": summary["by_subject"]
     }
 
 @router.get("/analytics/performance", response_model=dict)
 def get_performance_analytics(
     batch_id: Optional[int] = None,
     subject: Optional[str] = None,
+    pass_percentage: float = Query(40, ge=0, le=100),
     session: Session = Depends(get_session),
     current_user: User = Depends(require_role("admin", "superadmin", "academics"))
 ):
-    query = select(ExamResult, Exam).join(Exam, ExamResult.exam_id == Exam.id)
-    
-    if batch_id:
-        query = query.where(Exam.batch_id == batch_id)
-    if subject:
-        query = query.where(Exam.subject == subject)
-    
-    results = session.exec(query).all()
-    
-    if not results:
+    data = performance_stats.load_results(session, batch_id, subject)
+    if data is None:
         return {"message": "No results found"}
     
-    # Calculate statistics
-    total_results = len(results)
-    total_marks = sum([result.marks_obtained for result, _ in results])
-    total_possible = sum([exam.max_marks for _, exam in results])
-    
-    overall_percentage = (total_marks / total_possible * 100) if total_possible > 0 else 0
-    
-    # Grade distribution
-    grade_distribution = {}
-    for result, _ in results:
-        grade = result.grade
-        grade_distribution[grade] = grade_distribution.get(grade, 0) + 1
-    
-    # Subject-wise performance
-    subject_performance = {}
-    for result, exam in results:
-        subject_name = exam.subject
-        if subject_name not in subject_performance:
-            subject_performance[subject_name] = {
-                "total_marks": 0,
-                "total_possible": 0,
-                "count": 0,
-                "grades": {}
-            }
-        
-        subject_performance[subject_name]["total_marks"] += result.marks_obtained
-        subject_performance[subject_name]["total_possible"] += exam.max_marks
-        subject_performance[subject_name]["count"] += 1
-        
-        grade = result.grade
-        subject_performance[subject_name]["grades"][grade] = \
-            subject_performance[subject_name]["grades"].get(grade, 0) + 1
-    
-    # Calculate percentages for each subject
-    for subject_name in subject_performance:
-        stats = subject_performance[subject_name]
-        stats["percentage"] = (stats["total_marks"] / stats["total_possible"] * 100) \
-            if stats["total_possible"] > 0 else 0
-    
-    return {
-        "overall": {
-            "total_results": total_results,
-            "average_percentage": round(overall_percentage, 2),
-            "grade_distribution": grade_distribution
-        },
-        "by_subject": subject_performance
-    }
+    return performance_stats.performance_summary(data, pass_percentage)
 
 # Bulk Operations
 @router.post("/bulk/activate-users", response_model=dict)
@@ -498,15 +438,17 @@ def bulk_activate_users(
     session: Session = Depends(get_session),
     current_user: User = Depends(require_role("admin", "superadmin"))
 ):
-    activated_count = 0
+    activated = []
     for user_id in user_ids:
         user = session.get(User, user_id)
         if user and not user.is_active:
             user.is_active = True
-            activated_count += 1
+            activated.append(user_id)
     
     session.commit()
-    return {"message": f"Activated {activated_count} users"}
+    for user_id in activated:
+        audit.record(current_user, "user.activate", "user", user_id, {"bulk": True})
+    return {"message": f"Activated {len(activated)} users"}
 
 @router.post("/bulk/deactivate-users", response_model=dict)
 def bulk_deactivate_users(
@@ -514,15 +456,17 @@ def bulk_deactivate_users(
     session: Session = Depends(get_session),
     current_user: User = Depends(require_role("admin", "superadmin"))
 ):
-    deactivated_count = 0
+    deactivated = []
     for user_id in user_ids:
         user = session.get(User, user_id)
         if user and user.is_active and user.id != current_user.id:  # Can't deactivate self
             user.is_active = False
-            deactivated_count += 1
+            deactivated.append(user_id)
     
     session.commit()
-    return {"message": f"Deactivated {deactivated_count} users"}
+    for user_id in deactivated:
+        audit.record(current_user, "user.deactivate", "user", user_id, {"bulk": True})
+    return {"message": f"Deactivated {len(deactivated)} users"}
 
 @router.post("/bulk/assign-batch", response_model=dict)
 def bulk_assign_batch_to_students(
@@ -536,113 +480,173 @@ def bulk_assign_batch_to_students(
     if not batch:
         raise HTTPException(status_code=404, detail="Batch not found")
     
-    assigned_count = 0
+    assigned = []
     for student_id in student_ids:
         student = session.get(Student, student_id)
         if student:
             student.batch_id = batch_id
-            assigned_count += 1
+            assigned.append(student_id)
     
     session.commit()
-    return {"message": f"Assigned {assigned_count} students to batch {batch.name}"}
+    for student_id in assigned:
+        audit.record(current_user, "student.assign_batch", "student", student_id, {"batch_id": batch_id})
+    return {"message": f"Assigned {len(assigned)} students to batch {batch.name}"}
 
 # System Logs and Audit Trail
 @router.get("/logs/user-activity", response_model=List[dict])
 def get_user_activity_logs(
-    limit: int = 100,
-    offset: int = 0,
     user_id: Optional[int] = None,
+    action: Optional[str] = None,
+    entity_type: Optional[str] = None,
+    entity_id: Optional[int] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
+    page: CursorPage = Depends(cursor_page()),
     session: Session = Depends(get_session),
     current_user: User = Depends(require_role("superadmin"))
 ):
-    # This would typically come from an audit log table
-    # For now, we'll return recent user updates as an example
-    query = select(User)
-    
-    if user_id:
-        query = query.where(User.id == user_id)
-    if start_date:
-        query = query.where(User.updated_at >= start_date)
-    if end_date:
-        query = query.where(User.updated_at <= end_date)
-    
-    users = session.exec(
-        query.order_by(User.updated_at.desc())
-        .offset(offset)
-        .limit(limit)
-    ).all()
-    
-    # Format as activity logs
-    logs = []
-    for user in users:
-        logs.append({
-            "user_id": user.id,
-            "username": user.username,
-            "full_name": user.full_name,
-            "action": "profile_updated",
-            "timestamp": user.updated_at,
-            "details": {
-                "role": user.role,
-                "is_active": user.is_active,
-                "last_updated_by": user.created_by
-            }
-        })
-    
-    return logs
+    rows = audit.events_page(
+        session, page, actor_id=user_id, action=action, entity_type=entity_type,
+        entity_id=entity_id, start_date=start_date, end_date=end_date
+    )
+    return [
+        {
+            "id": event.id,
+            "user_id": event.actor_id,
+            "username": username,
+            "full_name": full_name,
+            "action": event.action,
+            "entity_type": event.entity_type,
+            "entity_id": event.entity_id,
+            "timestamp": event.occurred_at,
+            "details": event.details
+        }
+        for event, username, full_name in rows
+    ]
 
-# Database Maintenance
 @router.post("/maintenance/cleanup-notifications", response_model=dict)
 def cleanup_old_notifications(
-    days_old: int = 30,
-    session: Session = Depends(get_session),
+    days_old: Optional[int] = Query(None, ge=0),
+    background: bool = False,
     current_user: User = Depends(require_role("superadmin"))
 ):
-    cutoff_date = datetime.utcnow() - timedelta(days=days_old)
-    
-    old_notifications = session.exec(
-        select(Notification).where(
-            Notification.created_at < cutoff_date,
-            Notification.is_read == True
-        )
-    ).all()
-    
-    deleted_count = len(old_notifications)
-    for notification in old_notifications:
-        session.delete(notification)
-    
-    session.commit()
-    return {"message": f"Deleted {deleted_count} old notifications"}
+    # Batched retention run: the configured per-type policy, or every read notification older than days_old
+    rules = [retention.Rule(f"older_than_{days_old}_days", days_old)] if days_old is not None else None
+    if background:
+        if not notification_retention.run_in_background(rules):
+            raise HTTPException(status_code=409, detail="A notification cleanup is already running")
+        audit.record(current_user, "notifications.cleanup", details={"days_old": days_old, "background": True})
+        return {"message": "Notification cleanup started", "status": notification_retention.stats()}
+    try:
+        result = notification_retention.run(rules)
+    except retention.RetentionBusy:
+        raise HTTPException(status_code=409, detail="A notification cleanup is already running")
+    audit.record(current_user, "notifications.cleanup", details={"days_old": days_old, "deleted": result["deleted"]})
+    return {"message": f"Deleted {result['total_deleted']} old notifications", **result}
+
+@router.get("/maintenance/retention", response_model=dict)
+def get_retention_status(
+    current_user: User = Depends(require_role("admin", "superadmin"))
+):
+    return {"job": notification_retention.stats(), "scheduler": retention_scheduler.stats()}
+
+@router.get("/maintenance/db-pool", response_model=dict)
+def get_db_pool_metrics(
+    current_user: User = Depends(require_role("admin", "superadmin"))
+):
+    # Pools are per process, so figures are for the worker that served this request
+    engines = {
+        "primary": pool_status(engine),
+        "primary_async": pool_status(async_engine.sync_engine)
+    }
+    if read_engine is not engine:
+        engines["replica"] = pool_status(read_engine)
+        engines["replica_async"] = pool_status(async_read_engine.sync_engine)
+    return {
+        "worker_pid": os.getpid(),
+        "engines": engines,
+        "password_pool": security.password_pool.stats(),
+        "login_limiter": login_limiter.stats(),
+        "analytics_cache": analytics_cache.stats(),
+        "audit_log": audit.audit_log.stats(),
+        "search_index": search.directory_index.stats()
+    }
 
 # Export Data
-@router.get("/export/users", response_model=List[dict])
+USER_EXPORT_COLUMNS = [
+    User.id, User.username, User.email, User.full_name, User.role, User.department,
+    User.phone, User.is_active, User.created_at, User.updated_at
+]
+
+@router.get("/export/users")
 def export_users_data(
     role: Optional[str] = None,
-    session: Session = Depends(get_session),
+    format: str = Query("json", pattern="^(csv|ndjson|json|arrow|parquet)$"),
+    gzip: bool = False,
     current_user: User = Depends(require_role("admin", "superadmin"))
 ):
-    query = select(User)
+    # Streamed in chunks from a server-side cursor, so memory stays flat however many users there are
+    query = select(*USER_EXPORT_COLUMNS).order_by(User.id)
     
     if role:
         query = query.where(User.role == role)
     
-    users = session.exec(query).all()
-    
-    # Format for export
-    export_data = []
-    for user in users:
-        export_data.append({
-            "id": user.id,
-            "username": user.username,
-            "email": user.email,
-            "full_name": user.full_name,
-            "role": user.role,
-            "department": user.department,
-            "phone": user.phone,
-            "is_active": user.is_active,
-            "created_at": user.created_at.isoformat() if user.created_at else None,
-            "updated_at": user.updated_at.isoformat() if user.updated_at else None
-        })
-    
-    return export_data
+    return exports.export_response(
+        query, [column.key for column in USER_EXPORT_COLUMNS], format, "users", gzip=gzip
+    )
+
+# entity -> (columns, starting from the first column's table; joins; date column, batch column, subject column); filters are pushed into the query
+EXPORT_ENTITIES = {
+    "attendance": (
+        [Attendance.id, Attendance.student_id, Student.batch_id, Attendance.teacher_id, Attendance.subject,
+         Attendance.class_date, Attendance.is_present, Attendance.marked_at, Attendance.remarks],
+        [(Student, Student.id == Attendance.student_id)],
+        Attendance.class_date, Student.batch_id, Attendance.subject
+    ),
+    "exam-results": (
+        [ExamResult.id, ExamResult.exam_id, Exam.title.label("exam_title"), Exam.subject, Exam.batch_id,
+         Exam.exam_date, ExamResult.student_id, ExamResult.teacher_id, ExamResult.marks_obtained,
+         Exam.max_marks, ExamResult.grade, ExamResult.entered_at],
+        [(Exam, Exam.id == ExamResult.exam_id)],
+        Exam.exam_date, Exam.batch_id, Exam.subject
+    ),
+    "payments": (
+        [Payment.id, Payment.student_id, Student.batch_id, Payment.amount, Payment.payment_type,
+         Payment.payment_method, Payment.payment_date, Payment.due_date, Payment.status, Payment.collected_by],
+        [(Student, Student.id == Payment.student_id)],
+        Payment.payment_date, Student.batch_id, None
+    ),
+}
+
+@router.get("/export/{entity}")
+def export_entity_data(
+    entity: str,
+    batch_id: Optional[int] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    subject: Optional[str] = None,
+    format: str = Query("csv", pattern="^(csv|ndjson|json|arrow|parquet)$"),
+    gzip: bool = False,
+    current_user: User = Depends(require_role("admin", "superadmin"))
+):
+    if entity not in EXPORT_ENTITIES:
+        raise HTTPException(status_code=404, detail=f"Unknown export '{entity}', use one of: {', '.join(EXPORT_ENTITIES)}")
+    columns, joins, date_column, batch_column, subject_column = EXPORT_ENTITIES[entity]
+    if subject and subject_column is None:
+        raise HTTPException(status_code=400, detail=f"'{entity}' cannot be filtered by subject")
+
+    query = select(*columns).select_from(columns[0].class_)
+    for model, on in joins:
+        query = query.join(model, on)
+    if batch_id:
+        query = query.where(batch_column == batch_id)
+    if subject:
+        query = query.where(subject_column == subject)
+    if start_date:
+        query = query.where(date_column >= start_date)
+    if end_date:
+        query = query.where(date_column <= end_date)
+
+    return exports.export_response(
+        query.order_by(columns[0]), [column.key for column in columns], format, entity.replace("-", "_"), gzip=gzip
+    )
@@ -1,15 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlmodel import Session, select
 from datetime import timedelta, datetime
 from ..database import get_session
 from ..models import User
-from ..schemas import Token, UserCreate, UserRead, LoginRequest, UserUpdate
-from ..core.security import verify_password, get_password_hash, create_access_token
-from ..core.deps import get_current_user
+from ..schemas import Token, UserCreate, UserRead, LoginRequest, UserUpdate, RefreshRequest, TokenRefresh
+from ..core.security import verify_password_and_update, get_password_hash, create_access_token
+from ..core.deps import get_current_user, principal_claims
+from ..core.sessions import open_session, rotate_session, close_session
+from ..core.rate_limit import limit_login
+from ..core.token_epochs import set_rehashed_password
+from ..config import settings
 
 router = APIRouter(prefix="/auth", tags=["auth"]) 
 
+def _access_token(session: Session, user: User) -> str:
+    access_token_expires = timedelta(minutes=60)
+    claims = principal_claims(session, user) if settings.STATELESS_TOKENS else None
+    return create_access_token(user.username, expires_delta=access_token_expires, claims=claims)
+
 @router.post('/register', response_model=UserRead)
 def register(payload: UserCreate, session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
     # Only admin can create new users
@@ -40,16 +49,26 @@ def register(payload: UserCreate, session: Session = Depends(get_session), curre
     return user
 
 @router.post('/login', response_model=Token)
-def login(login_data: LoginRequest, session: Session = Depends(get_session)):
+def login(login_data: LoginRequest, request: Request, session: Session = Depends(get_session)):
+    # Fail fast on bursts and credential stuffing before any query or bcrypt work
+    limit_login(request, login_data.username)
     stmt = select(User).where((User.username == login_data.username) | (User.email == login_data.username))
     user = session.exec(stmt).first()
-    if not user or not verify_password(login_data.password, user.hashed_password):
+    if not user:
+        raise HTTPException(status_code=400, detail="Incorrect username or password")
+    valid, new_hash = verify_password_and_update(login_data.password, user.hashed_password)
+    if not valid:
         raise HTTPException(status_code=400, detail="Incorrect username or password")
     if not user.is_active:
         raise HTTPException(status_code=400, detail="User account is deactivated")
     
-    access_token_expires = timedelta(minutes=60)
-    token = create_access_token(user.username, expires_delta=access_token_expires)
+    # Stored hash used an old cost factor; upgrade it while we have the plain password
+    if new_hash:
+        set_rehashed_password(session, user, new_hash)
+        session.add(user)
+        session.commit()
+    
+    token = _access_token(session, user)
     # Convert user to dict manually to avoid model validation issues
     user_data = {
         "id": user.id,
@@ -64,13 +83,31 @@ def login(login_data: LoginRequest, session: Session = Depends(get_session)):
         "created_at": user.created_at,
         "updated_at": user.updated_at
     }
+    # Opened last: its commit expires the loaded user
+    refresh_token = open_session(session, user, request.headers.get("user-agent"))
     
     return {
         "access_token": token, 
         "token_type": "bearer",
-        "user": user_data
+        "user": user_data,
+        "refresh_token": refresh_token
     }
 
+@router.post('/refresh', response_model=TokenRefresh)
+def refresh(payload: RefreshRequest, session: Session = Depends(get_session)):
+    # No password check: the rotated refresh token proves the sign-in, so bcrypt runs once per device session
+    user, refresh_token = rotate_session(session, payload.refresh_token)
+    return {
+        "access_token": _access_token(session, user),
+        "refresh_token": refresh_token,
+        "token_type": "bearer"
+    }
+
+@router.post('/logout')
+def logout(payload: RefreshRequest, session: Session = Depends(get_session)):
+    close_session(session, payload.refresh_token)
+    return {"message": "Logged out"}
+
 # Endpoint for initial super admin creation (should be secured in production)
 @router.post('/create-superadmin', response_model=UserRead)
 def create_initial_superadmin(session: Session = Depends(get_session)):
@@ -3,9 +3,11 @@ from sqlmodel import Session, select
 from typing import List, Optional
 from datetime import datetime
 from ..database import get_session
-from ..models import User, FeedbackForm, Student
+from ..models import User, FeedbackForm
 from ..schemas import FeedbackCreate, FeedbackRead, FeedbackResponse
-from ..core.deps import get_current_user, require_role
+from ..core.deps import Principal, get_principal, require_role
+from ..core import audit
+from ..core.pagination import CursorPage, cursor_page, paginate
 from .notifications import send_student_issue_notification
 
 router = APIRouter(prefix="/feedback", tags=["feedback"])
@@ -14,23 +16,18 @@ router = APIRouter(prefix="/feedback", tags=["feedback"])
 def submit_feedback(
     feedback: FeedbackCreate,
     session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    principal: Principal = Depends(get_principal)
 ):
     # Check if user is a student
-    if current_user.role != "student":
+    if principal.role != "student":
         raise HTTPException(status_code=403, detail="Only students can submit feedback")
     
-    # Get student record
-    student = session.exec(
-        select(Student).where(Student.user_id == current_user.id)
-    ).first()
-    
-    if not student:
+    if not principal.student_id:
         raise HTTPException(status_code=404, detail="Student record not found")
     
     # Create feedback
     db_feedback = FeedbackForm(
-        student_id=student.id,
+        student_id=principal.student_id,
         feedback_type=feedback.feedback_type,
         subject=feedback.subject,
         message=feedback.message,
@@ -55,44 +52,31 @@ def submit_feedback(
 
 @router.get("/my-feedback", response_model=List[FeedbackRead])
 def get_my_feedback(
-    limit: int = 50,
-    offset: int = 0,
     status: Optional[str] = None,
+    page: CursorPage = Depends(cursor_page(50)),
     session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    principal: Principal = Depends(get_principal)
 ):
     # Check if user is a student
-    if current_user.role != "student":
+    if principal.role != "student":
         raise HTTPException(status_code=403, detail="Only students can view their feedback")
     
-    # Get student record
-    student = session.exec(
-        select(Student).where(Student.user_id == current_user.id)
-    ).first()
-    
-    if not student:
+    if not principal.student_id:
         raise HTTPException(status_code=404, detail="Student record not found")
     
-    query = select(FeedbackForm).where(FeedbackForm.student_id == student.id)
+    query = select(FeedbackForm).where(FeedbackForm.student_id == principal.student_id)
     
     if status:
         query = query.where(FeedbackForm.status == status)
     
-    feedback_list = session.exec(
-        query.order_by(FeedbackForm.submitted_at.desc())
-        .offset(offset)
-        .limit(limit)
-    ).all()
-    
-    return feedback_list
+    return paginate(session, query, page, FeedbackForm.submitted_at)
 
 @router.get("/", response_model=List[FeedbackRead])
 def get_all_feedback(
-    limit: int = 50,
-    offset: int = 0,
     status: Optional[str] = None,
     priority: Optional[str] = None,
     feedback_type: Optional[str] = None,
+    page: CursorPage = Depends(cursor_page(50)),
     session: Session = Depends(get_session),
     current_user: User = Depends(require_role("admin", "superadmin", "management"))
 ):
@@ -106,30 +90,16 @@ def get_all_feedback(
     if feedback_type:
         query = query.where(FeedbackForm.feedback_type == feedback_type)
     
-    feedback_list = session.exec(
-        query.order_by(FeedbackForm.submitted_at.desc())
-        .offset(offset)
-        .limit(limit)
-    ).all()
-    
-    return feedback_list
+    return paginate(session, query, page, FeedbackForm.submitted_at)
 
 @router.get("/pending", response_model=List[FeedbackRead])
 def get_pending_feedback(
-    limit: int = 50,
-    offset: int = 0,
+    page: CursorPage = Depends(cursor_page(50)),
     session: Session = Depends(get_session),
     current_user: User = Depends(require_role("admin", "superadmin", "management"))
 ):
-    feedback_list = session.exec(
-        select(FeedbackForm)
-        .where(FeedbackForm.status == "pending")
-        .order_by(FeedbackForm.submitted_at.desc())
-        .offset(offset)
-        .limit(limit)
-    ).all()
-    
-    return feedback_list
+    query = select(FeedbackForm).where(FeedbackForm.status == "pending")
+    return paginate(session, query, page, FeedbackForm.submitted_at)
 
 @router.get("/stats", response_model=dict)
 def get_feedback_stats(
@@ -177,21 +147,18 @@ def get_feedback_stats(
 def get_feedback_detail(
     feedback_id: int,
     session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    principal: Principal = Depends(get_principal)
 ):
     feedback = session.get(FeedbackForm, feedback_id)
     if not feedback:
         raise HTTPException(status_code=404, detail="Feedback not found")
     
     # Check permissions
-    if current_user.role == "student":
+    if principal.role == "student":
         # Students can only view their own feedback
-        student = session.exec(
-            select(Student).where(Student.user_id == current_user.id)
-        ).first()
-        if not student or feedback.student_id != student.id:
+        if not principal.student_id or feedback.student_id != principal.student_id:
             raise HTTPException(status_code=403, detail="Not authorized to view this feedback")
-    elif current_user.role not in ["admin", "superadmin", "management"]:
+    elif principal.role not in ["admin", "superadmin", "management"]:
         raise HTTPException(status_code=403, detail="Not authorized to view feedback")
     
     return feedback
@@ -215,6 +182,7 @@ def respond_to_feedback(
     
     session.commit()
     session.refresh(feedback)
+    audit.record(current_user, "feedback.respond", "feedback", feedback_id, {"status": response.status})
     
     # Send notification to student (if not anonymous)
     if not feedback.is_anonymous and feedback.student and feedback.student.user:
@@ -257,6 +225,7 @@ def update_feedback_status(
     
     session.commit()
     session.refresh(feedback)
+    audit.record(current_user, "feedback.set_status", "feedback", feedback_id, {"status": status})
     
     return feedback
 
@@ -279,6 +248,7 @@ def update_feedback_priority(
     feedback.priority = priority
     session.commit()
     session.refresh(feedback)
+    audit.record(current_user, "feedback.set_priority", "feedback", feedback_id, {"priority": priority})
     
     return feedback
 
@@ -294,6 +264,7 @@ def delete_feedback(
     
     session.delete(feedback)
     session.commit()
+    audit.record(current_user, "feedback.delete", "feedback", feedback_id)
     
     return {"message": "Feedback deleted successfully"}
 
@@ -310,7 +281,7 @@ def bulk_update_status(
     if status not in valid_statuses:
         raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of: {valid_statuses}")
     
-    updated_count = 0
+    updated = []
     for feedback_id in feedback_ids:
         feedback = session.get(FeedbackForm, feedback_id)
         if feedback:
@@ -318,10 +289,12 @@ def bulk_update_status(
             if status == "resolved" and not feedback.resolved_at:
                 feedback.resolved_at = datetime.utcnow()
                 feedback.resolved_by = current_user.id
-            updated_count += 1
+            updated.append(feedback_id)
     
     session.commit()
-    return {"message": f"Updated status for {updated_count} feedback items"}
+    for feedback_id in updated:
+        audit.record(current_user, "feedback.set_status", "feedback", feedback_id, {"status": status, "bulk": True})
+    return {"message": f"Updated status for {len(updated)} feedback items"}
 
 @router.put("/bulk/priority", response_model=dict)
 def bulk_update_priority(
@@ -335,12 +308,14 @@ def bulk_update_priority(
     if priority not in valid_priorities:
         raise HTTPException(status_code=400, detail=f"Invalid priority. Must be one of: {valid_priorities}")
     
-    updated_count = 0
+    updated = []
     for feedback_id in feedback_ids:
         feedback = session.get(FeedbackForm, feedback_id)
         if feedback:
             feedback.priority = priority
-            updated_count += 1
+            updated.append(feedback_id)
     
     session.commit()
-    return {"message": f"Updated priority for {updated_count} feedback items"}
+    for feedback_id in updated:
+        audit.record(current_user, "feedback.set_priority", "feedback", feedback_id, {"priority": priority, "bulk": True})
+    return {"message": f"Updated priority for {len(updated)} feedback items"}
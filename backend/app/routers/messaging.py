@@ -1,11 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
-from sqlmodel import Session, select
+from sqlalchemy import case, update
+from sqlmodel import Session, select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List, Dict
 from datetime import datetime
-from ..database import get_session
+from ..database import get_session, get_async_session, get_async_primary_session
 from ..models import User, Message, GroupMessage, ChatGroup, ChatGroupMember
 from ..schemas import MessageCreate, MessageRead, GroupMessageCreate, GroupMessageRead, ChatGroupCreate, ChatGroupRead, ChatGroupMemberAdd
-from ..core.deps import get_current_user
+from ..core.deps import get_current_user, get_current_user_async
+from ..core.query_stats import query_budget
+from ..core.pagination import CursorPage, cursor_page, paginate_async
 
 router = APIRouter(prefix="/messaging", tags=["messaging"])
 
@@ -88,105 +92,96 @@ def send_message(
     return db_message
 
 @router.get("/messages/conversations", response_model=List[dict])
-def get_conversations(
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+@query_budget(4)
+async def get_conversations(
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user_async)
 ):
-    # Get all users who have conversations with current user
-    sent_messages = session.exec(
-        select(Message.receiver_id)
-        .where(Message.sender_id == current_user.id)
-        .distinct()
-    ).all()
+    # The other participant of each message, and its position within that conversation
+    partner_id = case(
+        (Message.sender_id == current_user.id, Message.receiver_id),
+        else_=Message.sender_id
+    ).label("partner_id")
+    position = func.row_number().over(
+        partition_by=partner_id,
+        order_by=(Message.sent_at.desc(), Message.id.desc())
+    ).label("position")
+    ranked = (
+        select(Message.id, partner_id, position)
+        .where((Message.sender_id == current_user.id) | (Message.receiver_id == current_user.id))
+        .subquery()
+    )
     
-    received_messages = session.exec(
-        select(Message.sender_id)
-        .where(Message.receiver_id == current_user.id)
-        .distinct()
-    ).all()
+    # Last message per conversation
+    last_messages = {
+        partner: message
+        for message, partner in (await session.exec(
+            select(Message, ranked.c.partner_id)
+            .join(ranked, Message.id == ranked.c.id)
+            .where(ranked.c.position == 1)
+        )).all()
+    }
+    
+    # Unread counts per sender
+    unread_counts = dict((await session.exec(
+        select(Message.sender_id, func.count())
+        .where(Message.receiver_id == current_user.id, Message.is_read == False)
+        .group_by(Message.sender_id)
+    )).all())
     
-    # Combine and get unique user IDs
-    conversation_user_ids = set(sent_messages + received_messages)
+    users = (await session.exec(
+        select(User).where(User.id.in_(list(last_messages)))
+    )).all()
     
     conversations = []
-    for user_id in conversation_user_ids:
-        user = session.get(User, user_id)
-        if user:
-            # Get last message
-            last_message = session.exec(
-                select(Message)
-                .where(
-                    ((Message.sender_id == current_user.id) & (Message.receiver_id == user_id)) |
-                    ((Message.sender_id == user_id) & (Message.receiver_id == current_user.id))
-                )
-                .order_by(Message.sent_at.desc())
-            ).first()
-            
-            # Count unread messages
-            unread_count = session.exec(
-                select(Message)
-                .where(
-                    Message.sender_id == user_id,
-                    Message.receiver_id == current_user.id,
-                    Message.is_read == False
-                )
-            ).all()
-            
-            conversations.append({
-                "user_id": user.id,
-                "username": user.username,
-                "full_name": user.full_name,
-                "profile_image": user.profile_image,
-                "last_message": {
-                    "content": last_message.content if last_message else None,
-                    "sent_at": last_message.sent_at if last_message else None,
-                    "is_from_me": last_message.sender_id == current_user.id if last_message else False
-                },
-                "unread_count": len(unread_count)
-            })
+    for user in users:
+        last_message = last_messages[user.id]
+        conversations.append({
+            "user_id": user.id,
+            "username": user.username,
+            "full_name": user.full_name,
+            "profile_image": user.profile_image,
+            "last_message": {
+                "content": last_message.content,
+                "sent_at": last_message.sent_at,
+                "is_from_me": last_message.sender_id == current_user.id
+            },
+            "unread_count": unread_counts.get(user.id, 0)
+        })
     
     # Sort by last message time
     conversations.sort(key=lambda x: x["last_message"]["sent_at"] or datetime.min, reverse=True)
     return conversations
 
 @router.get("/messages/{user_id}", response_model=List[MessageRead])
-def get_messages_with_user(
+@query_budget(3)
+async def get_messages_with_user(
     user_id: int,
-    limit: int = 50,
-    offset: int = 0,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    page: CursorPage = Depends(cursor_page(50)),
+    session: AsyncSession = Depends(get_async_primary_session),
+    current_user: User = Depends(get_current_user_async)
 ):
-    messages = session.exec(
-        select(Message)
-        .where(
-            ((Message.sender_id == current_user.id) & (Message.receiver_id == user_id)) |
-            ((Message.sender_id == user_id) & (Message.receiver_id == current_user.id))
-        )
-        .order_by(Message.sent_at.desc())
-        .offset(offset)
-        .limit(limit)
-    ).all()
+    # Newest page first; X-Next-Cursor fetches older messages
+    messages = await paginate_async(session, select(Message).where(
+        ((Message.sender_id == current_user.id) & (Message.receiver_id == user_id)) |
+        ((Message.sender_id == user_id) & (Message.receiver_id == current_user.id))
+    ), page, Message.sent_at)
     
     # Mark messages as read
-    session.exec(
-        select(Message)
+    await session.exec(
+        update(Message)
         .where(
             Message.sender_id == user_id,
             Message.receiver_id == current_user.id,
             Message.is_read == False
         )
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
     )
-    for msg in session.exec(
-        select(Message)
-        .where(
-            Message.sender_id == user_id,
-            Message.receiver_id == current_user.id,
-            Message.is_read == False
-        )
-    ).all():
-        msg.is_read = True
-    session.commit()
+    await session.commit()
+    for msg in messages:
+        if msg.sender_id == user_id:
+            msg.is_read = True
     
     return list(reversed(messages))  # Return in chronological order
 
@@ -218,15 +213,15 @@ def create_group(
     return db_group
 
 @router.get("/groups/", response_model=List[ChatGroupRead])
-def get_my_groups(
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+async def get_my_groups(
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user_async)
 ):
-    groups = session.exec(
+    groups = (await session.exec(
         select(ChatGroup)
         .join(ChatGroupMember, ChatGroup.id == ChatGroupMember.group_id)
         .where(ChatGroupMember.user_id == current_user.id, ChatGroup.is_active == True)
-    ).all()
+    )).all()
     return groups
 
 @router.post("/groups/{group_id}/members", response_model=dict)
@@ -338,58 +333,51 @@ def send_group_message(
     return db_message
 
 @router.get("/groups/{group_id}/messages", response_model=List[GroupMessageRead])
-def get_group_messages(
+async def get_group_messages(
     group_id: int,
-    limit: int = 50,
-    offset: int = 0,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    page: CursorPage = Depends(cursor_page(50)),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user_async)
 ):
     # Check if user is member of the group
-    membership = session.exec(
+    membership = (await session.exec(
         select(ChatGroupMember)
         .where(
             ChatGroupMember.group_id == group_id,
             ChatGroupMember.user_id == current_user.id
         )
-    ).first()
+    )).first()
     
     if not membership:
         raise HTTPException(status_code=403, detail="You are not a member of this group")
     
-    messages = session.exec(
-        select(GroupMessage)
-        .where(GroupMessage.group_id == group_id)
-        .order_by(GroupMessage.sent_at.desc())
-        .offset(offset)
-        .limit(limit)
-    ).all()
+    messages = await paginate_async(session, select(GroupMessage).where(GroupMessage.group_id == group_id), page, GroupMessage.sent_at)
     
     return list(reversed(messages))  # Return in chronological order
 
 @router.get("/groups/{group_id}/members", response_model=List[dict])
-def get_group_members(
+async def get_group_members(
     group_id: int,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user_async)
 ):
     # Check if user is member of the group
-    membership = session.exec(
+    membership = (await session.exec(
         select(ChatGroupMember)
         .where(
             ChatGroupMember.group_id == group_id,
             ChatGroupMember.user_id == current_user.id
         )
-    ).first()
+    )).first()
     
     if not membership:
         raise HTTPException(status_code=403, detail="You are not a member of this group")
     
-    members = session.exec(
+    members = (await session.exec(
         select(User, ChatGroupMember)
         .join(ChatGroupMember, User.id == ChatGroupMember.user_id)
         .where(ChatGroupMember.group_id == group_id)
-    ).all()
+    )).all()
     
     return [
         {
@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+from sqlmodel import Session, select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List, Dict, Any
 from datetime import datetime, timedelta
-from ..database import get_session
+from ..database import get_session, get_async_session
 from ..models import User, Notification, NotificationType, ClassAssignment, Exam, Task
 from ..schemas import NotificationCreate, NotificationRead
-from ..core.deps import get_current_user
+from ..core.deps import get_current_user, get_current_user_async
+from ..core.query_stats import query_budget
+from ..core.pagination import CursorPage, cursor_page, paginate_async
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
@@ -27,25 +30,19 @@ def create_notification(
     return db_notification
 
 @router.get("/", response_model=List[NotificationRead])
-def get_my_notifications(
-    limit: int = 50,
-    offset: int = 0,
+@query_budget(2)
+async def get_my_notifications(
     unread_only: bool = False,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    page: CursorPage = Depends(cursor_page(50)),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user_async)
 ):
     query = select(Notification).where(Notification.user_id == current_user.id)
     
     if unread_only:
         query = query.where(Notification.is_read == False)
     
-    notifications = session.exec(
-        query.order_by(Notification.created_at.desc())
-        .offset(offset)
-        .limit(limit)
-    ).all()
-    
-    return notifications
+    return await paginate_async(session, query, page, Notification.created_at)
 
 @router.put("/{notification_id}/read", response_model=NotificationRead)
 def mark_notification_read(
@@ -84,16 +81,17 @@ def mark_all_notifications_read(
     return {"message": f"Marked {len(notifications)} notifications as read"}
 
 @router.get("/unread-count", response_model=dict)
-def get_unread_count(
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+@query_budget(2)
+async def get_unread_count(
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user_async)
 ):
-    count = len(session.exec(
-        select(Notification).where(
+    count = (await session.exec(
+        select(func.count()).select_from(Notification).where(
             Notification.user_id == current_user.id,
             Notification.is_read == False
         )
-    ).all())
+    )).one()
     
     return {"unread_count": count}
 
@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+import hashlib
+import json
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlmodel import Session, select
 from typing import List
 from ..database import get_session
 from ..models import User, Permission, RolePermission, UserPermission, UserRole
-from ..schemas import PermissionCreate, PermissionRead, RolePermissionCreate, UserPermissionCreate
-from ..core.deps import get_current_user, require_role
+from ..schemas import (
+    PermissionCreate, PermissionRead, RolePermissionCreate, UserPermissionCreate,
+    PermissionCheckBatch, PermissionCheckBatchResult
+)
+from ..core.deps import Principal, get_principal, require_role
+from ..core.permission_matrix import permission_matrix
+from ..core import audit
 
 router = APIRouter(prefix="/permissions", tags=["permissions"])
 
@@ -25,6 +32,7 @@ def create_permission(
     session.add(db_permission)
     session.commit()
     session.refresh(db_permission)
+    audit.record(current_user, "permission.create", "permission", db_permission.id, {"name": db_permission.name})
     return db_permission
 
 @router.get("/", response_model=List[PermissionRead])
@@ -61,6 +69,10 @@ def assign_role_permission(
         session.add(db_role_permission)
     
     session.commit()
+    audit.record(
+        current_user, "permission.set_role", "permission", role_permission.permission_id,
+        {"role": role_permission.role, "granted": role_permission.granted}
+    )
     return {"message": "Role permission updated successfully"}
 
 @router.post("/user-permissions/", response_model=dict)
@@ -97,6 +109,10 @@ def assign_user_permission(
         session.add(db_user_permission)
     
     session.commit()
+    audit.record(
+        current_user, "permission.set_user", "user", user_permission.user_id,
+        {"permission_id": user_permission.permission_id, "granted": user_permission.granted}
+    )
     return {"message": "User permission updated successfully"}
 
 @router.get("/role/{role}/permissions", response_model=List[PermissionRead])
@@ -105,12 +121,8 @@ def get_role_permissions(
     session: Session = Depends(get_session),
     current_user: User = Depends(require_role("superadmin", "admin"))
 ):
-    role_permissions = session.exec(
-        select(Permission)
-        .join(RolePermission, Permission.id == RolePermission.permission_id)
-        .where(RolePermission.role == role, RolePermission.granted == True)
-    ).all()
-    return role_permissions
+    permission_matrix.ensure_loaded(session)
+    return permission_matrix.permissions_for(role)
 
 @router.get("/user/{user_id}/permissions", response_model=List[PermissionRead])
 def get_user_permissions(
@@ -118,84 +130,62 @@ def get_user_permissions(
     session: Session = Depends(get_session),
     current_user: User = Depends(require_role("superadmin", "admin"))
 ):
-    # Get role-based permissions
     user = session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    role_permissions = session.exec(
-        select(Permission)
-        .join(RolePermission, Permission.id == RolePermission.permission_id)
-        .where(RolePermission.role == user.role, RolePermission.granted == True)
-    ).all()
-    
-    # Get user-specific permissions
-    user_permissions = session.exec(
-        select(Permission)
-        .join(UserPermission, Permission.id == UserPermission.permission_id)
-        .where(UserPermission.user_id == user_id, UserPermission.granted == True)
-    ).all()
-    
-    # Combine and deduplicate
-    all_permissions = {p.id: p for p in role_permissions}
-    for p in user_permissions:
-        all_permissions[p.id] = p
-    
-    return list(all_permissions.values())
+    # Role-based plus user-specific permissions
+    permission_matrix.ensure_loaded(session)
+    return permission_matrix.permissions_for(user.role, user.id)
 
 # Helper function to check if user has specific permission
 def has_permission(user: User, resource: str, action: str, session: Session) -> bool:
-    # Check role-based permissions
-    role_permission = session.exec(
-        select(RolePermission)
-        .join(Permission, RolePermission.permission_id == Permission.id)
-        .where(
-            RolePermission.role == user.role,
-            Permission.resource == resource,
-            Permission.action == action,
-            RolePermission.granted == True
-        )
-    ).first()
-    
-    if role_permission:
-        return True
-    
-    # Check user-specific permissions
-    user_permission = session.exec(
-        select(UserPermission)
-        .join(Permission, UserPermission.permission_id == Permission.id)
-        .where(
-            UserPermission.user_id == user.id,
-            Permission.resource == resource,
-            Permission.action == action,
-            UserPermission.granted == True
-        )
-    ).first()
-    
-    return user_permission is not None
+    # Granted by the user's role or by a user-specific grant; answered from memory
+    permission_matrix.ensure_loaded(session)
+    return permission_matrix.has_permission(user.role, user.id, resource, action)
 
 @router.get("/my-permissions", response_model=List[PermissionRead])
 def get_my_permissions(
     session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    principal: Principal = Depends(get_principal)
 ):
-    # Get role-based permissions
-    role_permissions = session.exec(
-        select(Permission)
-        .join(RolePermission, Permission.id == RolePermission.permission_id)
-        .where(RolePermission.role == current_user.role, RolePermission.granted == True)
-    ).all()
-    
-    # Get user-specific permissions
-    user_permissions = session.exec(
-        select(Permission)
-        .join(UserPermission, Permission.id == UserPermission.permission_id)
-        .where(UserPermission.user_id == current_user.id, UserPermission.granted == True)
-    ).all()
-    
-    # Combine and deduplicate
-    all_permissions = {p.id: p for p in role_permissions}
-    for p in user_permissions:
-        all_permissions[p.id] = p
-    
-    return list(all_permissions.values())
+    # Role-based plus user-specific permissions
+    permission_matrix.ensure_loaded(session)
+    return permission_matrix.permissions_for(principal.role, principal.user_id)
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [value.strip().removeprefix("W/") for value in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+@router.post("/check-batch", response_model=PermissionCheckBatchResult)
+def check_permissions_batch(
+    payload: PermissionCheckBatch,
+    request: Request,
+    response: Response,
+    session: Session = Depends(get_session),
+    principal: Principal = Depends(get_principal)
+):
+    # Answer every (resource, action) pair the UI needs in one round trip
+    permission_matrix.ensure_loaded(session)
+    results = [
+        {
+            "resource": check.resource,
+            "action": check.action,
+            "granted": permission_matrix.has_permission(principal.role, principal.user_id, check.resource, check.action)
+        }
+        for check in payload.checks
+    ]
+    body = {"role": principal.role.value, "results": results}
+    
+    # The ETag hashes the answer itself, so it stays valid across workers whose
+    # matrix versions differ and changes as soon as any answer does
+    etag = '"%s"' % hashlib.sha256(json.dumps(body, sort_keys=True).encode()).hexdigest()[:32]
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "X-Permission-Version": str(permission_matrix.version)}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return body
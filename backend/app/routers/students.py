@@ -4,6 +4,7 @@ from ..database import get_session
 from ..models import Student
 from ..schemas import StudentCreate, StudentRead
 from ..core.deps import require_role
+from ..core.pagination import CursorPage, cursor_page, paginate
 
 router = APIRouter(prefix="/students", tags=["students"])
 
@@ -16,10 +17,9 @@ def create_student(payload: StudentCreate, session: Session = Depends(get_sessio
     return st
 
 @router.get('/', response_model=list[StudentRead])
-def list_students(session: Session = Depends(get_session), _=Depends(require_role('admin','teacher','academic'))):
+def list_students(page: CursorPage = Depends(cursor_page()), session: Session = Depends(get_session), _=Depends(require_role('admin','teacher','academic'))):
     stmt = select(Student)
-    res = session.exec(stmt).all()
-    return res
+    return paginate(session, stmt, page, Student.id, descending=False)
 
 @router.get('/{student_id}', response_model=StudentRead)
 def get_student(student_id: int, session: Session = Depends(get_session), _=Depends(require_role('admin','teacher','academic'))):
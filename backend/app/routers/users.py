@@ -7,6 +7,9 @@ from ..models import User, UserRole
 from ..schemas import UserRead, UserUpdate, UserCreate
 from ..core.deps import require_role, require_admin, get_current_user
 from ..core.security import get_password_hash
+from ..core import audit
+from ..core.pagination import CursorPage, cursor_page, paginate
+from ..core.sessions import delete_user_sessions
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -16,10 +19,9 @@ def me(current_user: User = Depends(get_current_user)):
 
 @router.get('/', response_model=List[UserRead])
 def list_users(
-    skip: int = 0,
-    limit: int = 100,
     role: str = None,
     is_active: bool = None,
+    page: CursorPage = Depends(cursor_page()),
     session: Session = Depends(get_session), 
     _=Depends(require_admin)
 ):
@@ -28,9 +30,7 @@ def list_users(
         stmt = stmt.where(User.role == role)
     if is_active is not None:
         stmt = stmt.where(User.is_active == is_active)
-    stmt = stmt.offset(skip).limit(limit)
-    users = session.exec(stmt).all()
-    return users
+    return paginate(session, stmt, page, User.id, descending=False)
 
 @router.get('/{user_id}', response_model=UserRead)
 def get_user(user_id: int, session: Session = Depends(get_session), _=Depends(require_admin)):
@@ -76,6 +76,7 @@ def update_user(
     session.add(user)
     session.commit()
     session.refresh(user)
+    audit.record(current_user, "user.update", "user", user_id, {"fields": audit.changed_fields(update_data)})
     return user
 
 @router.delete('/{user_id}')
@@ -91,8 +92,11 @@ def delete_user(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
+    # user_session rows reference the user; they go in the same transaction
+    delete_user_sessions(session, user_id)
     session.delete(user)
     session.commit()
+    audit.record(current_user, "user.delete", "user", user_id)
     return {"message": "User deleted successfully"}
 
 @router.post('/{user_id}/toggle-status', response_model=UserRead)
@@ -113,6 +117,7 @@ def toggle_user_status(
     session.add(user)
     session.commit()
     session.refresh(user)
+    audit.record(current_user, "user.activate" if user.is_active else "user.deactivate", "user", user_id)
     return user
 
 @router.get('/roles/list')
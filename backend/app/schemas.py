@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from .models import UserRole, NotificationType, MessageType, FeedbackType, BehaviorType
@@ -7,6 +7,15 @@ class Token(BaseModel):
     access_token: str
     token_type: str
     user: 'UserRead'
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class TokenRefresh(BaseModel):
+    access_token: str
+    refresh_token: str
+    token_type: str
 
 class TokenPayload(BaseModel):
     sub: Optional[str] = None
@@ -95,6 +104,20 @@ class UserPermissionCreate(BaseModel):
     permission_id: int
     granted: bool = True
 
+class PermissionCheck(BaseModel):
+    resource: str
+    action: str
+
+class PermissionCheckBatch(BaseModel):
+    checks: List[PermissionCheck] = Field(max_length=500)
+
+class PermissionCheckResult(PermissionCheck):
+    granted: bool
+
+class PermissionCheckBatchResult(BaseModel):
+    role: UserRole
+    results: List[PermissionCheckResult]
+
 # Teacher Schemas
 class TeacherCreate(BaseModel):
     user_id: int
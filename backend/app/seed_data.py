@@ -5,12 +5,21 @@ Database seed script for Edudemy Application
 Creates initial permissions, role permissions, and super admin user
 """
 
+import csv
+import io
+import itertools
+import random
+import time
+from sqlalchemy import func, insert
 from sqlmodel import Session, select
-from datetime import datetime
+from datetime import datetime, timedelta
+from .core import attendance_rollups
 from .database import engine, init_db
 from .models import (
     User, Permission, RolePermission, UserRole,
-    Batch, Student, Teacher
+    Batch, Student, Teacher, ClassAssignment, Exam, ExamResult, Attendance,
+    Message, MessageType, Notification, NotificationType, Payment,
+    FeedbackForm, FeedbackType, Task
 )
 from .core.security import get_password_hash
 
@@ -353,8 +362,226 @@ def create_sample_data(session: Session, superadmin: User):
         session.refresh(mgmt_user)
         print(f"Created management user: {mgmt_user.username}")
 
-def seed_database():
+# Synthetic volume profiles: students to generate and school days of history
+PROFILES = {
+    "default": None,
+    "large": {"students": 2000, "days": 520},
+}
+
+SUBJECTS = ["Mathematics", "Physics", "Chemistry", "Biology", "English"]
+GRADES = ["A+", "A", "B+", "B", "C+", "C", "D", "F"]
+BULK_CHUNK = 5000
+GENERATED_PASSWORD = "password123"
+
+def _bulk_insert(connection, model, rows):
+    # executemany in chunks; SQLAlchemy batches these into multi-row INSERTs on Postgres.
+    # rows may be a generator, so a large table is never held in memory whole
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, BULK_CHUNK))
+        if not chunk:
+            return
+        connection.execute(insert(model), chunk)
+
+def _copy_rows(connection, model, columns, rows):
+    """
+    Fast path for very large tables: rows are plain tuples already in the
+    database's native form, so SQLAlchemy's per-row parameter processing is
+    skipped. Postgres (psycopg2) gets COPY, everything else a raw executemany.
+    """
+    if not rows:
+        # An empty executemany would run the statement once without parameters
+        return
+    table = model.__table__.name
+    if connection.dialect.driver == "psycopg2":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        cursor = connection.connection.cursor()
+        cursor.copy_expert(f'COPY "{table}" ({", ".join(columns)}) FROM STDIN WITH (FORMAT csv)', buffer)
+        return
+    placeholders = ", ".join("?" if connection.dialect.paramstyle == "qmark" else "%s" for _ in columns)
+    connection.exec_driver_sql(f'INSERT INTO "{table}" ({", ".join(columns)}) VALUES ({placeholders})', rows)
+
+def _native_datetime(connection, value: datetime):
+    # SQLite has no datetime type; store the same text SQLAlchemy would
+    if connection.dialect.name == "sqlite":
+        return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+    return value
+
+def _next_id(connection, model) -> int:
+    return (connection.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+def _school_days(days: int, end: datetime):
+    """The last `days` weekdays up to `end`, oldest first"""
+    result = []
+    day = end.replace(hour=9, minute=0, second=0, microsecond=0)
+    while len(result) < days:
+        if day.weekday() < 5:
+            result.append(day)
+        day -= timedelta(days=1)
+    return result[::-1]
+
+def create_bulk_data(connection, created_by: int, students: int, days: int, seed: int = 42) -> bool:
+    """
+    Generate teachers, batches, students, class assignments, attendance, exam
+    results, messages, notifications and payments with bulk inserts.
+    Uses a fixed RNG seed and one precomputed password hash for every generated user.
+    """
+    existing = connection.execute(select(User.id).where(User.username == "teacher0")).first()
+    if existing:
+        print("Generated data already exists!")
+        return False
+
+    rng = random.Random(seed)
+    hashed_password = get_password_hash(GENERATED_PASSWORD)
+    teachers = max(students // 25, 2)
+    batches = max(students // 30, 1)
+    now = datetime.utcnow()
+    calendar = _school_days(days, now)
+    start = calendar[0]
+
+    user_base = _next_id(connection, User)
+    teacher_base = _next_id(connection, Teacher)
+    student_base = _next_id(connection, Student)
+    batch_base = _next_id(connection, Batch)
+    exam_base = _next_id(connection, Exam)
+    teacher_ids = range(teacher_base, teacher_base + teachers)
+    teacher_user_ids = range(user_base, user_base + teachers)
+
+    _bulk_insert(connection, User, itertools.chain(({
+        "id": user_base + i, "email": f"teacher{i}@edudemy.com", "username": f"teacher{i}",
+        "full_name": f"Teacher {i}", "role": UserRole.TEACHER, "is_active": True,
+        "hashed_password": hashed_password, "created_by": created_by, "created_at": now, "updated_at": now
+    } for i in range(teachers)), ({
+        "id": user_base + teachers + i, "email": f"student{i}@edudemy.com", "username": f"student{i}",
+        "full_name": f"Student {i}", "role": UserRole.STUDENT, "is_active": True,
+        "hashed_password": hashed_password, "created_by": created_by, "created_at": now, "updated_at": now
+    } for i in range(students))))
+
+    _bulk_insert(connection, Batch, [{
+        "id": batch_base + b, "name": f"Batch {b}", "course": SUBJECTS[b % len(SUBJECTS)],
+        "start_date": start, "end_date": now + timedelta(days=180), "max_students": 30,
+        "fee_amount": 50000.0, "created_by": created_by, "created_at": start
+    } for b in range(batches)])
+    _bulk_insert(connection, Teacher, [{
+        "id": teacher_base + t, "user_id": user_base + t, "subjects": SUBJECTS[t % len(SUBJECTS)],
+        "employee_id": f"EMP{t:05d}", "joining_date": start
+    } for t in range(teachers)])
+    _bulk_insert(connection, Student, ({
+        "id": student_base + s, "user_id": user_base + teachers + s, "full_name": f"Student {s}",
+        "email": f"student{s}@edudemy.com", "batch_id": batch_base + s % batches,
+        "student_id": f"R{s:07d}", "admission_date": start
+    } for s in range(students)))
+
+    # One class per batch per school day, plus a week of upcoming ones
+    upcoming = [now.replace(hour=9, minute=0, second=0, microsecond=0) + timedelta(days=d) for d in range(1, 8)]
+    _bulk_insert(connection, ClassAssignment, ({
+        "batch_id": batch_base + b, "teacher_id": rng.choice(teacher_ids), "subject": SUBJECTS[d % len(SUBJECTS)],
+        "scheduled_at": day, "duration_minutes": 60, "created_by": created_by
+    } for b in range(batches) for d, day in enumerate(calendar + upcoming)))
+
+    # A test per subject per batch every 20 school days
+    exam_days = calendar[::20]
+    exams_per_batch = len(exam_days)
+    _bulk_insert(connection, Exam, ({
+        "id": exam_base + b * exams_per_batch + e, "title": f"{SUBJECTS[e % len(SUBJECTS)]} test {e}",
+        "subject": SUBJECTS[e % len(SUBJECTS)], "batch_id": batch_base + b, "exam_date": day,
+        "max_marks": 100.0, "duration_minutes": 90, "created_by": created_by, "created_at": day
+    } for b in range(batches) for e, day in enumerate(exam_days)))
+
+    # Attendance is by far the largest table, so it takes the COPY/raw path
+    attendance_columns = ("student_id", "teacher_id", "subject", "class_date", "is_present", "marked_at")
+    class_days = [
+        (SUBJECTS[d % len(SUBJECTS)], _native_datetime(connection, day)) for d, day in enumerate(calendar)
+    ]
+    # Building indexes once after the load is much cheaper than maintaining them row by row
+    attendance_indexes = []
+    if connection.execute(select(Attendance.id).limit(1)).first() is None:
+        attendance_indexes = list(Attendance.__table__.indexes)
+        for index in attendance_indexes:
+            index.drop(connection)
+    attendance, results, messages, notifications, payments = [], [], [], [], []
+    # The per-student tables are written as they fill up, so memory stays flat at any scale
+    pending = ((ExamResult, results), (Message, messages), (Notification, notifications), (Payment, payments))
+    for s in range(students):
+        student_id = student_base + s
+        user_id = user_base + teachers + s
+        batch_index = s % batches
+        teacher_id = teacher_ids[s % teachers]
+        attendance.extend(
+            (student_id, teacher_id, subject, day, rng.random() < 0.9, day) for subject, day in class_days
+        )
+        if len(attendance) >= BULK_CHUNK * 20:
+            _copy_rows(connection, Attendance, attendance_columns, attendance)
+            attendance = []
+        for e, day in enumerate(exam_days):
+            marks = round(rng.uniform(20, 100), 1)
+            results.append({
+                "exam_id": exam_base + batch_index * exams_per_batch + e, "student_id": student_id,
+                "teacher_id": teacher_id, "marks_obtained": marks,
+                "grade": GRADES[min(int((100 - marks) // 10), len(GRADES) - 1)],
+                "entered_at": day + timedelta(days=1)
+            })
+        for i in range(4):
+            teacher_user_id = rng.choice(teacher_user_ids)
+            sender, receiver = (user_id, teacher_user_id) if i % 2 else (teacher_user_id, user_id)
+            messages.append({
+                "sender_id": sender, "receiver_id": receiver, "content": f"Message {i}",
+                "message_type": MessageType.TEXT, "is_read": i < 2,
+                "sent_at": now - timedelta(hours=rng.randint(1, 24 * 30), minutes=i)
+            })
+        for i in range(10):
+            notifications.append({
+                "user_id": user_id, "title": f"Notice {i}", "message": "Generated notification",
+                "notification_type": NotificationType.GENERAL, "is_read": i < 7,
+                "created_at": calendar[i * len(calendar) // 10]
+            })
+        payments.append({
+            "student_id": student_id, "amount": 50000.0, "payment_type": "fee", "payment_method": "cash",
+            "payment_date": start, "status": "paid", "collected_by": created_by
+        })
+        for model, rows in pending:
+            if len(rows) >= BULK_CHUNK:
+                _bulk_insert(connection, model, rows)
+                rows.clear()
+    _copy_rows(connection, Attendance, attendance_columns, attendance)
+    for index in attendance_indexes:
+        index.create(connection)
+    for model, rows in pending:
+        _bulk_insert(connection, model, rows)
+
+    _bulk_insert(connection, FeedbackForm, [{
+        "student_id": student_base + s, "feedback_type": FeedbackType.SUGGESTION, "subject": "Library hours",
+        "message": "Please extend the library hours", "status": "pending", "priority": "medium",
+        "submitted_at": now, "is_anonymous": False
+    } for s in range(0, students, 10)])
+    _bulk_insert(connection, Task, [{
+        "title": f"Task {t}", "created_by": created_by, "assigned_to": user_base + t,
+        "status": "pending", "priority": "medium", "created_at": now
+    } for t in range(teachers)])
+
+    # Ids above were assigned explicitly, which doesn't advance Postgres sequences; move them past the
+    # generated rows so the next ordinary insert doesn't collide
+    if connection.dialect.name == "postgresql":
+        for model in (User, Batch, Teacher, Student, Exam):
+            table = model.__table__.name
+            connection.exec_driver_sql(
+                f"""SELECT setval(pg_get_serial_sequence('"{table}"', 'id'), (SELECT max(id) FROM "{table}"))"""
+            )
+
+    # Attendance went in through COPY/raw inserts, so derive its daily rollups in SQL
+    attendance_rollups.rebuild(connection)
+
+    # Refresh planner statistics so query plans reflect the new volumes
+    if connection.dialect.name in ("sqlite", "postgresql"):
+        connection.exec_driver_sql("ANALYZE")
+    return True
+
+def seed_database(profile: str = "default"):
     """Main function to seed the database"""
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown seed profile {profile!r}. Choose one of: {', '.join(PROFILES)}")
     print("🌱 Starting database seeding...")
     
     # Initialize database
@@ -375,11 +602,21 @@ def seed_database():
         print("4. Creating sample data...")
         create_sample_data(session, superadmin)
         
+        volumes = PROFILES[profile]
+        if volumes:
+            print(f"5. Generating {profile} dataset ({volumes['students']} students, {volumes['days']} school days)...")
+            started = time.perf_counter()
+            if create_bulk_data(session.connection(), superadmin.id, **volumes):
+                session.commit()
+                print(f"   Generated in {time.perf_counter() - started:.1f}s")
+        
         print("✅ Database seeding completed!")
         print("\n📋 Default Credentials:")
         print("   Super Admin - username: superadmin, password: superadmin123")
         print("   Admin - username: admin, password: admin123")
         print("   Manager - username: manager, password: manager123")
+        if volumes:
+            print(f"   Generated users - username: teacher0.., student0.., password: {GENERATED_PASSWORD}")
         print("\n🔗 API Documentation: http://localhost:8000/docs")
 
 if __name__ == "__main__":
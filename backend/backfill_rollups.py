@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+
+"""
+Attendance rollup backfill
+Recomputes the daily attendance rollups (per student and per batch) from the
+attendance table in one transaction. Run it once after upgrading, or after
+loading attendance outside the API.
+
+Usage:
+    python backfill_rollups.py
+"""
+
+import sys
+import os
+import time
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlmodel import select, func
+from app.database import engine
+from app.models import StudentAttendanceDaily, BatchAttendanceDaily
+from app.core import attendance_rollups
+
+if __name__ == "__main__":
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        attendance_rollups.rebuild(connection)
+        students = connection.execute(select(func.count()).select_from(StudentAttendanceDaily)).scalar()
+        batches = connection.execute(select(func.count()).select_from(BatchAttendanceDaily)).scalar()
+    print(f"Rebuilt {students} student and {batches} batch rollup rows in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,6 @@
+"""
+Benchmarks and performance checks for the Edudemy API.
+Run from the backend directory, e.g. `python -m benchmarks.endpoints --scale 1k`.
+Every module points DATABASE_URL at a throwaway SQLite file unless
+BENCH_DATABASE_URL is set, before the app is imported.
+"""
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+"""
+Async vs sync session benchmark
+Compares p99 latency and requests per second of the async read paths
+(notifications, attendance) against sync copies of the same endpoints.
+
+Usage: python -m benchmarks.bench_async [--requests 2000] [--concurrency 100]
+Runs against a throwaway SQLite (aiosqlite) database unless BENCH_DATABASE_URL is set.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+DB_FILE = os.path.join(tempfile.gettempdir(), "edudemy_bench_async.db")
+os.environ["DATABASE_URL"] = os.environ.get("BENCH_DATABASE_URL", f"sqlite:///{DB_FILE}")
+
+import httpx
+from fastapi import APIRouter, Depends
+from sqlmodel import SQLModel, Session, select
+from typing import List
+
+from app.main import app
+from app.database import engine, get_session
+from app.models import User, UserRole, Student, Teacher, Notification, NotificationType, Attendance
+from app.schemas import NotificationRead, AttendanceRead
+from app.core.deps import get_current_user
+from app.core.security import create_access_token
+
+# Sync copies of the converted endpoints, mounted only for the benchmark
+sync_router = APIRouter(prefix="/bench/sync")
+
+@sync_router.get("/notifications", response_model=List[NotificationRead])
+def sync_notifications(
+    limit: int = 50,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    return session.exec(
+        select(Notification).where(Notification.user_id == current_user.id)
+        .order_by(Notification.created_at.desc())
+        .limit(limit)
+    ).all()
+
+@sync_router.get("/attendance", response_model=List[AttendanceRead])
+def sync_attendance(
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    student = session.exec(select(Student).where(Student.user_id == current_user.id)).first()
+    return session.exec(
+        select(Attendance).where(Attendance.student_id == student.id)
+        .order_by(Attendance.class_date.desc())
+    ).all()
+
+def prepare_data():
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        teacher_user = User(email="t@bench", username="bench_teacher", role=UserRole.TEACHER, hashed_password="x")
+        student_user = User(email="s@bench", username="bench_student", role=UserRole.STUDENT, hashed_password="x")
+        session.add(teacher_user)
+        session.add(student_user)
+        session.commit()
+        teacher = Teacher(user_id=teacher_user.id)
+        student = Student(user_id=student_user.id, full_name="Bench Student")
+        session.add(teacher)
+        session.add(student)
+        session.commit()
+        start = datetime.utcnow() - timedelta(days=60)
+        for i in range(60):
+            session.add(Attendance(
+                student_id=student.id, teacher_id=teacher.id, class_date=start + timedelta(days=i),
+                subject="Mathematics", is_present=i % 5 != 0
+            ))
+            session.add(Notification(
+                user_id=student_user.id, title=f"Notice {i}", message="Benchmark notification",
+                notification_type=NotificationType.GENERAL
+            ))
+        session.commit()
+        return student_user.username
+
+async def run_path(client, path, headers, total, concurrency):
+    latencies = []
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+
+    async def worker():
+        while not queue.empty():
+            queue.get_nowait()
+            started = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "rps": total / elapsed,
+    }
+
+async def main(total, concurrency):
+    username = prepare_data()
+    app.include_router(sync_router)
+    headers = {"Authorization": f"Bearer {create_access_token(username)}"}
+    pairs = [
+        ("notifications", "/bench/sync/notifications", "/notifications/"),
+        ("attendance", "/bench/sync/attendance", "/academics/attendance/"),
+    ]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{'endpoint':<16}{'mode':<8}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+        for name, sync_path, async_path in pairs:
+            for mode, path in (("sync", sync_path), ("async", async_path)):
+                await run_path(client, path, headers, min(total, 50), concurrency)  # warm-up
+                result = await run_path(client, path, headers, total, concurrency)
+                print(f"{name:<16}{mode:<8}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['rps']:>10.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
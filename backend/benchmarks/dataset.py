@@ -0,0 +1,61 @@
+"""
+Synthetic dataset for benchmarks and query-plan checks.
+Thin wrapper over app.seed_data: the schema is recreated, the permission
+tables, superadmin and an admin are seeded, and the bulk generator fills in the rest
+with a fixed RNG seed, so the same scale always produces the same data.
+"""
+
+from sqlmodel import Session, SQLModel, select
+
+from app.database import alembic_version, schema_head, stamp_schema
+from app.core.security import get_password_hash
+from app.models import User, UserRole, Teacher, Student, Exam
+from app.seed_data import (
+    GENERATED_PASSWORD, create_permissions, create_role_permissions, create_superadmin, create_bulk_data
+)
+
+def build_dataset(engine, students: int = 1000, days: int = 40, seed: int = 42) -> dict:
+    """Create the schema and fill it; returns ids useful as request parameters"""
+    SQLModel.metadata.drop_all(engine)
+    alembic_version.drop(engine, checkfirst=True)
+    SQLModel.metadata.create_all(engine)
+    # The schema was built at head, so app startup can skip create_all against it
+    head = schema_head()
+    if head:
+        stamp_schema(head, engine)
+
+    with Session(engine) as session:
+        create_permissions(session)
+        create_role_permissions(session)
+        superadmin = create_superadmin(session)
+        # /users/ admits the admin role only, so routes there need an admin persona
+        session.add(User(
+            email="admin@edudemy.com", username="admin", full_name="Admin", role=UserRole.ADMIN,
+            hashed_password=get_password_hash(GENERATED_PASSWORD), created_by=superadmin.id
+        ))
+        session.flush()
+        create_bulk_data(session.connection(), superadmin.id, students, days, seed)
+        session.commit()
+
+    return dataset_ids(engine)
+
+def dataset_ids(engine) -> dict:
+    """Ids of the first generated teacher/student, for use as request parameters"""
+    with Session(engine) as session:
+        admin = session.exec(select(User).where(User.username == "superadmin")).one()
+        teacher = session.exec(
+            select(Teacher).join(User, Teacher.user_id == User.id).where(User.username == "teacher0")
+        ).one()
+        student = session.exec(
+            select(Student).join(User, Student.user_id == User.id).where(User.username == "student0")
+        ).one()
+        exam_id = session.exec(select(Exam.id).where(Exam.batch_id == student.batch_id).order_by(Exam.id)).first()
+        return {
+            "admin_user_id": admin.id,
+            "teacher_user_id": teacher.user_id,
+            "teacher_id": teacher.id,
+            "student_user_id": student.user_id,
+            "student_id": student.id,
+            "batch_id": student.batch_id,
+            "exam_id": exam_id,
+        }
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+
+"""
+Endpoint benchmark suite
+Measures p50/p95/p99 latency and throughput of every GET route of every
+router against a synthetic dataset at a chosen scale, stores the results
+as a JSON baseline and fails when a route regresses past the allowed ratio.
+
+Usage:
+    python -m benchmarks.endpoints --scale 1k --save-baseline
+    python -m benchmarks.endpoints --scale 1k --max-regression 0.25
+
+Scales: 1k, 50k, 500k students. The dataset for a scale is built once into
+its own SQLite file and reused (pass --rebuild to regenerate), or into
+BENCH_DATABASE_URL when set (e.g. a scratch Postgres database).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+SCALES = {"1k": 1000, "50k": 50000, "500k": 500000}
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+def _configure_database(scale: str) -> str:
+    db_file = os.path.join(tempfile.gettempdir(), f"edudemy_bench_{scale}.db")
+    os.environ["DATABASE_URL"] = os.environ.get("BENCH_DATABASE_URL", f"sqlite:///{db_file}")
+    return db_file
+
+def percentile(sorted_values, fraction: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+async def measure(client, path: str, headers: dict, total: int, concurrency: int) -> dict:
+    latencies, queries, statuses = [], [], set()
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append((time.perf_counter() - started) * 1000)
+            queries.append(int(response.headers.get("x-db-queries", 0)))
+            statuses.add(response.status_code)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": total,
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "rps": round(total / elapsed, 1),
+        "queries": max(queries),
+        "status": sorted(statuses),
+    }
+
+def compare(results: dict, baseline: dict, max_regression: float, min_delta_ms: float) -> list:
+    """Routes whose p95 grew past the allowed ratio (and past the noise floor)"""
+    regressions = []
+    for route, current in results["routes"].items():
+        previous = baseline.get("routes", {}).get(route)
+        if not previous:
+            continue
+        limit = previous["p95_ms"] * (1 + max_regression)
+        if current["p95_ms"] > limit and current["p95_ms"] - previous["p95_ms"] > min_delta_ms:
+            regressions.append(f"{route}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+        if current["queries"] > previous["queries"]:
+            regressions.append(f"{route}: queries {previous['queries']} -> {current['queries']}")
+    return regressions
+
+async def run(args) -> int:
+    db_file = _configure_database(args.scale)
+
+    import httpx
+    from fastapi.routing import APIRoute
+    from app.main import app
+    from app.database import engine
+    from app.core.security import create_access_token
+    from .dataset import build_dataset, dataset_ids
+
+    if args.rebuild or "BENCH_DATABASE_URL" in os.environ or not os.path.exists(db_file):
+        print(f"Building {args.scale} dataset ...")
+        started = time.perf_counter()
+        ids = build_dataset(engine, students=SCALES[args.scale])
+        print(f"Dataset ready in {time.perf_counter() - started:.1f}s")
+    else:
+        ids = dataset_ids(engine)
+
+    params = {
+        "user_id": ids["teacher_user_id"], "student_id": ids["student_id"], "batch_id": ids["batch_id"],
+        "exam_id": ids["exam_id"], "group_id": 1, "feedback_id": 1, "role": "teacher", "entity": "attendance",
+    }
+    # Routes with required query parameters
+    queries = {"/admin/search": "?q=stud&types=users"}
+    tokens = {
+        persona: {"Authorization": f"Bearer {create_access_token(persona)}"}
+        for persona in ("superadmin", "admin", "teacher0", "student0")
+    }
+    routes = [
+        route for route in app.routes
+        if isinstance(route, APIRoute) and "GET" in route.methods
+        and (not args.only or any(fragment in route.path for fragment in args.only))
+    ]
+
+    results = {"scale": args.scale, "created_at": datetime.utcnow().isoformat(), "routes": {}}
+    failures = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{'route':<52}{'as':<12}{'p50':>9}{'p95':>9}{'p99':>9}{'req/s':>9}{'queries':>9}")
+        for route in routes:
+            path = route.path.format(**params) + queries.get(route.path, "")
+            # First persona the route accepts
+            persona = None
+            for name, headers in tokens.items():
+                response = await client.get(path, headers=headers)
+                if response.status_code < 400:
+                    persona = name
+                    break
+            if persona is None:
+                print(f"{route.path:<52}skipped ({response.status_code} for every role)")
+                continue
+            budget_exceeded = response.headers.get("x-db-query-budget-exceeded") == "1"
+            stats = await measure(client, path, tokens[persona], args.requests, args.concurrency)
+            stats["persona"] = persona
+            results["routes"][f"GET {route.path}"] = stats
+            if budget_exceeded:
+                failures.append(f"GET {route.path}: over its query budget")
+            print(
+                f"{route.path:<52}{persona:<12}{stats['p50_ms']:>9.2f}{stats['p95_ms']:>9.2f}"
+                f"{stats['p99_ms']:>9.2f}{stats['rps']:>9.1f}{stats['queries']:>9}"
+            )
+
+    baseline_path = args.baseline or os.path.join(BASELINE_DIR, f"{args.scale}.json")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline saved to {baseline_path}")
+    elif os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            failures += compare(results, json.load(f), args.max_regression, args.min_delta_ms)
+    else:
+        print(f"\nNo baseline at {baseline_path}; run with --save-baseline first")
+
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    return 1 if failures else 0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=SCALES, default="1k")
+    parser.add_argument("--requests", type=int, default=200, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--only", nargs="*", help="only routes whose path contains one of these")
+    parser.add_argument("--baseline", help="baseline JSON (default: benchmarks/baselines/<scale>.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--output", help="also write this run's results to a JSON file")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="allowed p95 growth ratio")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="ignore p95 changes smaller than this")
+    parser.add_argument("--rebuild", action="store_true", help="regenerate the dataset")
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+"""
+Login throughput benchmark
+Fires concurrent POST /auth/login requests at the app for each password
+pool size from 1 worker up to the CPU count (plus inline hashing for
+comparison) and reports logins/s and logins/s per worker, the latency of
+GET /auth/me measured while the login storm runs, and how many logins the
+admission control turned away with 503.
+
+Usage: python -m benchmarks.login_throughput [--logins 40] [--concurrency 8] [--rounds 12]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+DB_FILE = os.path.join(tempfile.gettempdir(), "edudemy_login_throughput.db")
+os.environ["DATABASE_URL"] = os.environ.get("BENCH_DATABASE_URL", f"sqlite:///{DB_FILE}")
+# Measures the password pool, so the per-IP/username login limiter stays out of the way
+os.environ.setdefault("LOGIN_RATE_LIMIT_ENABLED", "false")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=40, help="logins per pool size")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=None, help="bcrypt cost (default: BCRYPT_ROUNDS)")
+    parser.add_argument("--max-pending", type=int, default=None, help="admission limit (default: 8 per worker)")
+    return parser.parse_args()
+
+async def storm(client, logins: int, concurrency: int, me_headers: dict) -> dict:
+    remaining = iter(range(logins))
+    statuses = []
+    probe_latencies = []
+    storm_done = asyncio.Event()
+
+    async def login_worker():
+        for i in remaining:
+            response = await client.post(
+                "/auth/login", json={"username": f"student{i % 50}", "password": "password123"}
+            )
+            statuses.append(response.status_code)
+
+    async def probe():
+        # A cheap authenticated endpoint, to see whether logins starve everything else
+        while not storm_done.is_set():
+            started = time.perf_counter()
+            await client.get("/auth/me", headers=me_headers)
+            probe_latencies.append((time.perf_counter() - started) * 1000)
+            await asyncio.sleep(0.05)
+
+    probe_task = asyncio.create_task(probe())
+    started = time.perf_counter()
+    await asyncio.gather(*(login_worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    storm_done.set()
+    await probe_task
+    ok = statuses.count(200)
+    return {
+        "ok": ok,
+        "rejected": statuses.count(503),
+        "logins_per_s": ok / elapsed,
+        "me_p50_ms": statistics.median(probe_latencies) if probe_latencies else 0.0,
+        "me_max_ms": max(probe_latencies, default=0.0),
+    }
+
+async def run(args):
+    if args.rounds:
+        os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+
+    import httpx
+    from app.main import app
+    from app.database import engine
+    from app.core import security
+    from app.core.passwords import PasswordPool
+    from .dataset import build_dataset
+
+    build_dataset(engine, students=50, days=5)
+    me_headers = {"Authorization": f"Bearer {security.create_access_token('superadmin')}"}
+    cpus = os.cpu_count() or 1
+    sizes = [0] + sorted({1, *range(2, cpus + 1, 2), cpus})
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        print(f"bcrypt cost {security.password_pool.rounds}, {cpus} CPUs, {args.logins} logins at concurrency {args.concurrency}")
+        print(f"{'workers':<10}{'ok':>6}{'503':>6}{'logins/s':>11}{'per worker':>12}{'me p50 ms':>11}{'me max ms':>11}")
+        for workers in sizes:
+            security.password_pool.shutdown()
+            security.password_pool = PasswordPool(security.password_pool.rounds, workers, args.max_pending)
+            security.password_pool.hash("warm-up")  # start the worker processes outside the measurement
+            result = await storm(client, args.logins, args.concurrency, me_headers)
+            per_worker = result["logins_per_s"] / workers if workers else result["logins_per_s"]
+            print(
+                f"{workers or 'inline':<10}{result['ok']:>6}{result['rejected']:>6}{result['logins_per_s']:>11.1f}"
+                f"{per_worker:>12.1f}{result['me_p50_ms']:>11.1f}{result['me_max_ms']:>11.1f}"
+            )
+        security.password_pool.shutdown()
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
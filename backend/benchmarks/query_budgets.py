@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+"""
+Per-route query budget check
+Calls every GET route that declares @query_budget as each role against a
+synthetic dataset and exits non-zero when a response reports
+X-DB-Query-Budget-Exceeded.
+
+Usage: python -m benchmarks.query_budgets [--students 200]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+DB_FILE = os.path.join(tempfile.gettempdir(), "edudemy_query_budgets.db")
+os.environ["DATABASE_URL"] = os.environ.get("BENCH_DATABASE_URL", f"sqlite:///{DB_FILE}")
+
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.database import engine
+from app.core.security import create_access_token
+from .dataset import build_dataset
+
+PERSONAS = ["superadmin", "teacher0", "student0"]
+
+def path_params(ids: dict) -> dict:
+    return {
+        "user_id": ids["teacher_user_id"],
+        "student_id": ids["student_id"],
+        "batch_id": ids["batch_id"],
+        "exam_id": ids["exam_id"],
+        "group_id": 1,
+    }
+
+def budgeted_routes():
+    for route in app.routes:
+        if isinstance(route, APIRoute) and "GET" in route.methods and hasattr(route.endpoint, "query_budget"):
+            yield route
+
+def main(students: int) -> int:
+    ids = build_dataset(engine, students=students)
+    params = path_params(ids)
+    client = TestClient(app)
+    failures = 0
+    for route in budgeted_routes():
+        path = route.path.format(**params)
+        for persona in PERSONAS:
+            headers = {"Authorization": f"Bearer {create_access_token(persona)}"}
+            # include_total's count queries are reported but left out of the budget
+            for query in ("", "?include_total=true"):
+                response = client.get(path + query, headers=headers)
+                exceeded = response.headers.get("x-db-query-budget-exceeded") == "1"
+                failures += exceeded
+                print(
+                    f"{'OVER' if exceeded else 'ok':<6}{persona:<12}{path + query:<63}"
+                    f"queries={response.headers.get('x-db-queries')}/{route.endpoint.query_budget} status={response.status_code}"
+                )
+    print(f"\n{failures} responses over budget")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=200)
+    args = parser.parse_args()
+    sys.exit(main(args.students))
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+
+"""
+Query-plan regression check
+Builds a large synthetic dataset, runs EXPLAIN on the main query of each
+router and exits non-zero when any of them falls back to a sequential scan.
+
+Tables smaller than --min-rows are ignored: scanning them is the planner's
+correct choice, not a missing index.
+
+Usage: python -m benchmarks.query_plans [--students 5000] [--min-rows 1000]
+Runs against a throwaway SQLite database unless BENCH_DATABASE_URL is set
+(point it at a scratch Postgres database to check Postgres plans).
+"""
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+DB_FILE = os.path.join(tempfile.gettempdir(), "edudemy_query_plans.db")
+os.environ["DATABASE_URL"] = os.environ.get("BENCH_DATABASE_URL", f"sqlite:///{DB_FILE}")
+
+from sqlalchemy import func, table
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from sqlmodel import select
+
+from app.database import engine
+from app.models import (
+    User, Teacher, Student, ClassAssignment, Exam, ExamResult, Attendance,
+    Message, Notification, ChatGroupMember, GroupMessage, Payment, FeedbackForm, Task
+)
+from .dataset import build_dataset
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+@compiles(Explain)
+def _compile_explain(element, compiler, **kw):
+    prefix = "EXPLAIN QUERY PLAN " if compiler.dialect.name == "sqlite" else "EXPLAIN "
+    return prefix + compiler.process(element.statement, **kw)
+
+# SQLite: "SCAN <table>" without an index; Postgres: "Seq Scan on <table>"
+SEQUENTIAL_SCAN = re.compile(r"^SCAN (\w+)$|^SCAN (\w+) \(|Seq Scan on (\w+)")
+
+def router_queries(ids: dict) -> dict:
+    """The main query issued by each hot endpoint, keyed by route"""
+    now = datetime.utcnow()
+    me, other = ids["student_user_id"], ids["teacher_user_id"]
+    return {
+        "auth: principal lookup": select(User).where((User.username == "student0") | (User.email == "student0")),
+        "deps: teacher by user": select(Teacher).where(Teacher.user_id == ids["teacher_user_id"]),
+        "deps: student by user": select(Student).where(Student.user_id == me),
+        "GET /notifications/": select(Notification).where(Notification.user_id == me)
+            .order_by(Notification.created_at.desc()).limit(50),
+        "GET /notifications/?unread_only": select(Notification).where(Notification.user_id == me, Notification.is_read == False)
+            .order_by(Notification.created_at.desc()).limit(50),
+        "GET /notifications/unread-count": select(func.count()).select_from(Notification)
+            .where(Notification.user_id == me, Notification.is_read == False),
+        "GET /messaging/messages/conversations": select(Message.receiver_id).where(Message.sender_id == me).distinct(),
+        "GET /messaging/messages/{user_id}": select(Message).where(
+            ((Message.sender_id == me) & (Message.receiver_id == other)) |
+            ((Message.sender_id == other) & (Message.receiver_id == me))
+        ).order_by(Message.sent_at.desc()).limit(50),
+        "GET /messaging/messages/{user_id} unread": select(func.count()).select_from(Message)
+            .where(Message.sender_id == other, Message.receiver_id == me, Message.is_read == False),
+        "GET /messaging/groups/": select(ChatGroupMember).where(ChatGroupMember.user_id == me),
+        "GET /messaging/groups/{id}/messages": select(GroupMessage).where(GroupMessage.group_id == 1)
+            .order_by(GroupMessage.sent_at.desc()).limit(50),
+        "GET /academics/class-assignments/ (teacher)": select(ClassAssignment)
+            .where(ClassAssignment.teacher_id == ids["teacher_id"]).order_by(ClassAssignment.scheduled_at),
+        "GET /academics/class-assignments/ (student)": select(ClassAssignment)
+            .where(ClassAssignment.batch_id == ids["batch_id"]).order_by(ClassAssignment.scheduled_at),
+        "GET /academics/class-assignments/upcoming": select(ClassAssignment)
+            .where(ClassAssignment.scheduled_at >= now, ClassAssignment.scheduled_at <= now + timedelta(days=7))
+            .order_by(ClassAssignment.scheduled_at),
+        "GET /academics/exams/": select(Exam).where(Exam.batch_id == ids["batch_id"]).order_by(Exam.exam_date.desc()),
+        "GET /academics/exam-results/ (student)": select(ExamResult)
+            .where(ExamResult.student_id == ids["student_id"]).order_by(ExamResult.entered_at.desc()),
+        "GET /academics/exam-results/ (teacher)": select(ExamResult)
+            .where(ExamResult.teacher_id == ids["teacher_id"]).order_by(ExamResult.entered_at.desc()),
+        "GET /academics/attendance/ (student)": select(Attendance)
+            .where(Attendance.student_id == ids["student_id"]).order_by(Attendance.class_date.desc()),
+        "GET /academics/attendance/ (teacher)": select(Attendance)
+            .where(Attendance.teacher_id == ids["teacher_id"]).order_by(Attendance.class_date.desc()),
+        "GET /academics/attendance/summary/{id}": select(Attendance).where(Attendance.student_id == ids["student_id"]),
+        "GET /academics/payments/": select(Payment).where(Payment.student_id == ids["student_id"])
+            .order_by(Payment.payment_date.desc()),
+        "GET /academics/tasks/": select(Task).where((Task.assigned_to == other) | (Task.created_by == other))
+            .order_by(Task.created_at.desc()),
+        "GET /academics/dashboard/stats (teacher)": select(Student).where(Student.batch_id == ids["batch_id"]),
+        "GET /feedback/my-feedback": select(FeedbackForm).where(FeedbackForm.student_id == ids["student_id"])
+            .order_by(FeedbackForm.submitted_at.desc()).limit(50),
+        "GET /feedback/pending": select(FeedbackForm).where(FeedbackForm.status == "pending")
+            .order_by(FeedbackForm.submitted_at.desc()).limit(50),
+        "POST /admin/maintenance/cleanup-notifications": select(Notification.id)
+            .where(Notification.created_at < now - timedelta(days=30), Notification.is_read == True),
+    }
+
+def explain(connection, statement) -> list:
+    rows = connection.execute(Explain(statement)).all()
+    return [row[-1] if engine.dialect.name == "sqlite" else row[0] for row in rows]
+
+def scanned_tables(plan: list) -> set:
+    tables = set()
+    for line in plan:
+        match = SEQUENTIAL_SCAN.search(line.strip())
+        if match:
+            tables.add(next(group for group in match.groups() if group))
+    return tables
+
+def main(students: int, min_rows: int) -> int:
+    print(f"Building synthetic dataset ({students} students) on {engine.url.render_as_string()} ...")
+    ids = build_dataset(engine, students=students)
+    failures = 0
+    row_counts = {}
+    with engine.connect() as connection:
+        for name, statement in router_queries(ids).items():
+            plan = explain(connection, statement)
+            scans = set()
+            for scanned in scanned_tables(plan):
+                if scanned not in row_counts:
+                    row_counts[scanned] = connection.execute(select(func.count()).select_from(table(scanned))).scalar_one()
+                if row_counts[scanned] >= min_rows:
+                    scans.add(scanned)
+            status = "SEQ SCAN" if scans else "ok"
+            print(f"{status:<9}{name}")
+            for line in plan:
+                print(f"         | {line}")
+            failures += bool(scans)
+    print(f"\n{failures} queries with sequential scans")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--min-rows", type=int, default=1000)
+    args = parser.parse_args()
+    sys.exit(main(args.students, args.min_rows))
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+"""
+Startup-time benchmark
+Starts fresh interpreters the way uvicorn workers start: import app.main,
+then run the startup handlers. Each worker reports its import time, startup
+handler time, queries issued at startup and what init_db did. Three scenarios:
+
+    cold     one worker against an empty database (schema created and stamped)
+    rolling  workers restarted one after another against the current schema
+    burst    all workers started at once against the current schema
+
+Exits non-zero when the slowest worker of any scenario takes longer than
+--max-seconds from process launch until it is ready to serve.
+
+Usage: python -m benchmarks.startup [--workers N] [--max-seconds 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_FILE = os.path.join(tempfile.gettempdir(), "edudemy_startup.db")
+
+# Runs inside every simulated worker; prints one JSON line
+WORKER = """
+import asyncio, json, time
+started = time.perf_counter()
+from app.main import app
+from app.database import engine
+from sqlalchemy import event
+imported = time.perf_counter()
+queries = []
+event.listen(engine, "before_cursor_execute", lambda *args: queries.append(1))
+asyncio.run(app.router.startup())
+ready = time.perf_counter()
+print(json.dumps({
+    "import_s": imported - started,
+    "startup_s": ready - imported,
+    "queries": len(queries),
+    "init_db": app.state.schema_status,
+}))
+"""
+
+def launch(env: dict) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-c", WORKER], cwd=BACKEND_DIR, env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+    )
+
+def collect(process: subprocess.Popen, launched: float) -> dict:
+    stdout, stderr = process.communicate()
+    if process.returncode:
+        raise RuntimeError(f"worker failed:\n{stderr}")
+    result = json.loads(stdout.strip().splitlines()[-1])
+    result["ready_s"] = time.perf_counter() - launched
+    return result
+
+def run_workers(env: dict, workers: int, concurrent: bool) -> list:
+    if not concurrent:
+        results = []
+        for _ in range(workers):
+            launched = time.perf_counter()
+            results.append(collect(launch(env), launched))
+        return results
+    launched = time.perf_counter()
+    processes = [launch(env) for _ in range(workers)]
+    return [collect(process, launched) for process in processes]
+
+def report(name: str, results: list) -> float:
+    ready = [r["ready_s"] for r in results]
+    print(
+        f"{name:<8} workers={len(results):<3} "
+        f"import p50={statistics.median(r['import_s'] for r in results):.3f}s "
+        f"startup p50={statistics.median(r['startup_s'] for r in results):.3f}s "
+        f"ready p50={statistics.median(ready):.3f}s max={max(ready):.3f}s "
+        f"startup queries={max(r['queries'] for r in results)} "
+        f"init_db={sorted({r['init_db'] for r in results})}"
+    )
+    return max(ready)
+
+def main(workers: int, max_seconds: float) -> int:
+    env = dict(os.environ)
+    if "BENCH_DATABASE_URL" in env:
+        env["DATABASE_URL"] = env["BENCH_DATABASE_URL"]
+    else:
+        if os.path.exists(DB_FILE):
+            os.remove(DB_FILE)
+        env["DATABASE_URL"] = f"sqlite:///{DB_FILE}"
+    # Startup must not depend on bcrypt workers being spawned
+    env.setdefault("PASSWORD_HASH_WORKERS", "0")
+
+    slowest = {
+        "cold": report("cold", run_workers(env, 1, concurrent=False)),
+        "rolling": report("rolling", run_workers(env, workers, concurrent=False)),
+        "burst": report("burst", run_workers(env, workers, concurrent=True)),
+    }
+    over = [name for name, seconds in slowest.items() if seconds > max_seconds]
+    if over:
+        print(f"\nOver the {max_seconds}s target: {', '.join(over)}")
+        return 1
+    print(f"\nAll scenarios within {max_seconds}s")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="default: one per CPU, like uvicorn --workers")
+    parser.add_argument("--max-seconds", type=float, default=5.0, help="target for the slowest worker to become ready")
+    args = parser.parse_args()
+    sys.exit(main(args.workers, args.max_seconds))
@@ -3,6 +3,10 @@
 """
 Database seed runner script
 Run this script to initialize the database with seed data
+
+Usage:
+    python run_seed.py            # permissions, superadmin and sample users
+    python run_seed.py large      # plus a high-volume synthetic dataset for profiling
 """
 
 import sys
@@ -14,4 +18,4 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from app.seed_data import seed_database
 
 if __name__ == "__main__":
-    seed_database()
+    seed_database(sys.argv[1] if len(sys.argv) > 1 else "default")
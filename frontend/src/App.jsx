@@ -61,9 +61,15 @@ export default function App() {
       {/* Admin Routes */}
       <Route element={<ProtectedRoute requireRole={["superadmin", "admin"]} />}>
         <Route path="/admin" element={<Layout><DashboardAdmin /></Layout>} />
-        <Route path="/admin/students" element={<Layout><Students /></Layout>} />
-        <Route path="/admin/teachers" element={<Layout><Teachers /></Layout>} />
-        <Route path="/admin/batches" element={<Layout><Batches /></Layout>} />
+        <Route element={<ProtectedRoute requirePermission={{ resource: "students", action: "read" }} />}>
+          <Route path="/admin/students" element={<Layout><Students /></Layout>} />
+        </Route>
+        <Route element={<ProtectedRoute requirePermission={{ resource: "teachers", action: "read" }} />}>
+          <Route path="/admin/teachers" element={<Layout><Teachers /></Layout>} />
+        </Route>
+        <Route element={<ProtectedRoute requirePermission={{ resource: "batches", action: "read" }} />}>
+          <Route path="/admin/batches" element={<Layout><Batches /></Layout>} />
+        </Route>
       </Route>
 
       {/* Management Routes */}
@@ -74,7 +80,9 @@ export default function App() {
       {/* Academics Routes */}
       <Route element={<ProtectedRoute requireRole={["superadmin", "admin", "academics"]} />}>
         <Route path="/academics" element={<Layout><DashboardAcademics /></Layout>} />
-        <Route path="/academics/batches" element={<Layout><Batches /></Layout>} />
+        <Route element={<ProtectedRoute requirePermission={{ resource: "batches", action: "read" }} />}>
+          <Route path="/academics/batches" element={<Layout><Batches /></Layout>} />
+        </Route>
       </Route>
 
       {/* Teacher Routes */}
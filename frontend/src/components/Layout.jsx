@@ -2,6 +2,7 @@ import { useState, useEffect } from 'react';
 import { Link, useLocation, useNavigate } from 'react-router-dom';
 import { useAuth } from '../context/AuthContext';
 import { useWebSocket } from '../hooks/useWebSocket';
+import { usePermissions } from '../hooks/usePermissions';
 import { notificationsAPI } from '../services/api';
 import { 
   Menu, 
@@ -48,6 +49,7 @@ export default function Layout({ children }) {
   const [unreadCount, setUnreadCount] = useState(0);
   const [recentNotifications, setRecentNotifications] = useState([]);
   const { notifications, isConnected, markNotificationAsRead } = useWebSocket();
+  const { can, ready } = usePermissions();
 
   // Load initial notifications
   useEffect(() => {
@@ -98,12 +100,12 @@ export default function Layout({ children }) {
     if (hasRole(['superadmin', 'admin'])) {
       return [
         { path: '/admin', icon: Home, label: 'Dashboard', color: 'text-blue-600' },
-        { path: '/admin/users', icon: Users, label: 'User Management', color: 'text-red-600' },
-        { path: '/admin/students', icon: Student, label: 'Students', color: 'text-green-600' },
-        { path: '/admin/teachers', icon: UserCheck, label: 'Teachers', color: 'text-purple-600' },
-        { path: '/admin/batches', icon: BookOpen, label: 'Batches', color: 'text-orange-600' },
-        { path: '/admin/analytics', icon: BarChart3, label: 'Analytics', color: 'text-indigo-600' },
-        { path: '/admin/feedback', icon: Star, label: 'Feedback', color: 'text-pink-600' },
+        { path: '/admin/users', icon: Users, label: 'User Management', color: 'text-red-600', permission: ['users', 'read'] },
+        { path: '/admin/students', icon: Student, label: 'Students', color: 'text-green-600', permission: ['students', 'read'] },
+        { path: '/admin/teachers', icon: UserCheck, label: 'Teachers', color: 'text-purple-600', permission: ['teachers', 'read'] },
+        { path: '/admin/batches', icon: BookOpen, label: 'Batches', color: 'text-orange-600', permission: ['batches', 'read'] },
+        { path: '/admin/analytics', icon: BarChart3, label: 'Analytics', color: 'text-indigo-600', permission: ['analytics', 'read'] },
+        { path: '/admin/feedback', icon: Star, label: 'Feedback', color: 'text-pink-600', permission: ['feedback', 'read'] },
         { path: '/admin/permissions', icon: Shield, label: 'Permissions', color: 'text-red-500' },
         { path: '/admin/settings', icon: Settings, label: 'Settings', color: 'text-gray-600' },
         ...baseItems
@@ -113,9 +115,9 @@ export default function Layout({ children }) {
     if (hasRole('management')) {
       return [
         { path: '/management', icon: Home, label: 'Dashboard', color: 'text-blue-600' },
-        { path: '/management/tasks', icon: ClipboardList, label: 'Task Management', color: 'text-green-600' },
-        { path: '/management/reports', icon: FileText, label: 'Reports', color: 'text-indigo-600' },
-        { path: '/management/feedback', icon: Star, label: 'Feedback', color: 'text-pink-600' },
+        { path: '/management/tasks', icon: ClipboardList, label: 'Task Management', color: 'text-green-600', permission: ['tasks', 'read'] },
+        { path: '/management/reports', icon: FileText, label: 'Reports', color: 'text-indigo-600', permission: ['reports', 'read'] },
+        { path: '/management/feedback', icon: Star, label: 'Feedback', color: 'text-pink-600', permission: ['feedback', 'read'] },
         ...baseItems
       ];
     }
@@ -123,12 +125,12 @@ export default function Layout({ children }) {
     if (hasRole('academics')) {
       return [
         { path: '/academics', icon: Home, label: 'Dashboard', color: 'text-blue-600' },
-        { path: '/academics/classes', icon: Calendar, label: 'Class Management', color: 'text-green-600' },
-        { path: '/academics/exams', icon: Award, label: 'Exam Management', color: 'text-purple-600' },
-        { path: '/academics/attendance', icon: CheckCircle, label: 'Attendance', color: 'text-blue-500' },
-        { path: '/academics/reports', icon: FileText, label: 'Report Cards', color: 'text-indigo-600' },
-        { path: '/academics/behavior', icon: Target, label: 'Behavior Records', color: 'text-orange-600' },
-        { path: '/academics/batches', icon: BookOpen, label: 'Batches', color: 'text-teal-600' },
+        { path: '/academics/classes', icon: Calendar, label: 'Class Management', color: 'text-green-600', permission: ['classes', 'read'] },
+        { path: '/academics/exams', icon: Award, label: 'Exam Management', color: 'text-purple-600', permission: ['exams', 'read'] },
+        { path: '/academics/attendance', icon: CheckCircle, label: 'Attendance', color: 'text-blue-500', permission: ['attendance', 'read'] },
+        { path: '/academics/reports', icon: FileText, label: 'Report Cards', color: 'text-indigo-600', permission: ['reports', 'read'] },
+        { path: '/academics/behavior', icon: Target, label: 'Behavior Records', color: 'text-orange-600', permission: ['behavior', 'read'] },
+        { path: '/academics/batches', icon: BookOpen, label: 'Batches', color: 'text-teal-600', permission: ['batches', 'read'] },
         ...baseItems
       ];
     }
@@ -156,7 +158,8 @@ export default function Layout({ children }) {
     return baseItems;
   };
 
-  const navItems = getNavItems();
+  // Items gated on a permission show once check-batch grants it; until it answers (or if it fails) roles decide
+  const navItems = getNavItems().filter((item) => !item.permission || !ready || can(...item.permission));
   const isActive = (path) => location.pathname === path || location.pathname.startsWith(path + '/');
 
   const formatTimeAgo = (dateString) => {
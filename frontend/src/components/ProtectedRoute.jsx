@@ -1,12 +1,19 @@
 import { Navigate, Outlet } from "react-router-dom";
 import { useAuth } from "../context/AuthContext";
+import { usePermissions } from "../hooks/usePermissions";
 
-export default function ProtectedRoute({ requireRole }) {
+// requirePermission: { resource, action }, answered by the shared check-batch call
+export default function ProtectedRoute({ requireRole, requirePermission }) {
   const { isAuthenticated, user, hasRole } = useAuth();
+  const { can, ready, loading } = usePermissions({ enabled: !!requirePermission });
 
   if (!isAuthenticated) return <Navigate to="/login" replace />;
 
-  if (requireRole && !hasRole(requireRole)) {
+  if (requirePermission && loading) return null;
+
+  const denied = requirePermission && ready && !can(requirePermission.resource, requirePermission.action);
+
+  if ((requireRole && !hasRole(requireRole)) || denied) {
     // Role mismatch → send to their home dashboard
     const getHomePath = () => {
       switch (user?.role) {
@@ -24,6 +24,7 @@ export const AuthProvider = ({ children }) => {
         } catch (error) {
           console.error('Failed to fetch user data:', error);
           localStorage.removeItem('access_token');
+          localStorage.removeItem('refresh_token');
           localStorage.removeItem('user');
         }
       }
@@ -38,10 +39,11 @@ export const AuthProvider = ({ children }) => {
       setLoading(true);
       const response = await authAPI.login({ username, password });
       
-      const { access_token, user: userData } = response;
+      const { access_token, refresh_token, user: userData } = response;
       
-      // Store token and user data
+      // Store tokens and user data
       localStorage.setItem('access_token', access_token);
+      localStorage.setItem('refresh_token', refresh_token);
       localStorage.setItem('user', JSON.stringify(userData));
       setUser(userData);
       
@@ -60,8 +62,14 @@ export const AuthProvider = ({ children }) => {
   };
 
   const logout = () => {
+    const refreshToken = localStorage.getItem('refresh_token');
+    if (refreshToken) {
+      // Revoke the device session server-side; sign-out proceeds regardless
+      authAPI.logout(refreshToken).catch(() => {});
+    }
     setUser(null);
     localStorage.removeItem('access_token');
+    localStorage.removeItem('refresh_token');
     localStorage.removeItem('user');
     if (location.pathname !== "/login") {
       navigate("/login", { replace: true });
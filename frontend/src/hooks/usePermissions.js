@@ -0,0 +1,76 @@
+import { useEffect, useState, useCallback } from 'react';
+import { useAuth } from '../context/AuthContext';
+import { permissionsAPI } from '../services/api';
+
+// Every (resource, action) pair the UI gates on, asked for in a single check-batch call
+export const PERMISSION_CHECKS = [
+  { resource: 'users', action: 'read' },
+  { resource: 'students', action: 'read' },
+  { resource: 'teachers', action: 'read' },
+  { resource: 'batches', action: 'read' },
+  { resource: 'classes', action: 'read' },
+  { resource: 'exams', action: 'read' },
+  { resource: 'attendance', action: 'read' },
+  { resource: 'behavior', action: 'read' },
+  { resource: 'reports', action: 'read' },
+  { resource: 'tasks', action: 'read' },
+  { resource: 'feedback', action: 'read' },
+  { resource: 'analytics', action: 'read' },
+];
+
+// Components mounting together (Layout, ProtectedRoute) share one request
+let inFlight = null;
+
+const loadGrants = () => {
+  if (!inFlight) {
+    inFlight = permissionsAPI.checkBatch(PERMISSION_CHECKS)
+      .then(({ results }) => new Set(
+        results.filter((result) => result.granted).map((result) => `${result.resource}:${result.action}`)
+      ))
+      .finally(() => {
+        inFlight = null;
+      });
+  }
+  return inFlight;
+};
+
+// enabled=false skips the request, for callers that only sometimes gate on a permission
+export const usePermissions = ({ enabled = true } = {}) => {
+  const { user, isAuthenticated } = useAuth();
+  // null until the answers arrive; on failure (or an unseeded matrix) the UI falls back to role checks and the API still enforces
+  const [grants, setGrants] = useState(null);
+  const [failed, setFailed] = useState(false);
+
+  useEffect(() => {
+    setFailed(false);
+    if (!enabled || !isAuthenticated) {
+      setGrants(null);
+      return;
+    }
+    let cancelled = false;
+    loadGrants()
+      .then((granted) => {
+        if (cancelled) return;
+        // Nothing granted at all means the permission tables aren't seeded, not that every page is off limits
+        if (granted.size === 0) {
+          setFailed(true);
+        } else {
+          setGrants(granted);
+        }
+      })
+      .catch((error) => {
+        console.error('Failed to load permissions:', error);
+        if (!cancelled) setFailed(true);
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, [enabled, isAuthenticated, user?.id]);
+
+  const can = useCallback(
+    (resource, action) => grants !== null && grants.has(`${resource}:${action}`),
+    [grants]
+  );
+
+  return { can, ready: grants !== null, loading: grants === null && !failed };
+};
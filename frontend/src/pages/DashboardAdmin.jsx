@@ -1,6 +1,7 @@
 import { useState, useEffect } from 'react';
 import Layout from '../components/Layout';
 import StatCard from '../components/StatCard';
+import { adminAPI } from '../services/api';
 import { 
   Users, 
   UserCheck, 
@@ -10,13 +11,16 @@ import {
   Award,
   AlertCircle,
   Clock,
-  BarChart3
+  BarChart3,
+  Download
 } from 'lucide-react';
 import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer, LineChart, Line, PieChart, Pie, Cell } from 'recharts';
 
 export default function DashboardAdmin() {
   const [recentActivities, setRecentActivities] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [exportEntity, setExportEntity] = useState('attendance');
+  const [exporting, setExporting] = useState(false);
 
   // Mock data - replace with real API calls
   const stats = [
@@ -61,6 +65,24 @@ export default function DashboardAdmin() {
     return () => clearTimeout(timer);
   }, []);
 
+  const handleExport = async () => {
+    try {
+      setExporting(true);
+      // The server streams the file; save the blob under a dated name
+      const blob = await adminAPI.exportEntityData(exportEntity);
+      const url = URL.createObjectURL(blob);
+      const link = document.createElement('a');
+      link.href = url;
+      link.download = `${exportEntity}-${new Date().toISOString().slice(0, 10)}.csv`;
+      link.click();
+      URL.revokeObjectURL(url);
+    } catch (error) {
+      console.error('Failed to export data:', error);
+    } finally {
+      setExporting(false);
+    }
+  };
+
   const getActivityIcon = (type) => {
     switch (type) {
       case 'student': return Users;
@@ -219,6 +241,26 @@ export default function DashboardAdmin() {
                 </div>
                 <span className="text-white group-hover:translate-x-1 transition-transform">→</span>
               </button>
+
+              <div className="flex items-center space-x-2">
+                <select
+                  value={exportEntity}
+                  onChange={(e) => setExportEntity(e.target.value)}
+                  className="input-field flex-1"
+                >
+                  <option value="attendance">Attendance</option>
+                  <option value="exam-results">Exam results</option>
+                  <option value="payments">Payments</option>
+                </select>
+                <button
+                  onClick={handleExport}
+                  disabled={exporting}
+                  className="btn-secondary py-3 px-4 flex items-center disabled:opacity-50"
+                >
+                  <Download size={20} className="mr-2" />
+                  {exporting ? 'Exporting...' : 'Export CSV'}
+                </button>
+              </div>
             </div>
           </div>
         </div>
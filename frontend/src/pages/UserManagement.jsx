@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import Layout from '../components/Layout';
-import { usersAPI, authAPI } from '../services/api';
+import { usersAPI, authAPI, adminAPI } from '../services/api';
 import { 
   Plus, 
   Search, 
@@ -21,6 +21,8 @@ export default function UserManagement() {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [searchTerm, setSearchTerm] = useState('');
+  // Ranked user ids from /admin/search for the current term; null while no term is entered
+  const [searchHits, setSearchHits] = useState(null);
   const [roleFilter, setRoleFilter] = useState('all');
   const [statusFilter, setStatusFilter] = useState('all');
   const [showModal, setShowModal] = useState(false);
@@ -43,6 +45,29 @@ export default function UserManagement() {
     fetchUserRoles();
   }, []);
 
+  // Debounced typeahead: the server ranks matches, so only the last keystroke's query is sent
+  useEffect(() => {
+    const term = searchTerm.trim();
+    if (term.length < 2) {
+      setSearchHits(null);
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const hits = await adminAPI.search(term, { types: 'users', limit: 50 });
+        if (!cancelled) setSearchHits(hits.map((hit) => hit.id));
+      } catch (error) {
+        console.error('Failed to search users:', error);
+        if (!cancelled) setError('Failed to search users');
+      }
+    }, 250);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [searchTerm]);
+
   const fetchUsers = async () => {
     try {
       setLoading(true);
@@ -152,16 +177,17 @@ export default function UserManagement() {
     }
   };
 
-  const filteredUsers = users.filter(user => {
-    const matchesSearch = user.full_name?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-                         user.username.toLowerCase().includes(searchTerm.toLowerCase()) ||
-                         user.email.toLowerCase().includes(searchTerm.toLowerCase());
+  // Search results keep the server's ranking; role and status filters apply on top
+  const usersById = new Map(users.map(user => [user.id, user]));
+  const searchedUsers = searchHits === null ? users : searchHits.map(id => usersById.get(id)).filter(Boolean);
+
+  const filteredUsers = searchedUsers.filter(user => {
     const matchesRole = roleFilter === 'all' || user.role === roleFilter;
     const matchesStatus = statusFilter === 'all' || 
                          (statusFilter === 'active' && user.is_active) ||
                          (statusFilter === 'inactive' && !user.is_active);
     
-    return matchesSearch && matchesRole && matchesStatus;
+    return matchesRole && matchesStatus;
   });
 
   return (
@@ -10,6 +10,9 @@ const api = axios.create({
   },
 });
 
+// Deadline (unix seconds) from the last write's X-Read-Primary-Until; until then reads go to the primary
+const READ_PRIMARY_KEY = 'read_primary_until';
+
 // Request interceptor to add auth token
 api.interceptors.request.use(
   (config) => {
@@ -17,6 +20,10 @@ api.interceptors.request.use(
     if (token) {
       config.headers.Authorization = `Bearer ${token}`;
     }
+    const readPrimaryUntil = localStorage.getItem(READ_PRIMARY_KEY);
+    if (readPrimaryUntil && Number(readPrimaryUntil) > Date.now() / 1000) {
+      config.headers['X-Read-Primary-Until'] = readPrimaryUntil;
+    }
     return config;
   },
   (error) => {
@@ -24,13 +31,62 @@ api.interceptors.request.use(
   }
 );
 
+// One refresh at a time: parallel 401s share it, so the rotated token is never replayed.
+// Tabs share localStorage, so the refresh also holds a cross-tab lock and skips the call
+// when another tab already rotated the token the failed request was sent with
+let refreshInFlight = null;
+
+const refreshAccessToken = (failedToken) => {
+  if (!refreshInFlight) {
+    const refresh = async () => {
+      const currentToken = localStorage.getItem('access_token');
+      if (currentToken && currentToken !== failedToken) {
+        return currentToken;
+      }
+      const refreshToken = localStorage.getItem('refresh_token');
+      if (!refreshToken) {
+        throw new Error('No refresh token');
+      }
+      const { data } = await axios.post(`${API_BASE_URL}/auth/refresh`, { refresh_token: refreshToken });
+      localStorage.setItem('access_token', data.access_token);
+      localStorage.setItem('refresh_token', data.refresh_token);
+      return data.access_token;
+    };
+    refreshInFlight = (navigator.locks ? navigator.locks.request('edudemy-token-refresh', refresh) : refresh())
+      .finally(() => {
+        refreshInFlight = null;
+      });
+  }
+  return refreshInFlight;
+};
+
 // Response interceptor to handle auth errors
 api.interceptors.response.use(
-  (response) => response,
-  (error) => {
+  (response) => {
+    const readPrimaryUntil = response.headers['x-read-primary-until'];
+    if (readPrimaryUntil) {
+      localStorage.setItem(READ_PRIMARY_KEY, readPrimaryUntil);
+    }
+    return response;
+  },
+  async (error) => {
+    const original = error.config;
+    if (error.response?.status === 401 && original && !original._retried) {
+      // Access token expired: trade the refresh token for a new one and replay the request once
+      original._retried = true;
+      try {
+        const failedToken = (original.headers.Authorization || '').replace('Bearer ', '');
+        const token = await refreshAccessToken(failedToken);
+        original.headers.Authorization = `Bearer ${token}`;
+        return api(original);
+      } catch (refreshError) {
+        // fall through to sign-out
+      }
+    }
     if (error.response?.status === 401) {
       // Token expired or invalid
       localStorage.removeItem('access_token');
+      localStorage.removeItem('refresh_token');
       localStorage.removeItem('user');
       window.location.href = '/login';
     }
@@ -38,6 +94,25 @@ api.interceptors.response.use(
   }
 );
 
+// List endpoints answer one page at a time and name the next one in X-Next-Cursor.
+// A caller passing its own limit or cursor gets that page; otherwise every page is fetched
+const PAGE_SIZE = 500;
+
+const getAllPages = async (url, params = {}) => {
+  if (params.limit || params.cursor) {
+    const response = await api.get(url, { params });
+    return response.data;
+  }
+  const rows = [];
+  let cursor;
+  do {
+    const response = await api.get(url, { params: { ...params, limit: PAGE_SIZE, cursor } });
+    rows.push(...response.data);
+    cursor = response.headers['x-next-cursor'];
+  } while (cursor);
+  return rows;
+};
+
 // Auth API
 export const authAPI = {
   login: async (credentials) => {
@@ -45,6 +120,11 @@ export const authAPI = {
     return response.data;
   },
 
+  logout: async (refreshToken) => {
+    const response = await api.post('/auth/logout', { refresh_token: refreshToken });
+    return response.data;
+  },
+
   createAdmin: async () => {
     const response = await api.post('/auth/create-admin');
     return response.data;
@@ -64,8 +144,7 @@ export const usersAPI = {
   },
 
   getUsers: async (params = {}) => {
-    const response = await api.get('/users/', { params });
-    return response.data;
+    return getAllPages('/users/', params);
   },
 
   getUser: async (userId) => {
@@ -97,8 +176,7 @@ export const usersAPI = {
 // Students API
 export const studentsAPI = {
   getStudents: async (params = {}) => {
-    const response = await api.get('/students/', { params });
-    return response.data;
+    return getAllPages('/students/', params);
   },
 
   createStudent: async (studentData) => {
@@ -139,8 +217,7 @@ export const dashboardAPI = {
 export const academicsAPI = {
   // Batches
   getBatches: async (params = {}) => {
-    const response = await api.get('/academics/batches/', { params });
-    return response.data;
+    return getAllPages('/academics/batches/', params);
   },
 
   createBatch: async (batchData) => {
@@ -150,8 +227,7 @@ export const academicsAPI = {
 
   // Class Assignments
   getClassAssignments: async (params = {}) => {
-    const response = await api.get('/academics/class-assignments/', { params });
-    return response.data;
+    return getAllPages('/academics/class-assignments/', params);
   },
 
   createClassAssignment: async (classData) => {
@@ -160,14 +236,12 @@ export const academicsAPI = {
   },
 
   getUpcomingClasses: async (days = 7) => {
-    const response = await api.get(`/academics/class-assignments/upcoming?days=${days}`);
-    return response.data;
+    return getAllPages('/academics/class-assignments/upcoming', { days });
   },
 
   // Exams
   getExams: async (params = {}) => {
-    const response = await api.get('/academics/exams/', { params });
-    return response.data;
+    return getAllPages('/academics/exams/', params);
   },
 
   createExam: async (examData) => {
@@ -177,8 +251,7 @@ export const academicsAPI = {
 
   // Exam Results
   getExamResults: async (params = {}) => {
-    const response = await api.get('/academics/exam-results/', { params });
-    return response.data;
+    return getAllPages('/academics/exam-results/', params);
   },
 
   createExamResult: async (resultData) => {
@@ -188,8 +261,7 @@ export const academicsAPI = {
 
   // Attendance
   getAttendance: async (params = {}) => {
-    const response = await api.get('/academics/attendance/', { params });
-    return response.data;
+    return getAllPages('/academics/attendance/', params);
   },
 
   markAttendance: async (attendanceData) => {
@@ -209,8 +281,7 @@ export const academicsAPI = {
 
   // Behavior Records
   getBehaviorRecords: async (params = {}) => {
-    const response = await api.get('/academics/behavior-records/', { params });
-    return response.data;
+    return getAllPages('/academics/behavior-records/', params);
   },
 
   createBehaviorRecord: async (recordData) => {
@@ -220,8 +291,7 @@ export const academicsAPI = {
 
   // Report Cards
   getReportCards: async (params = {}) => {
-    const response = await api.get('/academics/report-cards/', { params });
-    return response.data;
+    return getAllPages('/academics/report-cards/', params);
   },
 
   generateReportCard: async (reportData) => {
@@ -231,8 +301,7 @@ export const academicsAPI = {
 
   // Tasks
   getTasks: async (params = {}) => {
-    const response = await api.get('/academics/tasks/', { params });
-    return response.data;
+    return getAllPages('/academics/tasks/', params);
   },
 
   createTask: async (taskData) => {
@@ -247,8 +316,7 @@ export const academicsAPI = {
 
   // Payments
   getPayments: async (params = {}) => {
-    const response = await api.get('/academics/payments/', { params });
-    return response.data;
+    return getAllPages('/academics/payments/', params);
   },
 
   createPayment: async (paymentData) => {
@@ -271,6 +339,7 @@ export const messagingAPI = {
   },
 
   getMessagesWithUser: async (userId, params = {}) => {
+    // Newest page only, in chronological order; older messages come with the X-Next-Cursor cursor
     const response = await api.get(`/messaging/messages/${userId}`, { params });
     return response.data;
   },
@@ -297,6 +366,7 @@ export const messagingAPI = {
   },
 
   getGroupMessages: async (groupId, params = {}) => {
+    // Newest page only, in chronological order; older messages come with the X-Next-Cursor cursor
     const response = await api.get(`/messaging/groups/${groupId}/messages`, { params });
     return response.data;
   },
@@ -310,8 +380,7 @@ export const messagingAPI = {
 // Notifications API
 export const notificationsAPI = {
   getNotifications: async (params = {}) => {
-    const response = await api.get('/notifications/', { params });
-    return response.data;
+    return getAllPages('/notifications/', params);
   },
 
   markAsRead: async (notificationId) => {
@@ -348,18 +417,15 @@ export const feedbackAPI = {
   },
 
   getMyFeedback: async (params = {}) => {
-    const response = await api.get('/feedback/my-feedback', { params });
-    return response.data;
+    return getAllPages('/feedback/my-feedback', params);
   },
 
   getAllFeedback: async (params = {}) => {
-    const response = await api.get('/feedback/', { params });
-    return response.data;
+    return getAllPages('/feedback/', params);
   },
 
   getPendingFeedback: async (params = {}) => {
-    const response = await api.get('/feedback/pending', { params });
-    return response.data;
+    return getAllPages('/feedback/pending', params);
   },
 
   getFeedbackStats: async () => {
@@ -392,8 +458,7 @@ export const adminAPI = {
   },
 
   getAllUsers: async (params = {}) => {
-    const response = await api.get('/admin/users/', { params });
-    return response.data;
+    return getAllPages('/admin/users/', params);
   },
 
   getUser: async (userId) => {
@@ -418,7 +483,12 @@ export const adminAPI = {
   },
 
   getAllStudents: async (params = {}) => {
-    const response = await api.get('/admin/students/', { params });
+    return getAllPages('/admin/students/', params);
+  },
+
+  // Ranked typeahead over users, students and teachers; types is a comma separated subset
+  search: async (q, { types, limit } = {}) => {
+    const response = await api.get('/admin/search', { params: { q, types, limit } });
     return response.data;
   },
 
@@ -429,8 +499,7 @@ export const adminAPI = {
   },
 
   getAllTeachers: async (params = {}) => {
-    const response = await api.get('/admin/teachers/', { params });
-    return response.data;
+    return getAllPages('/admin/teachers/', params);
   },
 
   // Analytics
@@ -467,7 +536,12 @@ export const adminAPI = {
 
   // Maintenance
   cleanupNotifications: async (daysOld = 30) => {
-    const response = await api.post('/admin/maintenance/cleanup-notifications', { days_old: daysOld });
+    const response = await api.post('/admin/maintenance/cleanup-notifications', null, { params: { days_old: daysOld } });
+    return response.data;
+  },
+
+  getRetentionStatus: async () => {
+    const response = await api.get('/admin/maintenance/retention');
     return response.data;
   },
 
@@ -477,6 +551,15 @@ export const adminAPI = {
     const response = await api.get('/admin/export/users', { params });
     return response.data;
   },
+
+  // entity: attendance, exam-results or payments; filters: batch_id, start_date, end_date, subject
+  exportEntityData: async (entity, filters = {}, format = 'csv') => {
+    const response = await api.get(`/admin/export/${entity}`, {
+      params: { ...filters, format },
+      responseType: 'blob',
+    });
+    return response.data;
+  },
 };
 
 // Permissions API
@@ -515,6 +598,25 @@ export const permissionsAPI = {
     const response = await api.get('/permissions/my-permissions');
     return response.data;
   },
+
+  // checks: [{ resource, action }, ...]. Answers are kept for the browser session and
+  // revalidated with If-None-Match, so an unchanged answer costs one 304.
+  checkBatch: async (checks) => {
+    const cacheKey = `permission_checks:${JSON.stringify(checks)}`;
+    const cached = JSON.parse(sessionStorage.getItem(cacheKey) || 'null');
+    const response = await api.post('/permissions/check-batch', { checks }, {
+      headers: cached ? { 'If-None-Match': cached.etag } : {},
+      validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
+    });
+    if (response.status === 304 && cached) {
+      return cached.data;
+    }
+    const etag = response.headers.etag;
+    if (etag) {
+      sessionStorage.setItem(cacheKey, JSON.stringify({ etag, data: response.data }));
+    }
+    return response.data;
+  },
 };
 
 export default api;